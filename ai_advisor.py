@@ -14,7 +14,12 @@ class AIAdvisor:
             
         # Konfigurasi Gemini
         try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
+            if config.GEMINI_API_ENDPOINT:
+                # Server lokal (fake_services.py) untuk uji beban tanpa kuota Gemini
+                genai.configure(api_key=config.GEMINI_API_KEY, transport='rest',
+                                client_options={'api_endpoint': config.GEMINI_API_ENDPOINT})
+            else:
+                genai.configure(api_key=config.GEMINI_API_KEY)
             # Menggunakan model 2.5 Flash (Terbaru & Cepat)
             self.model = genai.GenerativeModel('gemini-2.5-flash')
             print("✅ Otak AI Aktif: Gemini 2.5 Flash")
@@ -0,0 +1,223 @@
+# api_cache.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import config
+from journal_store import JournalStore
+
+# Parameter yang tidak mempengaruhi isi respons (tidak ikut jadi key cache).
+# 'fields' (partial response) dicatat di entri: respons penuh boleh melayani request ber-mask,
+# respons ber-mask hanya melayani mask yang sama (lihat ResponseCache._lookup).
+IGNORED_PARAMS = {'key', 'alt', 'prettyPrint', 'quotaUser', 'fields_debug', 'fields'}
+# Parameter teks bebas yang dinormalisasi (spasi & huruf besar/kecil tidak membedakan hasil)
+TEXT_PARAMS = {'q'}
+
+
+def normalize_request_key(method_id: str, uri: str) -> str:
+    """
+    Key cache = endpoint + parameter yang sudah dinormalisasi (urut, tanpa API key).
+    'youtube.search.list?maxResults=20&part=snippet&q=tips belajar&...'
+    """
+    params = []
+    for name, value in parse_qsl(urlsplit(uri).query, keep_blank_values=True):
+        if name in IGNORED_PARAMS:
+            continue
+        if name in TEXT_PARAMS:
+            value = ' '.join(value.lower().split())
+        elif name == 'id':
+            value = ','.join(sorted(value.split(',')))
+        params.append((name, value))
+    return f"{method_id}?{urlencode(sorted(params))}"
+
+
+def request_fields(uri: str):
+    """Nilai parameter fields= (partial response) pada URI, None = respons penuh."""
+    for name, value in parse_qsl(urlsplit(uri).query, keep_blank_values=True):
+        if name == 'fields':
+            return value
+    return None
+
+
+class ResponseCache:
+    """
+    Cache respons YouTube Data API di disk (JournalStore), dengan TTL per jenis endpoint.
+
+    - Segar  (umur < TTL)              : langsung dipakai, tanpa jaringan.
+    - Basi   (TTL <= umur < TTL+stale) : dipakai langsung, lalu di-refresh di background
+                                         (stale-while-revalidate).
+    - Kedaluwarsa / tidak ada          : ambil dari API (jika gagal, entri basi tetap dipakai).
+
+    Entri kedaluwarsa dibuang (prune_expired) saat cache dibuka dan ditutup, sehingga
+    key yang tidak pernah diminta lagi tidak menumpuk di snapshot.
+    """
+
+    CACHE_FILE = 'api_cache.json'
+
+    def __init__(self, cache_file: str = None, search_ttl: float = None, stats_ttl: float = None,
+                 stale_window: float = None):
+        self.search_ttl = search_ttl if search_ttl is not None else config.API_CACHE_SEARCH_TTL_HOURS * 3600
+        self.stats_ttl = stats_ttl if stats_ttl is not None else config.API_CACHE_STATS_TTL_HOURS * 3600
+        self.stale_window = stale_window if stale_window is not None else config.API_CACHE_STALE_HOURS * 3600
+        self.store = JournalStore(cache_file or self.CACHE_FILE)
+
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        self._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ApiCacheRevalidate')
+        self._tasks = set() # Refresh asyncio yang sedang berjalan (dipegang agar tidak di-GC)
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.errors_served_stale = 0
+        self.pruned = self.prune_expired()
+
+    def ttl_for(self, method_id: str) -> float:
+        # Hasil pencarian jarang berubah; statistik (views/likes) cepat berubah
+        return self.search_ttl if method_id.endswith('search.list') else self.stats_ttl
+
+    def _freshness(self, method_id: str, entry) -> str:
+        """'fresh' / 'stale' (masih boleh dipakai sambil di-refresh) / 'expired'."""
+        if entry is None:
+            return 'expired'
+        ttl = self.ttl_for(method_id)
+        age = time.time() - entry['fetched_at']
+        if age < ttl:
+            return 'fresh'
+        if age < ttl + self.stale_window:
+            return 'stale'
+        return 'expired'
+
+    def prune_expired(self) -> int:
+        """Hapus entri yang sudah lewat TTL + jendela basi. Return: jumlah entri yang dihapus."""
+        expired = [key for key, entry in self.store.items()
+                   if self._freshness(key.split('?', 1)[0], entry) == 'expired']
+        for key in expired:
+            self.store.delete(key)
+        return len(expired)
+
+    def is_fresh(self, method_id: str, uri: str) -> bool:
+        """True jika request ini akan dilayani dari cache tanpa memakan kuota (entri masih segar)."""
+        entry = self._lookup(normalize_request_key(method_id, uri), request_fields(uri))
+        return self._freshness(method_id, entry) == 'fresh'
+
+    def _lookup(self, key, fields):
+        """Entri untuk key ini, None jika isinya tidak mencakup field yang diminta."""
+        entry = self.store.get(key)
+        if entry is None or entry.get('fields') in (None, fields):
+            return entry
+        return None
+
+    def get_or_fetch(self, method_id: str, uri: str, fetch):
+        """Kembalikan respons untuk request ini; fetch() hanya dipanggil jika cache tidak bisa dipakai."""
+        key, fields = normalize_request_key(method_id, uri), request_fields(uri)
+        entry = self._lookup(key, fields)
+        freshness = self._freshness(method_id, entry)
+        if freshness == 'fresh':
+            self._count('hits')
+            return entry['response']
+        if freshness == 'stale':
+            self._count('stale_hits')
+            self._revalidate(key, fields, fetch)
+            return entry['response']
+
+        self._count('misses')
+        try:
+            response = fetch()
+        except Exception:
+            if entry is not None:
+                # API gagal (kuota/jaringan) -> data lama lebih baik daripada kosong
+                self._count('errors_served_stale')
+                return entry['response']
+            raise
+        self._save(key, response, fields)
+        return response
+
+    async def get_or_fetch_async(self, method_id: str, uri: str, fetch):
+        """Versi asyncio dari get_or_fetch; fetch = fungsi async tanpa argumen."""
+        key, fields = normalize_request_key(method_id, uri), request_fields(uri)
+        entry = self._lookup(key, fields)
+        freshness = self._freshness(method_id, entry)
+        if freshness == 'fresh':
+            self._count('hits')
+            return entry['response']
+        if freshness == 'stale':
+            self._count('stale_hits')
+            if self._claim_revalidation(key):
+                task = asyncio.get_running_loop().create_task(self._refresh_async(key, fields, fetch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry['response']
+
+        self._count('misses')
+        try:
+            response = await fetch()
+        except Exception:
+            if entry is not None:
+                self._count('errors_served_stale')
+                return entry['response']
+            raise
+        self._save(key, response, fields)
+        return response
+
+    async def _refresh_async(self, key, fields, fetch):
+        try:
+            self._save(key, await fetch(), fields)
+            self._count('revalidations')
+        except Exception as e:
+            print(f"⚠️ Gagal refresh cache API ({key[:60]}): {e}")
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+    def _claim_revalidation(self, key) -> bool:
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def _revalidate(self, key, fields, fetch):
+        if not self._claim_revalidation(key):
+            return
+
+        def refresh():
+            try:
+                self._save(key, fetch(), fields)
+                self._count('revalidations')
+            except Exception as e:
+                print(f"⚠️ Gagal refresh cache API ({key[:60]}): {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        self._revalidator.submit(refresh)
+
+    def _save(self, key, response, fields=None):
+        entry = {'fetched_at': time.time(), 'response': response}
+        if fields:
+            entry['fields'] = fields
+        self.store.put(key, entry)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+    def stats(self) -> str:
+        return (f"cache API: hit {self.hits}, basi {self.stale_hits}, miss {self.misses} "
+                f"(hit rate {self.hit_rate() * 100:.0f}%), refresh {self.revalidations}, "
+                f"fallback basi {self.errors_served_stale}")
+
+    def close(self):
+        self._revalidator.shutdown(wait=True)
+        # Compaction terakhir (saat store ditutup) tidak lagi membawa entri kedaluwarsa
+        self.prune_expired()
+        self.store.close()
@@ -0,0 +1,217 @@
+# async_data_fetcher.py
+# Varian asyncio dari DataFetcher untuk fan-out ratusan request YouTube Data API sekaligus.
+#   - Satu aiohttp.ClientSession bersama (pool koneksi keep-alive, respons gzip)
+#   - Partial response (fields=...): hanya field yang dipakai VideoCase yang dikirim server
+#   - Cache respons, buku kuota & transkrip dipakai bersama dengan DataFetcher biasa
+#
+# Contoh:
+#   async def main():
+#       async with AsyncDataFetcher() as fetcher:
+#           results = await asyncio.gather(*(fetcher.search_youtube_videos(kw) for kw in keywords))
+#   asyncio.run(main())
+
+import asyncio
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import config
+from data_fetcher import DataFetcher, VIDEO_DETAIL_BATCH_SIZE
+from rate_limiter import TokenBucket, call_with_backoff_async, is_quota_error
+
+try:
+    import aiohttp
+except ImportError:  # Dependensi opsional: hanya dibutuhkan oleh varian async
+    aiohttp = None
+
+DEFAULT_ENDPOINT = 'https://www.googleapis.com'
+
+# Partial response per endpoint: hanya field yang benar-benar dibaca
+FIELDS_SEARCH_VIDEO = 'items/id/videoId'
+FIELDS_SEARCH_CHANNEL = 'items(id/channelId,snippet/title)'
+FIELDS_VIDEO_CASE = 'items(id,snippet(title,tags,thumbnails/high/url),statistics(viewCount,likeCount,commentCount))'
+FIELDS_CHANNEL_UPLOADS = 'items(contentDetails/relatedPlaylists/uploads,statistics/videoCount)'
+FIELDS_PLAYLIST_PAGE = 'nextPageToken,items/contentDetails/videoId'
+
+
+class ApiHttpError(Exception):
+    """Respons non-2xx dari YouTube API. Atribut resp.status meniru HttpError googleapiclient (untuk retry)."""
+
+    def __init__(self, status: int, body: str, url: str):
+        super().__init__(f"HTTP {status} untuk {url.split('?')[0]}: {body[:300]}")
+        self.resp = SimpleNamespace(status=status)
+        self.body = body
+
+
+class AsyncDataFetcher:
+    """
+    Method yang sama dengan DataFetcher, dalam bentuk coroutine.
+    Endpoint YouTube Data API dipanggil langsung lewat aiohttp; Trends & transkrip
+    (library sinkron) dijalankan di thread lewat asyncio.to_thread.
+    """
+
+    def __init__(self, sync_fetcher: DataFetcher = None, max_connections: int = config.ASYNC_MAX_CONNECTIONS,
+                 rate: float = None, burst: int = 10, retries: int = config.COLLECT_MAX_RETRIES):
+        if aiohttp is None:
+            raise ImportError("AsyncDataFetcher membutuhkan paket 'aiohttp' (pip install aiohttp).")
+        # Cache respons, QuotaLedger, planner & cache transkrip dipakai bersama (satu file = satu JournalStore)
+        self.sync = sync_fetcher or DataFetcher()
+        self.cache = self.sync.cache
+        self.quota = self.sync.quota
+        self.planner = self.sync.planner
+        self.base_url = (config.YOUTUBE_API_ENDPOINT or DEFAULT_ENDPOINT).rstrip('/') + '/youtube/v3/'
+        self.max_connections = max_connections
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.retries = retries
+        self.session = None
+        self._trends_lock = None # pytrends tidak thread-safe -> satu panggilan Trends pada satu waktu
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+                # Google hanya mengirim gzip jika User-Agent juga memuat kata 'gzip'
+                headers={'Accept-Encoding': 'gzip', 'User-Agent': 'GapSense/3.0 (gzip)'},
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # --- Transport ---
+    async def _get(self, resource: str, **params) -> dict:
+        """GET {endpoint}/youtube/v3/<resource> lewat cache respons, dengan kuota & retry."""
+        await self.open()
+        method_id = f"youtube.{resource}.list"
+        params = {name: value for name, value in params.items() if value is not None}
+        url = f"{self.base_url}{resource}?{urlencode(params)}"
+
+        async def fetch():
+            return await call_with_backoff_async(lambda: self._request(method_id, url), retries=self.retries)
+
+        if self.cache is None:
+            return await fetch()
+        return await self.cache.get_or_fetch_async(method_id, url, fetch)
+
+    async def _request(self, method_id: str, url: str) -> dict:
+        if self.limiter:
+            await self.limiter.acquire_async()
+        while True:
+            api_key = self.quota.charge(method_id)
+            async with self.session.get(url, params={'key': api_key} if api_key else None) as response:
+                if response.status < 400:
+                    return await response.json()
+                error = ApiHttpError(response.status, await response.text(), url)
+            if not is_quota_error(error):
+                raise error
+            # Key ini habis -> ulangi dengan key berikutnya di pool
+            self.quota.mark_exhausted(api_key)
+
+    # --- FITUR 1: DATA MINING (Video Biasa) ---
+    async def search_youtube_videos(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> list:
+        video_ids = await self.search_video_ids(query, max_results)
+        if video_ids:
+            return await self._get_video_details(video_ids)
+        return []
+
+    async def search_video_ids(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> list:
+        try:
+            return await self._search_video_ids(query, max_results)
+        except Exception as e:
+            print(f"Error searching videos: {e}")
+            return []
+
+    async def _search_video_ids(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> list:
+        response = await self._get(
+            'search', q=query, part='snippet', type='video', maxResults=max_results,
+            regionCode=config.SEARCH_REGION, videoDuration='short', fields=FIELDS_SEARCH_VIDEO
+        )
+        return [item['id']['videoId'] for item in response.get('items', [])]
+
+    async def _get_video_details(self, video_ids: list) -> list:
+        try:
+            batches = [video_ids[start:start + VIDEO_DETAIL_BATCH_SIZE]
+                       for start in range(0, len(video_ids), VIDEO_DETAIL_BATCH_SIZE)]
+            results = await asyncio.gather(*(self._fetch_video_details(batch) for batch in batches))
+            return [case for batch in results for case in batch]
+        except Exception as e:
+            print(f"Error detail: {e}")
+            return []
+
+    async def _fetch_video_details(self, video_ids: list) -> list:
+        response = await self._get('videos', part='snippet,statistics', id=','.join(video_ids), fields=FIELDS_VIDEO_CASE)
+        return [DataFetcher._video_case_from_item(item) for item in response.get('items', [])]
+
+    # --- FITUR 2: CHANNEL INTELLIGENCE ---
+    async def get_channel_id(self, channel_name: str):
+        try:
+            res = await self._get('search', q=channel_name, type='channel', part='id,snippet', maxResults=1,
+                                  fields=FIELDS_SEARCH_CHANNEL)
+            if res.get('items'):
+                return res['items'][0]['id']['channelId'], res['items'][0]['snippet']['title']
+            return None, None
+        except Exception:
+            return None, None
+
+    async def get_channel_top_videos(self, channel_id: str, max_results=5):
+        try:
+            channel = (await self._get('channels', id=channel_id, part='contentDetails,statistics',
+                                       fields=FIELDS_CHANNEL_UPLOADS))['items'][0]
+            uploads_playlist_id = channel['contentDetails']['relatedPlaylists']['uploads']
+            video_count = int(channel.get('statistics', {}).get('videoCount', 0))
+
+            route, cost = self.planner.channel_top_videos_plan(video_count, max_results)
+            if route == 'playlist':
+                videos = await self._get_video_details(await self._list_playlist_video_ids(uploads_playlist_id))
+                videos.sort(key=lambda v: v.raw_views, reverse=True)
+                return videos[:max_results]
+
+            res = await self._get('search', channelId=channel_id, part='id,snippet', order='viewCount',
+                                  maxResults=max_results, type='video', fields=FIELDS_SEARCH_VIDEO)
+            vid_ids = [item['id']['videoId'] for item in res.get('items', [])]
+            return await self._get_video_details(vid_ids) if vid_ids else []
+        except Exception as e:
+            print(f"Error fetch channel: {e}")
+            return []
+
+    async def _list_playlist_video_ids(self, playlist_id: str) -> list:
+        video_ids = []
+        page_token = None
+        while True:
+            res = await self._get('playlistItems', playlistId=playlist_id, part='contentDetails',
+                                  maxResults=VIDEO_DETAIL_BATCH_SIZE, pageToken=page_token, fields=FIELDS_PLAYLIST_PAGE)
+            video_ids.extend(item['contentDetails']['videoId'] for item in res.get('items', []))
+            page_token = res.get('nextPageToken')
+            if not page_token:
+                return video_ids
+
+    # --- FITUR 3-5: Transkrip & Google Trends (library sinkron -> thread) ---
+    async def get_video_transcript(self, video_id: str):
+        return await asyncio.to_thread(self.sync.get_video_transcript, video_id)
+
+    async def get_video_transcripts(self, video_ids: list, workers: int = config.TRANSCRIPT_WORKERS) -> dict:
+        return await asyncio.to_thread(self.sync.get_video_transcripts, video_ids, workers)
+
+    async def _trends(self, fn, *args):
+        if self._trends_lock is None:
+            self._trends_lock = asyncio.Lock()
+        async with self._trends_lock:
+            return await asyncio.to_thread(fn, *args)
+
+    async def fetch_trending_keywords(self, niche_keyword: str) -> list:
+        return await self._trends(self.sync.fetch_trending_keywords, niche_keyword)
+
+    async def get_demand_score(self, keyword: str) -> float:
+        return await self._trends(self.sync.get_demand_score, keyword)
+
+    async def get_demand_scores(self, keywords: list, anchor: str = config.TRENDS_ANCHOR_KEYWORD) -> list:
+        return await self._trends(self.sync.get_demand_scores, keywords, anchor)
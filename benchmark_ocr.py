@@ -0,0 +1,245 @@
+# benchmark_ocr.py
+# Benchmark OCR:
+#   pipeline  : thread-per-item (process_batch_concurrently) vs OCRPipeline.
+#               Thumbnail disajikan dari server HTTP lokal, jadi tidak butuh internet/kuota.
+#   prefilter : kecepatan & kesesuaian (agreement) prefilter OpenCV / fast density
+#               terhadap density Tesseract penuh, memakai thumbnail di raw_shorts_data.jsonl (atau .json lama).
+#   mosaic    : throughput per-gambar vs mosaic (N gambar per Tesseract) + cek paritas akurasi.
+#
+# Contoh:
+#   python benchmark_ocr.py pipeline --count 200 --latency 0.08
+#   python benchmark_ocr.py prefilter --limit 300
+#   python benchmark_ocr.py mosaic --count 96 --batch-sizes 4 8 16
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+import pytesseract
+
+import config
+from ocr_processor import (OCRProcessor, OCRPipeline, analyze_image_bytes, detect_text_regions, OCR_LANG,
+                           _prepare_gray, _count_unique_words, _result_from_data, density_from_result,
+                           ocr_mosaic_texts)
+from thumbnail_store import ThumbnailStore
+from raw_data_io import iter_raw_records
+from fake_services import make_thumbnail
+
+
+class ThumbnailServer:
+    """Server HTTP lokal yang menyajikan /vi/<n>/hqdefault.jpg dengan latensi buatan."""
+
+    def __init__(self, count: int, latency: float = 0.0, port: int = 0):
+        self.images = {str(i): make_thumbnail(i) for i in range(count)}
+        latency_s = latency
+        images = self.images
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.strip('/').split('/')
+                body = images.get(parts[1]) if len(parts) >= 2 else None
+                if latency_s:
+                    time.sleep(latency_s)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+
+    def video_list(self):
+        return [{'id': f"bench{i}", 'thumbnail': f"{self.base_url}/vi/{i}/hqdefault.jpg"} for i in self.images]
+
+
+def run_benchmark(count: int, latency: float, threads: int, download_workers: int, ocr_workers: int):
+    with ThumbnailServer(count, latency) as server, tempfile.TemporaryDirectory() as tmp:
+        videos = server.video_list()
+
+        # Mode lama: download + OCR di thread yang sama
+        # Thumbnail store terpisah per mode agar keduanya benar-benar download dari server
+        ocr = OCRProcessor(cache_file=os.path.join(tmp, 'bench_threads.json'),
+                           thumbnail_store=ThumbnailStore(root=os.path.join(tmp, 'thumbs_threads')))
+        started = time.perf_counter()
+        ocr.process_batch_concurrently(videos, max_workers=threads)
+        threaded_wall = time.perf_counter() - started
+        ocr.close()
+
+        # Mode pipeline: download (thread) -> antrian -> OCR (process pool)
+        ocr = OCRProcessor(cache_file=os.path.join(tmp, 'bench_pipeline.json'),
+                           thumbnail_store=ThumbnailStore(root=os.path.join(tmp, 'thumbs_pipeline')))
+        pipeline = OCRPipeline(ocr, download_workers=download_workers, ocr_workers=ocr_workers)
+        started = time.perf_counter()
+        pipeline.run(videos)
+        pipeline_wall = time.perf_counter() - started
+        ocr.close()
+
+    print("\n=== HASIL BENCHMARK OCR ===")
+    print(f"Thumbnail        : {count} (latensi server {latency * 1000:.0f} ms)")
+    print(f"Thread ({threads:>2})      : {threaded_wall:7.2f} s | {count / threaded_wall:7.2f} thumbnail/s")
+    print(f"Pipeline         : {pipeline_wall:7.2f} s | {count / pipeline_wall:7.2f} thumbnail/s")
+    print(f"Speedup          : {threaded_wall / pipeline_wall:.2f}x")
+    print("  " + pipeline.download_stats.summary())
+    print("  " + pipeline.ocr_stats.summary())
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run_prefilter_report(raw_file: str, limit: int):
+    """Bandingkan Tesseract penuh vs prefilter+Tesseract vs fast density pada thumbnail asli."""
+    import cv2
+
+    seen, videos = set(), []
+    for row in iter_raw_records(raw_file):
+        if row.get('thumbnail') and row['id'] not in seen:
+            seen.add(row['id'])
+            videos.append(row)
+    videos = videos[:limit]
+
+    pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
+    ocr = OCRProcessor(cache_file=os.path.join(tempfile.gettempdir(), 'bench_prefilter_cache.json'))
+    print(f"-> Download {len(videos)} thumbnail dari {raw_file}...")
+
+    rows = []
+    for video in videos:
+        try:
+            image_bytes = ocr.thumbnails.get(video['thumbnail'], config.OCR_THUMBNAIL_VARIANT)
+        except Exception:
+            continue
+        (full, _), t_full = _timed(analyze_image_bytes, image_bytes, OCR_LANG, False, False)
+        (pre, used), t_pre = _timed(analyze_image_bytes, image_bytes, OCR_LANG, True, False)
+        (fast, _), t_fast = _timed(analyze_image_bytes, image_bytes, OCR_LANG, False, True)
+        full, pre, fast = density_from_result(full), density_from_result(pre), density_from_result(fast)
+
+        gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        regions = detect_text_regions(gray)
+        area_ratio = sum(w * h for _, _, w, h in regions) / float(gray.shape[0] * gray.shape[1])
+        rows.append((full, pre, used, fast, area_ratio, t_full, t_pre, t_fast))
+    ocr.close()
+
+    if not rows:
+        print("🚨 Tidak ada thumbnail yang berhasil diunduh.")
+        return
+
+    data = np.array(rows, dtype=float)
+    full, pre, used, fast, area_ratio = data[:, 0], data[:, 1], data[:, 2], data[:, 3], data[:, 4]
+    n = len(data)
+
+    def agreement(name, estimate):
+        exact = np.mean(estimate == full) * 100
+        mae = np.mean(np.abs(estimate - full))
+        corr = np.corrcoef(estimate, full)[0, 1] if np.std(estimate) > 0 and np.std(full) > 0 else float('nan')
+        print(f"{name:<22}| exact {exact:5.1f}% | MAE {mae:6.3f} | Pearson r {corr:6.3f}")
+
+    rejected = used == 0
+    print("\n=== LAPORAN PREFILTER OCR ===")
+    print(f"Thumbnail dianalisis : {n}")
+    print(f"Rata-rata waktu/gambar: Tesseract penuh {data[:, 5].mean() * 1000:7.1f} ms | "
+          f"prefilter {data[:, 6].mean() * 1000:7.1f} ms | fast density {data[:, 7].mean() * 1000:6.1f} ms")
+    print(f"Ditolak prefilter    : {rejected.sum():.0f} ({rejected.mean() * 100:.1f}%), "
+          f"di antaranya Tesseract penuh menemukan teks: {np.sum(rejected & (full > 0)):.0f} (false reject)")
+    print(f"Teks terlewat (full>0): {np.sum(rejected & (full > 0)) / max(np.sum(full > 0), 1) * 100:.1f}% dari gambar bertulisan")
+    agreement("Prefilter+Tesseract", pre)
+    agreement("Fast density", fast)
+
+    # Kalibrasi: batas luas area teks yang paling sering cocok dengan density Tesseract penuh (0/1)
+    has_text = full > 0
+    candidates = np.unique(np.concatenate(([config.OCR_FAST_DENSITY_MIN_AREA], area_ratio[area_ratio > 0])))
+    scores = [np.mean(((area_ratio >= threshold) & (area_ratio > 0)) == has_text) for threshold in candidates]
+    best = int(np.argmax(scores))
+    print(f"Saran OCR_FAST_DENSITY_MIN_AREA = {candidates[best]:.4f} (cocok {scores[best] * 100:.1f}%; "
+          f"sekarang {config.OCR_FAST_DENSITY_MIN_AREA})")
+
+
+def _word_set(text: str) -> set:
+    return {''.join(ch for ch in word if ch.isalnum()) for word in text.lower().split()} - {''}
+
+
+def run_mosaic_benchmark(count: int, batch_sizes: list):
+    """Throughput satu proses: per-gambar vs mosaic, plus paritas hasil terhadap per-gambar."""
+    pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
+    tiles = []
+    for i in range(count):
+        tile, _ = _prepare_gray(make_thumbnail(i), prefilter=True)
+        if tile is not None:
+            tiles.append(tile)
+    print(f"-> {len(tiles)} dari {count} thumbnail lolos prefilter (berisi teks)")
+    if not tiles:
+        return
+
+    started = time.perf_counter()
+    single_texts = [_result_from_data(pytesseract.image_to_data(tile, lang=OCR_LANG, config=config.OCR_TESSERACT_CONFIG,
+                                                                output_type=pytesseract.Output.DICT))['text']
+                    for tile in tiles]
+    single_wall = time.perf_counter() - started
+
+    print("\n=== BENCHMARK MOSAIC OCR ===")
+    print(f"Per-gambar      : {single_wall:7.2f} s | {len(tiles) / single_wall:7.2f} gambar/s")
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        mosaic_texts = []
+        for i in range(0, len(tiles), batch_size):
+            mosaic_texts.extend(ocr_mosaic_texts(tiles[i:i + batch_size], OCR_LANG))
+        wall = time.perf_counter() - started
+
+        density_match = np.mean([_count_unique_words(a) == _count_unique_words(b)
+                                  for a, b in zip(single_texts, mosaic_texts)]) * 100
+        jaccard = []
+        for a, b in zip(single_texts, mosaic_texts):
+            words_a, words_b = _word_set(a), _word_set(b)
+            union = words_a | words_b
+            jaccard.append(len(words_a & words_b) / len(union) if union else 1.0)
+        print(f"Mosaic x{batch_size:<3}     : {wall:7.2f} s | {len(tiles) / wall:7.2f} gambar/s | "
+              f"speedup {single_wall / wall:5.2f}x | density sama {density_match:5.1f}% | "
+              f"Jaccard kata {np.mean(jaccard):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OCR.")
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    p_pipe = sub.add_parser('pipeline', help="Thread-per-item vs OCRPipeline (server lokal)")
+    p_pipe.add_argument('--count', type=int, default=200, help="Jumlah thumbnail")
+    p_pipe.add_argument('--latency', type=float, default=0.05, help="Latensi buatan per request (detik)")
+    p_pipe.add_argument('--threads', type=int, default=8, help="Thread untuk mode lama")
+    p_pipe.add_argument('--download-workers', type=int, default=16)
+    p_pipe.add_argument('--ocr-workers', type=int, default=None, help="Default: jumlah core CPU")
+
+    p_pre = sub.add_parser('prefilter', help="Kecepatan & agreement prefilter OpenCV / fast density")
+    p_pre.add_argument('--raw-file', default=None, help="Default: raw_shorts_data.jsonl, lalu raw_shorts_data.json")
+    p_pre.add_argument('--limit', type=int, default=300, help="Maksimal thumbnail yang diuji")
+
+    p_mosaic = sub.add_parser('mosaic', help="Per-gambar vs mosaic (N gambar per Tesseract)")
+    p_mosaic.add_argument('--count', type=int, default=96, help="Jumlah thumbnail sintetis")
+    p_mosaic.add_argument('--batch-sizes', type=int, nargs='+', default=[4, 8, 16])
+    args = parser.parse_args()
+
+    if args.mode == 'pipeline':
+        run_benchmark(args.count, args.latency, args.threads, args.download_workers, args.ocr_workers)
+    elif args.mode == 'mosaic':
+        run_mosaic_benchmark(args.count, args.batch_sizes)
+    else:
+        run_prefilter_report(args.raw_file, args.limit)
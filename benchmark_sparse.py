@@ -0,0 +1,156 @@
+# benchmark_sparse.py
+# Benchmark fitur model: dense (.toarray(), cara lama) vs CSR end-to-end.
+#   features : TF-IDF + proxy untuk N judul sintetis -> ukuran matriks, puncak alokasi (tracemalloc) & waktu
+#   train    : fit ModelTrainer (Stacking SVC + RF) dengan matriks dense vs CSR pada subset data
+#   predict  : prediksi satu judul (alur run_analysis) dense vs CSR, latensi p50/p99
+#
+# Contoh:
+#   python benchmark_sparse.py features --rows 100000 --vocab 30000
+#   python benchmark_sparse.py train --rows 3000
+#   python benchmark_sparse.py predict --rows 3000 --requests 500
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+from model_trainer import ModelTrainer, stack_features, fit_feature_width, predict_proba_sparse
+from nlp_processor import NLPProcessor
+
+
+def make_corpus(rows: int, vocab: int, seed: int = 0) -> list:
+    """Judul + tags sintetis, frekuensi kata mengikuti distribusi Zipf (mirip teks asli)."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, vocab + 1) ** 1.05
+    lengths = rng.integers(6, 20, rows)
+    words = rng.choice(vocab, size=int(lengths.sum()), p=weights / weights.sum())
+    texts = []
+    start = 0
+    for length in lengths:
+        texts.append(' '.join(f"w{w}" for w in words[start:start + length]))
+        start += length
+    return texts
+
+
+def measure(fn):
+    """Return (hasil, detik, puncak alokasi byte). numpy/scipy tercatat di tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    wall = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, wall, peak
+
+
+def matrix_bytes(X) -> int:
+    if hasattr(X, 'indptr'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+
+def _mb(value: float) -> str:
+    return f"{value / 1024 ** 2:,.1f} MB"
+
+
+def prepare(rows: int, vocab: int, seed: int):
+    texts = make_corpus(rows, vocab, seed)
+    nlp = NLPProcessor()
+    nlp.train_vectorizer(texts)
+    proxy = np.column_stack(([nlp.analyze_title_emotion(t) for t in texts], np.zeros(len(texts))))
+    labels = (np.random.default_rng(seed + 1).random(len(texts)) < 0.25).astype(int)
+    return texts, nlp, proxy, labels
+
+
+def run_features(rows: int, vocab: int, seed: int, max_dense_gb: float):
+    texts, nlp, proxy, _ = prepare(rows, vocab, seed)
+    dim = nlp.embedding_dim + proxy.shape[1]
+    print(f"\n[features] {rows} baris x {dim} kolom")
+
+    X_sparse, wall, peak = measure(lambda: stack_features(nlp.vectorizer.transform(texts), proxy))
+    print(f"   CSR   : matriks {_mb(matrix_bytes(X_sparse))}, puncak {_mb(peak)}, {wall:.2f}s "
+          f"({X_sparse.nnz / rows:.1f} nilai non-nol per baris)")
+
+    dense_bytes = rows * dim * 8
+    if dense_bytes > max_dense_gb * 1024 ** 3:
+        print(f"   dense : DILEWATI, butuh {_mb(dense_bytes)} hanya untuk matriks akhir "
+              f"(+ salinan saat np.concatenate) > batas --max-dense-gb {max_dense_gb}")
+        return
+    X_dense, wall, peak = measure(lambda: np.concatenate((nlp.vectorizer.transform(texts).toarray(), proxy), axis=1))
+    print(f"   dense : matriks {_mb(matrix_bytes(X_dense))}, puncak {_mb(peak)}, {wall:.2f}s")
+
+
+def train_pair(rows: int, vocab: int, seed: int):
+    texts, nlp, proxy, labels = prepare(rows, vocab, seed)
+    X_sparse = stack_features(nlp.vectorizer.transform(texts), proxy)
+    models = {}
+    for name, X in (('dense', X_sparse.toarray()), ('CSR', X_sparse)):
+        trainer = ModelTrainer()
+        _, wall, peak = measure(lambda: trainer.model.fit(X, labels))
+        print(f"   {name:<6}: fit {wall:.2f}s, puncak {_mb(peak)} (input {_mb(matrix_bytes(X))})")
+        models[name] = trainer.model
+    agreement = np.mean(models['dense'].predict(X_sparse.toarray()) == models['CSR'].predict(X_sparse))
+    print(f"   prediksi dense vs CSR sama: {agreement * 100:.2f}%")
+    return nlp, models
+
+
+def run_train(rows: int, vocab: int, seed: int):
+    print(f"\n[train] Stacking (SVC + RF), {rows} baris")
+    train_pair(rows, vocab, seed)
+
+
+def run_predict(rows: int, vocab: int, seed: int, requests: int):
+    print(f"\n[predict] {requests} prediksi satu judul, model dilatih dengan {rows} baris")
+    nlp, models = train_pair(rows, vocab, seed)
+    queries = make_corpus(requests, vocab, seed + 2)
+
+    def dense_path(text):
+        # Cara lama: vektor selebar vocabulary + np.concatenate per request
+        vec = nlp.get_semantic_embedding(text)
+        inp = np.concatenate((vec, [nlp.analyze_title_emotion(text), 0.0])).reshape(1, -1)
+        return models['dense'].predict_proba(inp)
+
+    def sparse_path(text):
+        vec = nlp.get_sparse_embedding(text)
+        inp = fit_feature_width(stack_features(vec, [nlp.analyze_title_emotion(text), 0.0]), models['CSR'].n_features_in_)
+        return predict_proba_sparse(models['CSR'], inp)
+
+    for name, path in (('dense', dense_path), ('CSR', sparse_path)):
+        latencies = []
+        for text in queries:
+            started = time.perf_counter()
+            path(text)
+            latencies.append(time.perf_counter() - started)
+        print(f"   {name:<6}: p50 {np.percentile(latencies, 50) * 1000:.2f} ms, "
+              f"p99 {np.percentile(latencies, 99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline fitur dense vs CSR.")
+    parser.add_argument('--seed', type=int, default=0)
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    p_feat = sub.add_parser('features', help="Memori & waktu membangun matriks fitur")
+    p_feat.add_argument('--rows', type=int, default=100000)
+    p_feat.add_argument('--vocab', type=int, default=30000)
+    p_feat.add_argument('--max-dense-gb', type=float, default=4.0, help="Mode dense dilewati jika matriks lebih besar")
+
+    p_train = sub.add_parser('train', help="Waktu & memori fit model (SVC O(n^2): pakai subset)")
+    p_train.add_argument('--rows', type=int, default=3000)
+    p_train.add_argument('--vocab', type=int, default=30000)
+
+    p_pred = sub.add_parser('predict', help="Latensi prediksi satu judul")
+    p_pred.add_argument('--rows', type=int, default=3000)
+    p_pred.add_argument('--vocab', type=int, default=30000)
+    p_pred.add_argument('--requests', type=int, default=500)
+
+    args = parser.parse_args()
+    if args.mode == 'features':
+        run_features(args.rows, args.vocab, args.seed, args.max_dense_gb)
+    elif args.mode == 'train':
+        run_train(args.rows, args.vocab, args.seed)
+    else:
+        run_predict(args.rows, args.vocab, args.seed, args.requests)
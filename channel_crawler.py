@@ -0,0 +1,242 @@
+# channel_crawler.py
+# Crawler kompetitor hemat kuota: semua video channel lewat playlist 'Uploads'.
+#   channels().list       : 1 unit per 50 channel (ambil ID playlist uploads)
+#   playlistItems().list  : 1 unit per 50 video (urut dari yang terbaru)
+#   videos().list         : 1 unit per 50 video (statistik + durasi)
+# Bandingkan dengan search(order=viewCount): 100 unit per panggilan.
+#
+# Contoh:
+#   python channel_crawler.py UCxxxx UCyyyy --top 10
+#   python channel_crawler.py --file competitors.txt --workers 8
+
+import argparse
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from data_fetcher import DataFetcher, VIDEO_DETAIL_BATCH_SIZE
+from journal_store import JournalStore
+
+_DURATION_PATTERN = re.compile(r'^P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$')
+
+
+def parse_duration(value: str) -> int:
+    """Durasi ISO 8601 YouTube ('PT1M5S') -> detik. Format tidak dikenal = 0."""
+    match = _DURATION_PATTERN.match(value or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+class ChannelCrawler:
+    """
+    Crawl semua upload dari banyak channel secara paralel, disimpan di disk (JournalStore).
+
+    - 'ch|<channel_id>'  : {'title', 'uploads', 'video_ids' (terbaru dulu), 'crawled_at',
+                            'backfill_token' (halaman upload lama berikutnya), 'backfill_done'}
+    - 'video|<video_id>' : baris video (judul, views, likes, durasi, ...)
+    Crawl berikutnya berhenti di video pertama yang sudah pernah dilihat (incremental), lalu
+    melanjutkan backfill upload lama yang terpotong --max-pages.
+    Ranking (views terbanyak) dihitung lokal dari store, tanpa search().
+    """
+
+    STORE_FILE = 'channel_crawl.json'
+
+    def __init__(self, fetcher: DataFetcher = None, store_file: str = None, workers: int = config.CHANNEL_CRAWL_WORKERS):
+        self.fetcher = fetcher or DataFetcher()
+        self.workers = workers
+        self.store = JournalStore(store_file or self.STORE_FILE)
+        self._lock = threading.Lock()
+        self.api_calls = 0
+
+    # --- Langkah 1: playlist uploads (50 channel per panggilan) ---
+    def resolve_uploads(self, channel_ids: list) -> dict:
+        uploads = {}
+        unknown = []
+        for channel_id in channel_ids:
+            entry = self.store.get(f"ch|{channel_id}")
+            if entry:
+                uploads[channel_id] = entry['uploads']
+            else:
+                unknown.append(channel_id)
+
+        for start in range(0, len(unknown), VIDEO_DETAIL_BATCH_SIZE):
+            batch = unknown[start:start + VIDEO_DETAIL_BATCH_SIZE]
+            try:
+                res = self._call(self.fetcher.youtube.channels().list(id=','.join(batch), part='contentDetails,snippet'))
+            except Exception as e:
+                print(f"❌ Gagal ambil playlist uploads ({len(batch)} channel): {e}")
+                continue
+            for item in res.get('items', []):
+                uploads[item['id']] = item['contentDetails']['relatedPlaylists']['uploads']
+                self.store.put(f"ch|{item['id']}", {
+                    'title': item['snippet']['title'],
+                    'uploads': uploads[item['id']],
+                    'video_ids': [],
+                    'crawled_at': None,
+                    'backfill_token': None,
+                    'backfill_done': False,
+                })
+        for channel_id in channel_ids:
+            if channel_id not in uploads:
+                print(f"⚠️ Channel {channel_id} tidak ditemukan.")
+        return uploads
+
+    def _call(self, request):
+        with self._lock:
+            self.api_calls += 1
+        # Langsung ke API (tanpa cache respons): halaman playlist & statistik harus terbaru,
+        # hasil crawl sendiri sudah disimpan di store crawler
+        return self.fetcher._execute_http(request)
+
+    # --- Langkah 2 & 3: halaman playlist -> statistik 50 ID ---
+    def _playlist_page(self, uploads: str, page_token: str):
+        res = self._call(self.fetcher.youtube.playlistItems().list(
+            playlistId=uploads, part='contentDetails',
+            maxResults=VIDEO_DETAIL_BATCH_SIZE, pageToken=page_token
+        ))
+        return [item['contentDetails']['videoId'] for item in res.get('items', [])], res.get('nextPageToken')
+
+    def crawl_channel(self, channel_id: str, max_pages: int = None) -> int:
+        """
+        Crawl upload satu channel. Return: jumlah video baru.
+        1. Upload baru: dari halaman teratas sampai video pertama yang sudah dikenal (tanpa batas halaman,
+           agar tidak ada celah antara upload baru dan yang lama).
+        2. Backfill upload lama: dilanjutkan dari 'backfill_token' sampai playlist habis atau max_pages.
+        """
+        entry = self.store.get(f"ch|{channel_id}")
+        known = set(entry['video_ids'])
+        new_ids = []
+        older_ids = []
+        pages = 0
+
+        page_token = None
+        while known:
+            page_ids, page_token = self._playlist_page(entry['uploads'], page_token)
+            pages += 1
+            fresh = []
+            reached_known = False
+            for vid_id in page_ids:
+                if vid_id in known:
+                    # Playlist uploads urut terbaru -> sisanya sudah pernah di-crawl
+                    reached_known = True
+                    break
+                fresh.append(vid_id)
+            self._store_video_stats(channel_id, fresh)
+            new_ids.extend(fresh)
+            if reached_known or not page_token:
+                break
+
+        # Entri lama (tanpa flag) dianggap belum lengkap: backfill dari awal, video yang dikenal dilewati
+        backfill_done = entry.get('backfill_done', False)
+        page_token = entry.get('backfill_token')
+        while not backfill_done and not (max_pages and pages >= max_pages):
+            page_ids, page_token = self._playlist_page(entry['uploads'], page_token)
+            pages += 1
+            fresh = [vid_id for vid_id in page_ids if vid_id not in known and vid_id not in new_ids]
+            self._store_video_stats(channel_id, fresh)
+            older_ids.extend(fresh)
+            backfill_done = not page_token
+
+        # Entri channel ditulis terakhir: jika crash di tengah, channel ini di-crawl ulang
+        self.store.put(f"ch|{channel_id}", dict(entry, video_ids=new_ids + entry['video_ids'] + older_ids,
+                                                backfill_token=None if backfill_done else page_token,
+                                                backfill_done=backfill_done, crawled_at=time.time()))
+        return len(new_ids) + len(older_ids)
+
+    def _store_video_stats(self, channel_id: str, video_ids: list):
+        if not video_ids:
+            return
+        res = self._call(self.fetcher.youtube.videos().list(
+            part='snippet,statistics,contentDetails', id=','.join(video_ids)
+        ))
+        for item in res.get('items', []):
+            stats = item.get('statistics', {})
+            self.store.put(f"video|{item['id']}", {
+                'id': item['id'],
+                'channel_id': channel_id,
+                'title': item['snippet']['title'],
+                'tags': item['snippet'].get('tags'),
+                'published_at': item['snippet'].get('publishedAt'),
+                'duration_sec': parse_duration(item.get('contentDetails', {}).get('duration')),
+                'views': int(stats.get('viewCount', 0)),
+                'likes': int(stats.get('likeCount', 0)),
+                'comments': int(stats.get('commentCount', 0)),
+                'thumbnail': item['snippet']['thumbnails']['high']['url'],
+            })
+
+    def refresh_stats(self, channel_id: str):
+        """Perbarui views/likes video yang sudah tersimpan (1 unit per 50 video)."""
+        entry = self.store.get(f"ch|{channel_id}")
+        for start in range(0, len(entry['video_ids']), VIDEO_DETAIL_BATCH_SIZE):
+            self._store_video_stats(channel_id, entry['video_ids'][start:start + VIDEO_DETAIL_BATCH_SIZE])
+
+    # --- Paralel lintas channel ---
+    def crawl(self, channel_ids: list, max_pages: int = None, refresh: bool = False) -> dict:
+        """Return: {channel_id: jumlah video baru}. refresh=True juga memperbarui statistik video lama."""
+        spent_before = self.fetcher.quota.spent_today()
+        uploads = self.resolve_uploads(list(dict.fromkeys(channel_ids)))
+        results = {}
+
+        def crawl_one(channel_id):
+            try:
+                if refresh:
+                    self.refresh_stats(channel_id)
+                return channel_id, self.crawl_channel(channel_id, max_pages)
+            except Exception as e:
+                print(f"❌ Gagal crawl channel {channel_id}: {e}")
+                return channel_id, 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for channel_id, new_count in executor.map(crawl_one, list(uploads)):
+                results[channel_id] = new_count
+                print(f"   ✅ {self.store.get(f'ch|{channel_id}')['title']}: {new_count} video baru")
+
+        spent = self.fetcher.quota.spent_today() - spent_before
+        print(f"-> {sum(results.values())} video baru dari {len(results)} channel | "
+              f"{self.api_calls} panggilan API, ~{spent} unit kuota")
+        return results
+
+    # --- Ranking lokal ---
+    def top_videos(self, channel_id: str, n: int = 5, shorts_only: bool = True) -> list:
+        entry = self.store.get(f"ch|{channel_id}")
+        if not entry:
+            return []
+        videos = [self.store.get(f"video|{vid_id}") for vid_id in entry['video_ids']]
+        videos = [v for v in videos if v and (not shorts_only or 0 < v['duration_sec'] <= config.SHORTS_MAX_SECONDS)]
+        return sorted(videos, key=lambda v: v['views'], reverse=True)[:n]
+
+    def close(self):
+        self.store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl semua Shorts kompetitor lewat playlist uploads.")
+    parser.add_argument('channels', nargs='*', help="Channel ID (UC...)")
+    parser.add_argument('--file', help="File berisi satu channel ID per baris")
+    parser.add_argument('--workers', type=int, default=config.CHANNEL_CRAWL_WORKERS)
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help="Batas halaman (50 video) per channel; upload lama dilanjutkan pada run berikutnya")
+    parser.add_argument('--refresh-stats', action='store_true', help="Perbarui juga views video yang sudah pernah di-crawl")
+    parser.add_argument('--top', type=int, default=5, help="Tampilkan N Shorts dengan views terbanyak per channel")
+    args = parser.parse_args()
+
+    channel_ids = list(args.channels)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            channel_ids += [line.strip() for line in f if line.strip()]
+
+    crawler = ChannelCrawler(workers=args.workers)
+    try:
+        crawler.fetcher.quota.set_stage('channel-crawl')
+        crawler.crawl(channel_ids, max_pages=args.max_pages, refresh=args.refresh_stats)
+        for channel_id in channel_ids:
+            for rank, video in enumerate(crawler.top_videos(channel_id, args.top), 1):
+                print(f"   {channel_id} #{rank}: {video['views']:>10,} views | {video['title']}")
+    finally:
+        # Entri cache & kuota yang masih antre di thread penulis ikut tersimpan
+        crawler.close()
+        crawler.fetcher.close()
@@ -7,7 +7,14 @@ load_dotenv()
 # --- Kunci API (Ganti dengan Kunci Anda) ---
 # Penting: JANGAN upload API key ke repository publik!
 YOUTUBE_API_KEY = os.environ.get("YOUTUBE_API_KEY") 
+# Opsional: beberapa key (satu per project Google Cloud), dipisah koma. Budget kuota harian berlaku per key;
+# key yang membalas quotaExceeded otomatis diganti key berikutnya.
+YOUTUBE_API_KEYS = [key.strip() for key in os.getenv("YOUTUBE_API_KEYS", "").split(',') if key.strip()] or [YOUTUBE_API_KEY]
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Opsional: arahkan klien YouTube ke server lain (mis. fake API lokal http://127.0.0.1:8765)
+YOUTUBE_API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT")
+TRENDS_ENDPOINT = os.getenv("TRENDS_ENDPOINT")           # Server Trends lokal (fake_services.py), kosong = Google Trends asli
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")   # Endpoint Gemini lokal (fake_services.py), kosong = Google
 # Jika menggunakan pytrends, tidak perlu kunci eksplisit
 # Tesseract OCR path (sesuaikan dengan lokasi instalasi Anda)
 TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
@@ -15,4 +22,64 @@ TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 # --- Konstanta Proyek ---
 SEARCH_REGION = 'ID' # Indonesia
 MAX_TRENDING_KEYWORDS = 50 # Jumlah keyword yang diambil dari Trends
-MAX_VIDEOS_PER_QUERY = 10  # Jumlah video kompetitor yang diambil per keyword
\ No newline at end of file
+MAX_VIDEOS_PER_QUERY = 10  # Jumlah video kompetitor yang diambil per keyword
+
+# --- OCR Thumbnail ---
+OCR_PREFILTER = False           # True = tolak thumbnail tanpa teks dengan OpenCV sebelum memanggil Tesseract (density bisa berbeda dari OCR penuh)
+OCR_PREFILTER_WIDTH = 320       # Lebar gambar (px) saat deteksi area teks
+OCR_PREFILTER_MIN_GRADIENT = 40 # Batas bawah gradien agar noise JPEG tidak dianggap teks
+OCR_FAST_DENSITY = False        # True = density diperkirakan dari luas area teks saja (tanpa Tesseract)
+OCR_FAST_DENSITY_MIN_AREA = 0.01 # Fraksi luas area teks minimal agar dianggap ada teks (kalibrasi: benchmark_ocr.py prefilter)
+
+# --- Thumbnail Store (disk lokal) ---
+THUMBNAIL_STORE_MAX_MB = 2048      # Batas ukuran total, lewat dari ini dibuang secara LRU
+THUMBNAIL_REVALIDATE_HOURS = 24 * 7 # Setelah ini, thumbnail dicek ulang (ETag/Last-Modified)
+OCR_THUMBNAIL_VARIANT = 'hqdefault' # Varian ytimg untuk OCR (fitur lain boleh pakai 'mqdefault'/'default')
+OCR_PHASH_MAX_DISTANCE = 6 # Jarak Hamming dHash maksimal agar hasil OCR dipakai ulang (-1 = dedup mati)
+OCR_MOSAIC_BATCH = 1       # >1 = tempel N thumbnail dalam satu kanvas per panggilan Tesseract (mode mosaic)
+OCR_TESSERACT_CONFIG = ''  # Argumen tambahan Tesseract (mis. '--psm 11'); ikut menentukan fingerprint cache
+OCR_ACCEPT_LEGACY_CACHE = True # Pakai entri ocr_cache.json format lama (angka density saja) selama belum di-OCR ulang
+
+# --- Scheduler Pengumpulan Data (data_collector.py) ---
+COLLECT_CONCURRENCY = 8    # Jumlah keyword yang dicari bersamaan
+COLLECT_RATE_PER_SEC = 5.0 # Rata-rata request API per detik (token bucket)
+COLLECT_BURST = 10         # Maksimal request yang boleh langsung jalan berbarengan
+COLLECT_MAX_RETRIES = 5    # Retry 403/429/5xx dengan jittered exponential backoff
+
+# --- Cache Respons YouTube Data API (api_cache.json) ---
+API_CACHE_ENABLED = True
+API_CACHE_SEARCH_TTL_HOURS = 12 # Hasil search().list dianggap segar selama ini
+API_CACHE_STATS_TTL_HOURS = 2   # videos()/channels() (views, likes) lebih cepat berubah
+API_CACHE_STALE_HOURS = 24 * 3  # Setelah TTL habis, data basi masih dipakai sambil di-refresh di background
+
+# --- Kuota YouTube Data API ---
+YOUTUBE_DAILY_QUOTA_BUDGET = 10000 # Unit per hari per API key (reset tengah malam waktu Pasifik); search = 100, videos/playlist = 1
+
+# --- Google Trends ---
+TRENDS_ANCHOR_KEYWORD = 'motivasi' # Anchor di setiap payload; pilih yang volumenya setara keyword niche (anchor terlalu populer membuat skor lain jadi 0)
+DEMAND_TTL_HOURS = 24 * 3        # Demand score (Trends 12 bulan) dianggap segar selama ini
+DEMAND_WARM_INTERVAL_MIN = 30    # Warmer background mengecek keyword basi setiap N menit
+DEMAND_RETRY_BASE_MIN = 15       # Keyword yang gagal di-refresh ditunda N menit, 2x lipat tiap kegagalan berikutnya (maks. TTL)
+
+# --- Checkpoint Pengumpulan Data ---
+COLLECT_MAX_AGE_HOURS = 24 * 7 # Mode --incremental: keyword dengan hasil lebih tua dari ini dicari ulang
+
+# --- Transkrip Video ---
+TRANSCRIPT_WORKERS = 8            # Thread paralel pengambil subtitle (CC)
+TRANSCRIPT_NONE_TTL_HOURS = 24 * 7 # Hasil "tanpa CC" (deskripsi / kosong) dicek ulang setelah ini
+
+# --- Channel Crawler (channel_crawler.py) ---
+CHANNEL_CRAWL_WORKERS = 8 # Channel yang di-crawl bersamaan
+SHORTS_MAX_SECONDS = 180  # Durasi maksimal agar video dihitung sebagai Shorts
+
+# --- AsyncDataFetcher (async_data_fetcher.py, butuh aiohttp) ---
+ASYNC_MAX_CONNECTIONS = 64 # Ukuran pool koneksi keep-alive bersama
+
+# --- Stats Tracker (stats_tracker.py) ---
+STATS_TRACKER_INTERVAL_HOURS = 6 # Jarak minimal antar snapshot statistik per video
+STATS_TRACKER_WORKERS = 8        # Batch videos().list yang dikirim bersamaan
+STATS_TRACKER_RATE_PER_SEC = 10.0 # Token bucket request/s untuk refresh statistik
+STATS_SERIES_MAX_POINTS = 120    # Titik snapshot yang disimpan per video (yang lama dibuang)
+
+# --- Koleksi Ter-shard (data_collector.py --shards N) ---
+COLLECT_SHARD_DIR = 'collect_shards' # Folder kerja sementara per proses shard (diserap ke file utama setelah run)
\ No newline at end of file
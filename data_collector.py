@@ -1,20 +1,30 @@
 # data_collector.py
 
 import json
-from data_fetcher import DataFetcher
+from data_fetcher import DataFetcher, VideoDetailBatcher
 from core.video_case import VideoCase
 import config
 import sys
 import os
 import time
+import argparse
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from rate_limiter import TokenBucket, call_with_backoff
+from journal_store import JournalStore
+from quota_ledger import QuotaLedger
+from api_cache import ResponseCache
+from raw_data_io import JsonlWriter, RAW_JSONL_FILE, iter_jsonl_offsets, read_jsonl_record
 
 # Memastikan proyek bisa menemukan modul
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
 # --- KONFIGURASI PENGUMPULAN ---
-OUTPUT_FILE = 'raw_shorts_data.json'
+OUTPUT_FILE = RAW_JSONL_FILE # JSON Lines: satu video per baris, ditulis begitu detailnya datang
 KEYWORD_FILE = 'keywords.json'
+CHECKPOINT_FILE = 'collect_checkpoint.json'
 VIDEOS_PER_QUERY = 10 
 
 
@@ -36,54 +46,359 @@ def load_keywords():
         return []
 
 
-def collect_raw_data():
-    fetcher = DataFetcher()
-    all_raw_data = []
+class CollectProgress:
+    """Progress live (satu baris) untuk scheduler keyword yang berjalan paralel."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.videos = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self, found: int = 0, ok: bool = True):
+        with self._lock:
+            self.done += 1
+            self.videos += found
+            if not ok:
+                self.failed += 1
+            elapsed = time.monotonic() - self.started_at
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self.done) / rate if rate > 0 else 0.0
+            print(f"\r   [{self.done}/{self.total}] {rate:5.2f} keyword/s | {self.videos} ID | "
+                  f"gagal {self.failed} | ETA {eta:5.0f}s ", end='', flush=True)
+
+
+class CollectCheckpoint:
+    """
+    Checkpoint pengumpulan per keyword (JournalStore: setiap perubahan langsung di-append ke journal).
+    'kw|<keyword>' = {'ids': [...], 'fetched_at': timestamp}, ditulis SETELAH baris videonya
+    masuk ke file JSONL. Jika proses mati di tengah jalan, keyword yang belum lengkap dianggap belum selesai.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        self.store = JournalStore(path)
+
+    def keyword_age_hours(self, keyword: str):
+        entry = self.store.get(f"kw|{keyword}")
+        return None if entry is None else (time.time() - entry['fetched_at']) / 3600
+
+    def pending_keywords(self, keywords: list, max_age_hours: float = None) -> list:
+        """Keyword yang perlu dicari: belum pernah selesai, atau hasilnya lebih tua dari max_age_hours."""
+        if max_age_hours is None:
+            return list(keywords)
+        pending = []
+        for keyword in keywords:
+            age = self.keyword_age_hours(keyword)
+            if age is None or age > max_age_hours:
+                pending.append(keyword)
+        return pending
+
+    def save_keyword(self, keyword: str, video_ids: list):
+        self.store.put(f"kw|{keyword}", {'ids': list(video_ids), 'fetched_at': time.time()})
+
+    def reset(self):
+        for key in self.store.keys():
+            self.store.delete(key)
+
+    def close(self):
+        self.store.close()
+
+
+def video_to_row(video) -> dict:
+    return {
+        'id': video.video_id,
+        'title': video.title,
+        'tags': video.raw_tags,
+        'views': video.raw_views,
+        'likes': video.raw_likes,
+        'comments': video.raw_comments,
+        'thumbnail': video.thumbnail_url # Pastikan ini tersimpan untuk OCR nanti
+    }
+
+
+def collect_raw_data(concurrency: int = config.COLLECT_CONCURRENCY, rate: float = config.COLLECT_RATE_PER_SEC,
+                     burst: int = config.COLLECT_BURST, resume: bool = False, max_age_hours: float = None,
+                     api_keys: list = None):
+    """
+    resume=True        : lanjutkan run yang terputus (keyword yang sudah selesai dilewati).
+    max_age_hours=N    : mode incremental, hanya cari keyword baru / yang hasilnya lebih tua dari N jam.
+    Default            : semua keyword dicari ulang (checkpoint tetap ditulis).
+    api_keys=[...]     : pool API key untuk run ini (default: config.YOUTUBE_API_KEYS).
+    Return: pemakaian kuota hari ini (ledger yang dipakai run ini), setelah semua store ditutup.
+    """
+    fetcher = DataFetcher(api_keys=api_keys)
+    # Semua request (search + detail) berbagi satu token bucket -> tidak dianggap spam oleh YouTube
+    limiter = TokenBucket(rate, burst)
+    # Detail video (videos().list) digabung lintas keyword: 50 ID per panggilan, tanpa duplikat
+    batcher = VideoDetailBatcher(fetcher, max_wait=1.0, limiter=limiter, retries=config.COLLECT_MAX_RETRIES)
+    checkpoint = CollectCheckpoint()
     
     # 1. Load Keywords dari File (Bukan Hardcode)
-    keywords_list = load_keywords()
+    all_keywords = load_keywords()
     
-    if not keywords_list:
-        return
+    if not all_keywords:
+        checkpoint.close()
+        usage = fetcher.quota.usage_today()
+        fetcher.close()
+        return usage
+
+    if resume:
+        max_age_hours = float('inf')
+    keywords_list = checkpoint.pending_keywords(all_keywords, max_age_hours)
+    skipped = len(all_keywords) - len(keywords_list)
+    if skipped:
+        print(f"-> Checkpoint: {skipped} keyword dilewati (sudah selesai), {len(keywords_list)} keyword dicari.")
+
+    # Budget kuota: keyword yang tidak muat hari ini ditunda (search = 100 unit per keyword)
+    fetcher.quota.set_stage('collect')
+    keywords_list, deferred = fetcher.planner.plan_keywords(keywords_list, VIDEOS_PER_QUERY)
+    if deferred:
+        print(f"⚠️ Sisa kuota {fetcher.quota.remaining()} unit: {len(deferred)} keyword ditunda ke hari berikutnya "
+              f"(mulai dari '{deferred[0]}').")
 
     TARGET_TOTAL = len(keywords_list) * VIDEOS_PER_QUERY
     print(f"-> Target Data: {TARGET_TOTAL} Shorts...")
+    print(f"-> Scheduler: {concurrency} keyword paralel, limit {rate} request/s (burst {burst})")
     
-    for i, keyword in enumerate(keywords_list):
-        print(f"   [{i+1}/{len(keywords_list)}] Mencari: '{keyword}'")
-        
-        # --- PERBAIKAN STABILITAS: JEDA WAKTU ---
-        # Beri napas sedikit agar tidak dianggap spam oleh YouTube
-        # Tidur 1 detik setiap request
-        time.sleep(1) 
-        
+    # Run baru menimpa file (checkpoint lama ikut dibuang);
+    # resume/incremental menambah di akhir (versi terbaru sebuah video = baris terakhir)
+    append = resume or max_age_hours is not None
+    if not append:
+        checkpoint.reset()
+    writer = JsonlWriter(OUTPUT_FILE, append=append)
+    written_ids = set()
+    written_lock = threading.Lock()
+    progress = CollectProgress(len(keywords_list))
+
+    def on_retry(error, attempt, delay):
+        print(f"\n     ⏳ Retry #{attempt} dalam {delay:.1f}s: {error}")
+
+    def search_keyword(keyword):
+        def search():
+            limiter.acquire()
+            return fetcher._search_video_ids(keyword, max_results=VIDEOS_PER_QUERY)
+
         try:
-            video_list = fetcher.search_youtube_videos(keyword, max_results=VIDEOS_PER_QUERY)
-            
-            if video_list:
-                for video in video_list:
-                    all_raw_data.append({
-                        'id': video.video_id,
-                        'title': video.title,
-                        'tags': video.raw_tags,
-                        'views': video.raw_views,
-                        'likes': video.raw_likes,
-                        'comments': video.raw_comments,
-                        'thumbnail': video.thumbnail_url # Pastikan ini tersimpan untuk OCR nanti
-                    })
-                print(f"     ✅ Dapat {len(video_list)} video.")
-            else:
-                print(f"     ⚠️ Nihil.")
-                
+            video_ids = call_with_backoff(search, retries=config.COLLECT_MAX_RETRIES, on_retry=on_retry)
         except Exception as e:
-            print(f"     ❌ Error pada keyword ini: {e}")
+            print(f"\n     ❌ Error pada keyword '{keyword}': {e}")
+            progress.update(ok=False)
+            return
+        if video_ids:
+            future = batcher.submit(video_ids, strict=True)
+            future.add_done_callback(lambda f: save_details(keyword, f))
+        else:
+            checkpoint.save_keyword(keyword, [])
+        progress.update(found=len(video_ids))
+
+    def save_details(keyword, future):
+        if future.exception() is not None:
+            # Tidak di-checkpoint -> keyword ini dicari ulang pada --resume
+            print(f"\n     ❌ Detail video keyword '{keyword}' gagal: {future.exception()}")
+            return
+        videos = future.result()
+        with written_lock:
+            fresh = [video for video in videos if video.video_id not in written_ids]
+            written_ids.update(video.video_id for video in fresh)
+        writer.write([video_to_row(video) for video in fresh])
+        checkpoint.save_keyword(keyword, [video.video_id for video in videos])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for keyword in keywords_list:
+            executor.submit(search_keyword, keyword)
+    print()
+
+    # 2. Ambil sisa detail video (baris terakhir ikut ditulis ke JSONL lewat callback)
+    batcher.close()
+    writer.close()
+    checkpoint.close()
+    print(f"-> Detail video: {batcher.stats()}")
+    if fetcher.cache:
+        print(f"-> {fetcher.cache.stats()}")
+    print(fetcher.quota.report())
     
-    # Menyimpan ke file JSON
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_raw_data, f, ensure_ascii=False, indent=4)
-        
-    print(f"✅ Data mentah berhasil disimpan di {OUTPUT_FILE}")
+    print(f"✅ {writer.written} video baru ditulis ke {OUTPUT_FILE}")
+    # Ditutup eksplisit: proses shard (ProcessPoolExecutor) tidak menjalankan atexit
+    usage = fetcher.quota.usage_today()
+    fetcher.close()
+    return usage
+
+
+# --- KOLEKSI TER-SHARD (multi-proses, pool API key dibagi per shard) ---
+# Folder shard hanya tempat kerja sementara: checkpoint & cache API utama disalin masuk sebelum run
+# dan hasilnya diserap kembali sesudahnya, jadi jumlah --shards boleh berubah antar run.
+def _prepare_shard(shard_dir: str, keywords: list, api_keys: list, seed_usage: dict, checkpoint: CollectCheckpoint):
+    """Siapkan folder shard baru: keyword, salinan cache API utama, checkpoint keyword-nya & ledger ter-seed."""
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    os.makedirs(shard_dir)
+    with open(os.path.join(shard_dir, KEYWORD_FILE), 'w', encoding='utf-8') as f:
+        json.dump(keywords, f, ensure_ascii=False)
+
+    # Cache API utama sebagai seed: shard tidak membayar ulang request yang masih segar
+    for name in (ResponseCache.CACHE_FILE, ResponseCache.CACHE_FILE + '.journal'):
+        if os.path.exists(name):
+            shutil.copyfile(name, os.path.join(shard_dir, name))
+
+    shard_checkpoint = CollectCheckpoint(os.path.join(shard_dir, CHECKPOINT_FILE))
+    for keyword in keywords:
+        entry = checkpoint.store.get(f"kw|{keyword}")
+        if entry is not None:
+            shard_checkpoint.store.put(f"kw|{keyword}", entry)
+    shard_checkpoint.close()
+
+    # Ledger shard di-seed dengan pemakaian key-nya hari ini (dari ledger utama)
+    ledger = QuotaLedger(ledger_file=os.path.join(shard_dir, QuotaLedger.LEDGER_FILE), api_keys=api_keys)
+    ledger.add_usage(seed_usage)
+    ledger.close()
+
+
+def _collect_shard(shard_dir: str, api_keys: list, options: dict) -> dict:
+    """
+    Dijalankan di proses shard. Semua file kerja (keyword, checkpoint, cache API, ledger, output)
+    relatif terhadap folder shard, jadi tidak ada JournalStore yang dibuka dua proses sekaligus.
+    Return: pemakaian kuota hari ini dari ledger shard.
+    """
+    os.chdir(shard_dir)
+    # Pemakaian diambil dari ledger yang dipakai run (bukan instance kedua di file yang sama)
+    return collect_raw_data(api_keys=api_keys, **options)
+
+
+def _shard_dirs(base_dir: str) -> list:
+    if not os.path.isdir(base_dir):
+        return []
+    names = [name for name in os.listdir(base_dir) if name.startswith('shard-')]
+    return [os.path.join(base_dir, name) for name in sorted(names, key=lambda name: int(name.split('-')[1]))]
+
+
+def _absorb_newer(target: JournalStore, source_file: str):
+    """Salin entri source ke target jika belum ada atau lebih baru (fetched_at)."""
+    if not (os.path.exists(source_file) or os.path.exists(source_file + '.journal')):
+        return
+    source = JournalStore(source_file)
+    for key, entry in source.items():
+        current = target.get(key)
+        if current is None or entry.get('fetched_at', 0) > current.get('fetched_at', 0):
+            target.put(key, entry)
+    source.close()
+
+
+def absorb_shards(base_dir: str, append: bool, keep_results: bool = True):
+    """
+    Serap folder shard ke file utama lalu hapus foldernya:
+    output JSONL (merge_shard_outputs) & checkpoint jika keep_results, cache API selalu.
+    Return: jumlah video di output utama (None jika output tidak digabung).
+    """
+    shard_dirs = _shard_dirs(base_dir)
+    if not shard_dirs:
+        return None
+    total = merge_shard_outputs(shard_dirs, OUTPUT_FILE, append=append) if keep_results else None
+    for name in ((CHECKPOINT_FILE, ResponseCache.CACHE_FILE) if keep_results else (ResponseCache.CACHE_FILE,)):
+        target = JournalStore(name)
+        for shard_dir in shard_dirs:
+            _absorb_newer(target, os.path.join(shard_dir, name))
+        target.close()
+    for shard_dir in shard_dirs:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    return total
+
+
+def merge_shard_outputs(shard_dirs: list, output_file: str = OUTPUT_FILE, append: bool = False) -> int:
+    """
+    Gabungkan output shard ke satu file JSONL, dedup per video ID.
+    Deterministik: urutan sumber tetap (file lama, lalu shard 0..N-1; versi terakhir yang dipakai)
+    dan hasil ditulis urut video ID, tidak tergantung shard mana yang selesai duluan.
+    Memori: hanya indeks video ID -> (sumber, posisi byte); record dibaca ulang satu per satu saat ditulis.
+    """
+    sources = [output_file] if append and os.path.exists(output_file) else []
+    sources += [path for path in (os.path.join(shard_dir, OUTPUT_FILE) for shard_dir in shard_dirs)
+                if os.path.exists(path)]
+    index = {}
+    for source_no, path in enumerate(sources):
+        for offset, record in iter_jsonl_offsets(path):
+            index[record['id']] = (source_no, offset)
+
+    tmp_file = output_file + '.tmp'
+    files = [open(path, 'rb') for path in sources]
+    writer = JsonlWriter(tmp_file, append=False)
+    try:
+        for vid_id in sorted(index):
+            source_no, offset = index[vid_id]
+            writer.write([read_jsonl_record(files[source_no], offset)])
+    finally:
+        writer.close()
+        for f in files:
+            f.close()
+    os.replace(tmp_file, output_file)
+    return len(index)
+
+
+def collect_sharded(shards: int, concurrency: int = config.COLLECT_CONCURRENCY, rate: float = config.COLLECT_RATE_PER_SEC,
+                    burst: int = config.COLLECT_BURST, resume: bool = False, max_age_hours: float = None,
+                    api_keys: list = None):
+    """
+    Bagi keywords.json ke beberapa proses; setiap shard mendapat minimal satu API key sendiri
+    (rate & concurrency berlaku per shard). Checkpoint & cache API tetap di file utama
+    (disalin ke shard, diserap kembali setelah selesai), jadi --resume dan cache tetap berlaku
+    walaupun jumlah shard berubah.
+    """
+    api_keys = list(api_keys or config.YOUTUBE_API_KEYS)
+    shards = max(min(shards, len(api_keys)), 1)
+    all_keywords = load_keywords()
+    if not all_keywords:
+        return
+
+    append = resume or max_age_hours is not None
+    base_dir = os.path.abspath(config.COLLECT_SHARD_DIR)
+    # Sisa run ter-shard sebelumnya (mis. terputus): hasilnya diserap dulu agar --resume bisa melanjutkan
+    if absorb_shards(base_dir, append=append, keep_results=append) is not None:
+        print("-> Sisa folder shard dari run sebelumnya sudah digabung ke file utama.")
+
+    shard_dirs = [os.path.join(base_dir, f"shard-{i}") for i in range(shards)]
+    shard_keys = [api_keys[i::shards] for i in range(shards)]
+    options = {'concurrency': concurrency, 'rate': rate, 'burst': burst, 'resume': resume, 'max_age_hours': max_age_hours}
+    print(f"-> Koleksi ter-shard: {shards} proses, {len(api_keys)} API key, {len(all_keywords)} keyword")
+
+    ledger = QuotaLedger(api_keys=api_keys)
+    seeds = [ledger.usage_today(keys) for keys in shard_keys]
+    checkpoint = CollectCheckpoint()
+    if not append:
+        checkpoint.reset()
+    for i in range(shards):
+        _prepare_shard(shard_dirs[i], all_keywords[i::shards], shard_keys[i], seeds[i], checkpoint)
+    checkpoint.close()
+
+    with ProcessPoolExecutor(max_workers=shards) as executor:
+        futures = [executor.submit(_collect_shard, shard_dirs[i], shard_keys[i], options) for i in range(shards)]
+        for i, future in enumerate(futures):
+            try:
+                ledger.add_usage(future.result(), already_counted=seeds[i])
+            except Exception as e:
+                print(f"❌ Shard {i} gagal: {e}")
+    print(ledger.report())
+    ledger.close()
+
+    total = absorb_shards(base_dir, append=append)
+    print(f"✅ {total} video unik digabung ke {OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
-    collect_raw_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Kumpulkan data mentah Shorts dari daftar keyword.")
+    parser.add_argument('--concurrency', type=int, default=config.COLLECT_CONCURRENCY, help="Keyword yang dicari bersamaan")
+    parser.add_argument('--rate', type=float, default=config.COLLECT_RATE_PER_SEC, help="Request API per detik")
+    parser.add_argument('--burst', type=int, default=config.COLLECT_BURST, help="Kapasitas burst token bucket")
+    parser.add_argument('--resume', action='store_true', help="Lanjutkan run yang terputus dari checkpoint")
+    parser.add_argument('--incremental', action='store_true', help="Hanya cari keyword baru / yang hasilnya sudah tua")
+    parser.add_argument('--max-age-hours', type=float, default=config.COLLECT_MAX_AGE_HOURS,
+                        help="Batas umur hasil keyword untuk mode --incremental")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="Jumlah proses paralel; API key di config.YOUTUBE_API_KEYS dibagi ke setiap shard")
+    args = parser.parse_args()
+
+    options = dict(concurrency=args.concurrency, rate=args.rate, burst=args.burst, resume=args.resume,
+                   max_age_hours=args.max_age_hours if args.incremental else None)
+    if args.shards > 1:
+        collect_sharded(args.shards, **options)
+    else:
+        collect_raw_data(**options)
\ No newline at end of file
@@ -1,65 +1,165 @@
 # data_fetcher.py - UPDATED FOR V3.0
 
 from googleapiclient.discovery import build
+import httplib2
 from pytrends.request import TrendReq
 from youtube_transcript_api import YouTubeTranscriptApi # <--- LIBRARY BARU
 from youtube_transcript_api.formatters import TextFormatter
+try:
+    from youtube_transcript_api import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
+    TRANSCRIPT_MISSING_ERRORS = (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable)
+except ImportError:
+    TRANSCRIPT_MISSING_ERRORS = ()
 import config
 from core.video_case import VideoCase
+from rate_limiter import TokenBucket, call_with_backoff, is_quota_error
+from api_cache import ResponseCache
+from quota_ledger import QuotaLedger, QuotaPlanner, key_label
 import time
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from journal_store import JournalStore
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+VIDEO_DETAIL_BATCH_SIZE = 50 # Batas ID per panggilan videos().list
+TRENDS_PAYLOAD_SIZE = 5       # Batas keyword per build_payload (Google Trends)
+TRANSCRIPT_CACHE_FILE = 'transcript_cache.json'
+
+
+def with_api_key(uri: str, api_key: str) -> str:
+    """Ganti parameter key= pada URI request (rotasi pool API key)."""
+    parts = urlsplit(uri)
+    params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != 'key']
+    params.append(('key', api_key))
+    return urlunsplit(parts._replace(query=urlencode(params)))
 
 class DataFetcher:
-    def __init__(self):
-        # Gunakan API Key dari Config
-        self.youtube = build('youtube', 'v3', developerKey=config.YOUTUBE_API_KEY)
-        self.trends_connector = TrendReq(hl='id-ID', tz=420, retries=2, backoff_factor=0.1)
+    def __init__(self, use_cache: bool = config.API_CACHE_ENABLED, api_keys: list = None):
+        # Gunakan API Key dari Config (atau pool key: QuotaLedger memilih key per request)
+        api_keys = list(api_keys or config.YOUTUBE_API_KEYS)
+        # YOUTUBE_API_ENDPOINT bisa diarahkan ke server lokal (fake API) untuk uji/benchmark tanpa kuota
+        client_options = {'api_endpoint': config.YOUTUBE_API_ENDPOINT} if config.YOUTUBE_API_ENDPOINT else None
+        self.youtube = build('youtube', 'v3', developerKey=api_keys[0], client_options=client_options)
+        if config.TRENDS_ENDPOINT:
+            from fake_services import FakeTrendsClient
+            self.trends_connector = FakeTrendsClient(config.TRENDS_ENDPOINT)
+        else:
+            self.trends_connector = TrendReq(hl='id-ID', tz=420, retries=2, backoff_factor=0.1)
+        # TrendReq menyimpan payload di objeknya (tidak thread-safe): build_payload + baca hasil
+        # harus satu paket. Semua pemakaian trends_connector (GUI, DemandStore, warmer) lewat lock ini.
+        self._trends_lock = threading.Lock()
+        # httplib2 tidak thread-safe -> satu koneksi per thread
+        self._local = threading.local()
+        # Cache respons di disk: keyword yang sama tidak memakan kuota/round-trip lagi
+        self.cache = ResponseCache() if use_cache else None
+        # Buku besar kuota harian (per endpoint & per stage) + planner rute termurah
+        self.quota = QuotaLedger(api_keys=api_keys)
+        self.planner = QuotaPlanner(self.quota, search_cached=self.is_search_cached if self.cache else None)
+        # Cache transkrip per video ID (hasil "tidak ada transkrip" juga disimpan)
+        self.transcripts = JournalStore(TRANSCRIPT_CACHE_FILE)
+
+    def _execute(self, request):
+        """Jalankan request googleapiclient lewat cache respons (jika aktif)."""
+        if self.cache is None:
+            return self._execute_http(request)
+        return self.cache.get_or_fetch(request.methodId, request.uri, lambda: self._execute_http(request))
+
+    def _execute_http(self, request):
+        """
+        Jalankan request googleapiclient dengan koneksi HTTP milik thread ini (kuota dicatat dulu).
+        quotaExceeded -> key itu ditandai habis & request diulang dengan key berikutnya di pool.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = httplib2.Http(timeout=30)
+            self._local.http = http
+        while True:
+            # QuotaExceededError jika semua key sudah habis
+            api_key = self.quota.charge(request.methodId)
+            if api_key:
+                request.uri = with_api_key(request.uri, api_key)
+            try:
+                return request.execute(http=http)
+            except Exception as e:
+                if not is_quota_error(e):
+                    raise
+                self.quota.mark_exhausted(api_key)
+                print(f"⚠️ Kuota {key_label(api_key)} habis menurut API, pindah ke key berikutnya.")
+
+    def close(self):
+        """Tutup semua store di disk (cache respons, ledger kuota, transkrip): flush + compaction."""
+        if self.cache is not None:
+            self.cache.close()
+        self.quota.close()
+        self.transcripts.close()
 
     # --- FITUR 1: DATA MINING (Video Biasa) ---
     def search_youtube_videos(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> list:
+        video_ids = self.search_video_ids(query, max_results)
+        if video_ids:
+            return self._get_video_details(video_ids)
+        return []
+
+    def search_video_ids(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> list:
+        """Hanya langkah search (tanpa detail). Detail bisa digabung lintas query lewat VideoDetailBatcher."""
         print(f"-> Searching YouTube for: {query}")
         try:
-            request = self.youtube.search().list(
-                q=query, part='snippet', type='video',
-                maxResults=max_results, regionCode=config.SEARCH_REGION,
-                videoDuration='short' # Fokus Shorts
-            )
-            response = request.execute()
-            video_ids = [item['id']['videoId'] for item in response.get('items', [])]
-            
-            if video_ids:
-                return self._get_video_details(video_ids)
-            return []
+            return self._search_video_ids(query, max_results)
         except Exception as e:
             print(f"Error searching videos: {e}")
             return []
 
+    def _search_request(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY):
+        return self.youtube.search().list(
+            q=query, part='snippet', type='video',
+            maxResults=max_results, regionCode=config.SEARCH_REGION,
+            videoDuration='short' # Fokus Shorts
+        )
+
+    def is_search_cached(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> bool:
+        """True jika hasil search keyword ini masih segar di cache respons (0 unit kuota)."""
+        request = self._search_request(query, max_results)
+        return self.cache is not None and self.cache.is_fresh(request.methodId, request.uri)
+
+    def _search_video_ids(self, query: str, max_results=config.MAX_VIDEOS_PER_QUERY) -> list:
+        """Satu panggilan search().list. Error dilempar ke pemanggil (untuk retry/backoff)."""
+        response = self._execute(self._search_request(query, max_results))
+        return [item['id']['videoId'] for item in response.get('items', [])]
+
     def _get_video_details(self, video_ids: list) -> list:
         video_cases = []
-        video_ids_str = ','.join(video_ids)
         try:
-            request = self.youtube.videos().list(
-                part='snippet,statistics', id=video_ids_str
-            )
-            response = request.execute()
-            
-            for item in response.get('items', []):
-                new_case = VideoCase(
-                    video_id=item['id'],
-                    title=item['snippet']['title'],
-                    raw_tags=item['snippet'].get('tags'),
-                )
-                stats = item.get('statistics', {})
-                new_case.raw_views = int(stats.get('viewCount', 0))
-                new_case.raw_likes = int(stats.get('likeCount', 0))
-                new_case.raw_comments = int(stats.get('commentCount', 0))
-                new_case.thumbnail_url = item['snippet']['thumbnails']['high']['url']
-                video_cases.append(new_case)
+            # videos().list maksimal 50 ID per panggilan
+            for start in range(0, len(video_ids), VIDEO_DETAIL_BATCH_SIZE):
+                video_cases.extend(self._fetch_video_details(video_ids[start:start + VIDEO_DETAIL_BATCH_SIZE]))
             return video_cases
         except Exception as e:
             print(f"Error detail: {e}")
             return []
 
+    def _fetch_video_details(self, video_ids: list) -> list:
+        """Satu panggilan videos().list (<= 50 ID). Error dilempar ke pemanggil."""
+        request = self.youtube.videos().list(
+            part='snippet,statistics', id=','.join(video_ids)
+        )
+        response = self._execute(request)
+        return [self._video_case_from_item(item) for item in response.get('items', [])]
+
+    @staticmethod
+    def _video_case_from_item(item: dict) -> VideoCase:
+        new_case = VideoCase(
+            video_id=item['id'],
+            title=item['snippet']['title'],
+            raw_tags=item['snippet'].get('tags'),
+        )
+        stats = item.get('statistics', {})
+        new_case.raw_views = int(stats.get('viewCount', 0))
+        new_case.raw_likes = int(stats.get('likeCount', 0))
+        new_case.raw_comments = int(stats.get('commentCount', 0))
+        new_case.thumbnail_url = item['snippet']['thumbnails']['high']['url']
+        return new_case
+
     # --- FITUR 2: CHANNEL INTELLIGENCE (Baru) ---
     def get_channel_id(self, channel_name: str):
         """Mencari ID Channel berdasarkan nama."""
@@ -67,7 +167,7 @@ class DataFetcher:
             req = self.youtube.search().list(
                 q=channel_name, type='channel', part='id,snippet', maxResults=1
             )
-            res = req.execute()
+            res = self._execute(req)
             if res['items']:
                 return res['items'][0]['id']['channelId'], res['items'][0]['snippet']['title']
             return None, None
@@ -75,21 +175,28 @@ class DataFetcher:
             return None, None
 
     def get_channel_top_videos(self, channel_id: str, max_results=5):
-        """Mengambil video terpopuler dari channel."""
+        """Mengambil video terpopuler dari channel (rute termurah dipilih oleh QuotaPlanner)."""
         try:
-            # Langkah 1: Ambil Playlist 'Uploads' dari Channel ini
-            # (Ini cara lebih hemat kuota daripada search)
-            ch_req = self.youtube.channels().list(id=channel_id, part='contentDetails').execute()
-            uploads_playlist_id = ch_req['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            
-            # Langkah 2: Ambil video dari playlist tersebut
-            # Note: API Playlist tidak bisa sort by ViewCount secara langsung,
-            # Jadi kita pakai Search endpoint khusus channel ini agar bisa sort by viewCount (Viral)
+            # Langkah 1: Ambil Playlist 'Uploads' + jumlah video channel (1 unit)
+            ch_req = self._execute(self.youtube.channels().list(id=channel_id, part='contentDetails,statistics'))
+            channel = ch_req['items'][0]
+            uploads_playlist_id = channel['contentDetails']['relatedPlaylists']['uploads']
+            video_count = int(channel.get('statistics', {}).get('videoCount', 0))
+
+            # Langkah 2: Playlist (1 unit/50 video, urut lokal) vs search order=viewCount (100 unit)
+            route, cost = self.planner.channel_top_videos_plan(video_count, max_results)
+            print(f"   -> Rute channel: {route} (~{cost} unit, {video_count} video)")
+            if route == 'playlist':
+                vid_ids = self._list_playlist_video_ids(uploads_playlist_id)
+                videos = self._get_video_details(vid_ids)
+                videos.sort(key=lambda v: v.raw_views, reverse=True)
+                return videos[:max_results]
+
             req = self.youtube.search().list(
                 channelId=channel_id, part='id,snippet',
                 order='viewCount', maxResults=max_results, type='video'
             )
-            res = req.execute()
+            res = self._execute(req)
             vid_ids = [item['id']['videoId'] for item in res.get('items', [])]
             
             if vid_ids:
@@ -99,26 +206,93 @@ class DataFetcher:
             print(f"Error fetch channel: {e}")
             return []
 
+    def _list_playlist_video_ids(self, playlist_id: str) -> list:
+        """Semua video ID dari playlist (50 per halaman, 1 unit per halaman)."""
+        video_ids = []
+        page_token = None
+        while True:
+            res = self._execute(self.youtube.playlistItems().list(
+                playlistId=playlist_id, part='contentDetails',
+                maxResults=VIDEO_DETAIL_BATCH_SIZE, pageToken=page_token
+            ))
+            video_ids.extend(item['contentDetails']['videoId'] for item in res.get('items', []))
+            page_token = res.get('nextPageToken')
+            if not page_token:
+                return video_ids
+
     # --- FITUR 3: TRANSCRIPT MINING (Baru & Penting) ---
     def get_video_transcript(self, video_id: str):
         """
         Versi Final: Mengembalikan (Judul Video, Isi Transkrip)
         """
         print(f"-> Mining Data untuk Video ID: {video_id}")
-        
-        video_title = "Topik Tidak Diketahui"
-        final_transcript = ""
+        return self.get_video_transcripts([video_id])[video_id]
 
-        # LANGKAH 1: Ambil Judul Video dulu (Wajib)
-        try:
-            req = self.youtube.videos().list(part='snippet', id=video_id)
-            res = req.execute()
-            if res['items']:
-                video_title = res['items'][0]['snippet']['title']
-        except Exception as e:
-            print(f"   ⚠️ Gagal ambil judul: {e}")
+    def get_video_transcripts(self, video_ids: list, workers: int = config.TRANSCRIPT_WORKERS) -> dict:
+        """
+        Versi bulk: {video_id: (judul, transkrip)} untuk banyak video sekaligus.
+        1. Cache transkrip di disk (termasuk hasil "tidak ada transkrip") -> langsung dijawab.
+        2. Judul + deskripsi diambil 50 ID per panggilan videos().list.
+        3. Subtitle (CC) diambil paralel dengan pool terbatas; fallback ke deskripsi.
+        """
+        results = {}
+        missing = []
+        for vid_id in dict.fromkeys(video_ids):
+            entry = self._cached_transcript(vid_id)
+            if entry is not None:
+                results[vid_id] = (entry['title'], entry['text'])
+            else:
+                missing.append(vid_id)
+        if missing:
+            print(f"-> Transkrip: {len(results)} dari cache, {len(missing)} diambil...")
 
-        # LANGKAH 2: Coba Ambil Subtitle (CC)
+        # LANGKAH 1: Judul & deskripsi (1 unit kuota per 50 video)
+        snippets = {}
+        for start in range(0, len(missing), VIDEO_DETAIL_BATCH_SIZE):
+            batch = missing[start:start + VIDEO_DETAIL_BATCH_SIZE]
+            try:
+                res = self._execute(self.youtube.videos().list(part='snippet', id=','.join(batch)))
+                snippets.update({item['id']: item['snippet'] for item in res.get('items', [])})
+            except Exception as e:
+                print(f"   ⚠️ Gagal ambil judul ({len(batch)} video): {e}")
+
+        # LANGKAH 2: Subtitle (CC) paralel, LANGKAH 3: Fallback ke Deskripsi (Plan B)
+        def mine(vid_id):
+            snippet = snippets.get(vid_id)
+            title = snippet['title'] if snippet else "Topik Tidak Diketahui"
+            text, permanent = self._fetch_caption_text(vid_id)
+            source = 'cc'
+            if not text and snippet and snippet.get('description'):
+                text = (
+                    f"[CATATAN: Ini bukan transkrip, tapi Deskripsi Video]\n"
+                    f"{snippet['description']}"
+                )
+                source = 'description'
+            elif not text:
+                source = 'none'
+            # Error sementara (jaringan / API judul gagal) tidak di-cache agar dicoba lagi nanti
+            if snippet and permanent:
+                self.transcripts.put(vid_id, {'title': title, 'text': text, 'source': source, 'fetched_at': time.time()})
+            return vid_id, (title, text)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as executor:
+                for vid_id, result in executor.map(mine, missing):
+                    results[vid_id] = result
+        return results
+
+    def _cached_transcript(self, video_id: str):
+        entry = self.transcripts.get(video_id)
+        if entry is None:
+            return None
+        # "Tidak ada transkrip" dicek ulang setelah TTL (subtitle bisa ditambahkan belakangan)
+        if entry['source'] != 'cc' and time.time() - entry['fetched_at'] > config.TRANSCRIPT_NONE_TTL_HOURS * 3600:
+            return None
+        return entry
+
+    @staticmethod
+    def _fetch_caption_text(video_id: str):
+        """Return (teks CC atau '', permanen). permanen=True jika video memang tidak punya subtitle."""
         try:
             transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
             target = transcript_list.find_transcript(['id', 'en', 'id-ID', 'en-US'])
@@ -126,31 +300,13 @@ class DataFetcher:
             
             formatter = TextFormatter()
             text_formatted = formatter.format_transcript(transcript_data)
-            final_transcript = text_formatted.replace("\n", " ")
-            print("   ✅ Berhasil mengambil Transkrip (CC).")
-            
-            # RETURN DUA DATA: JUDUL DAN TEKS
-            return video_title, final_transcript
-            
+            return text_formatted.replace("\n", " "), True
+        except TRANSCRIPT_MISSING_ERRORS as e:
+            print(f"   ⚠️ Transkrip CC tidak tersedia untuk {video_id} ({type(e).__name__}).")
+            return "", True
         except Exception as e:
-            print(f"   ⚠️ Transkrip CC tidak tersedia ({e}).")
-
-        # LANGKAH 3: Fallback ke Deskripsi (Plan B)
-        try:
-            # Kita pakai data dari Langkah 1 tadi
-            if res['items']:
-                description = res['items'][0]['snippet']['description']
-                final_transcript = (
-                    f"[CATATAN: Ini bukan transkrip, tapi Deskripsi Video]\n"
-                    f"{description}"
-                )
-                print("   ✅ Menggunakan Deskripsi sebagai pengganti.")
-                return video_title, final_transcript
-                
-        except Exception as e:
-            print(f"   ❌ Gagal Total: {e}")
-
-        return video_title, ""
+            print(f"   ⚠️ Gagal ambil transkrip CC {video_id}: {e}")
+            return "", False
 
     # --- FITUR 4: GOOGLE TRENDS ---
     def fetch_trending_keywords(self, niche_keyword: str) -> list:
@@ -161,8 +317,9 @@ class DataFetcher:
         print(f"-> Expanding Keyword: {niche_keyword}")
         try:
             # Menggunakan timeframe 30 hari terakhir agar trennya segar
-            self.trends_connector.build_payload(kw_list=[niche_keyword], timeframe='today 1-m', geo=config.SEARCH_REGION)
-            related_queries = self.trends_connector.related_queries()
+            with self._trends_lock:
+                self.trends_connector.build_payload(kw_list=[niche_keyword], timeframe='today 1-m', geo=config.SEARCH_REGION)
+                related_queries = self.trends_connector.related_queries()
             
             top_keywords = []
             
@@ -193,10 +350,212 @@ class DataFetcher:
     def get_demand_score(self, keyword: str) -> float:
         # (Kode lama Anda tetap dipakai di sini)
         try:
-            self.trends_connector.build_payload(kw_list=[keyword], timeframe='today 12-m', geo=config.SEARCH_REGION)
-            data = self.trends_connector.interest_over_time()
+            with self._trends_lock:
+                self.trends_connector.build_payload(kw_list=[keyword], timeframe='today 12-m', geo=config.SEARCH_REGION)
+                data = self.trends_connector.interest_over_time()
             if not data.empty:
                 return data[keyword].mean()
             return 5.0
         except:
-            return 0.0
\ No newline at end of file
+            return 0.0
+
+    def get_demand_scores(self, keywords: list, anchor: str = config.TRENDS_ANCHOR_KEYWORD) -> list:
+        """
+        Demand score untuk banyak keyword sekaligus: 4 keyword + 1 anchor per payload (batas pytrends = 5).
+        Trends menormalisasi 0-100 PER PAYLOAD, jadi tiap batch diskalakan ulang lewat anchor
+        agar semua skor berada di skala yang sama (skala batch pertama).
+        Return: list skor, urutannya sama dengan `keywords`; None = gagal diambil / tidak bisa diskalakan.
+        """
+        series = self.get_demand_series([kw for kw in keywords if kw != anchor], anchor=anchor)
+        scores = {}
+        for kw, points in series.items():
+            if points is None:
+                scores[kw] = None
+            elif not points:
+                scores[kw] = 5.0
+            else:
+                scores[kw] = sum(value for _, value in points) / len(points)
+        if anchor in keywords and anchor not in scores:
+            scores[anchor] = self.get_demand_score(anchor)
+        return [scores[kw] for kw in keywords]
+
+    def get_demand_series(self, keywords: list, anchor: str = config.TRENDS_ANCHOR_KEYWORD, reference: float = None,
+                          region: str = config.SEARCH_REGION, timeframe: str = 'today 12-m') -> dict:
+        """
+        Time series minat (Trends) per keyword, sudah diskalakan lewat anchor.
+        reference = rata-rata anchor yang dijadikan patokan (None = pakai batch pertama).
+        Return: {keyword: [(tanggal ISO, nilai), ...]}; [] = Trends kosong, None = gagal diambil
+        (termasuk batch yang anchor-nya bernilai 0, karena skalanya tidak bisa disamakan).
+        Anchor ikut dikembalikan (rata-ratanya = reference) jika minimal satu batch berhasil.
+        """
+        unique = [kw for kw in dict.fromkeys(keywords) if kw != anchor]
+        batch_size = TRENDS_PAYLOAD_SIZE - 1
+        series = {}
+
+        for start in range(0, len(unique), batch_size):
+            batch = unique[start:start + batch_size]
+            if start:
+                time.sleep(random.uniform(1.0, 2.0)) # Jeda acak antar payload agar tidak di-throttle
+            try:
+                with self._trends_lock:
+                    self.trends_connector.build_payload(kw_list=batch + [anchor], timeframe=timeframe, geo=region)
+                    data = self.trends_connector.interest_over_time()
+            except Exception as e:
+                print(f"   ❌ Gagal ambil Trends untuk {batch}: {e}")
+                series.update({kw: None for kw in batch})
+                continue
+            if data.empty:
+                series.update({kw: [] for kw in batch})
+                continue
+
+            anchor_mean = float(data[anchor].mean())
+            if anchor_mean <= 0:
+                # Tanpa anchor, skala batch ini tidak bisa disamakan -> jangan dicampur dengan batch lain
+                print(f"   ⚠️ Anchor '{anchor}' bernilai 0 pada batch {batch}, skor ditandai tidak tersedia.")
+                series.update({kw: None for kw in batch})
+                continue
+            if reference is None:
+                reference = anchor_mean
+            factor = reference / anchor_mean
+            dates = [ts.strftime('%Y-%m-%d') for ts in data.index]
+            for kw in batch + ([anchor] if anchor not in series else []):
+                series[kw] = [(day, float(value) * factor) for day, value in zip(dates, data[kw])]
+        return series
+
+
+class VideoDetailBatcher:
+    """
+    Menggabungkan permintaan detail video dari BANYAK query (keyword) menjadi
+    panggilan videos().list berisi 50 ID penuh.
+
+    - ID yang sama dari keyword berbeda hanya di-fetch sekali (dedup).
+    - submit(ids) langsung mengembalikan Future -> list VideoCase sesuai urutan ids.
+    - Batch penuh dikirim seketika; sisa batch dikirim oleh flush() atau otomatis
+      setelah max_wait detik (jika max_wait diisi, untuk pemakaian multi-thread).
+    """
+
+    def __init__(self, fetcher: DataFetcher, batch_size: int = VIDEO_DETAIL_BATCH_SIZE, max_wait: float = None,
+                 limiter: TokenBucket = None, retries: int = 0):
+        self.fetcher = fetcher
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.limiter = limiter  # Token bucket bersama dengan pemanggil search (opsional)
+        self.retries = retries  # Retry 403/429/5xx dengan jittered backoff
+
+        self._lock = threading.Lock()
+        self._futures = {}  # id -> Future(VideoCase atau None jika video tidak ditemukan)
+        self._pending = []  # ID yang belum dikirim, urut sesuai waktu masuk
+        self._oldest_pending_at = None
+
+        # Statistik
+        self.detail_calls = 0
+        self.ids_requested = 0
+        self.ids_fetched = 0
+
+        self._stopped = threading.Event()
+        if max_wait:
+            threading.Thread(target=self._linger_loop, name='VideoDetailBatcher', daemon=True).start()
+
+    def submit(self, video_ids: list, strict: bool = False) -> Future:
+        """strict=True: Future gagal (exception) jika ada batch detail yang error, bukan dilewati diam-diam."""
+        result = Future()
+        if not video_ids:
+            result.set_result([])
+            return result
+
+        with self._lock:
+            self.ids_requested += len(video_ids)
+            id_futures = []
+            for vid_id in video_ids:
+                future = self._futures.get(vid_id)
+                if future is None:
+                    future = Future()
+                    self._futures[vid_id] = future
+                    self._pending.append(vid_id)
+                    if self._oldest_pending_at is None:
+                        self._oldest_pending_at = time.monotonic()
+                id_futures.append(future)
+            full_batches = self._take_batches(full_only=True)
+
+        self._gather(id_futures, result, strict)
+        for batch in full_batches:
+            self._fetch_batch(batch)
+        return result
+
+    def flush(self):
+        """Kirim semua ID yang masih menunggu (termasuk batch yang belum penuh)."""
+        with self._lock:
+            batches = self._take_batches(full_only=False)
+        for batch in batches:
+            self._fetch_batch(batch)
+
+    def close(self):
+        self._stopped.set()
+        self.flush()
+
+    def stats(self) -> str:
+        saved = self.ids_requested - self.ids_fetched
+        return (f"{self.detail_calls} panggilan videos().list untuk {self.ids_fetched} ID unik "
+                f"({self.ids_requested} diminta, {saved} duplikat tidak di-fetch ulang)")
+
+    # --- Internal ---
+    def _take_batches(self, full_only: bool) -> list:
+        batches = []
+        while len(self._pending) >= self.batch_size or (not full_only and self._pending):
+            batches.append(self._pending[:self.batch_size])
+            self._pending = self._pending[self.batch_size:]
+        self._oldest_pending_at = time.monotonic() if self._pending else None
+        return batches
+
+    def _fetch_batch(self, batch: list):
+        with self._lock:
+            self.detail_calls += 1
+            self.ids_fetched += len(batch)
+        def fetch():
+            if self.limiter:
+                self.limiter.acquire()
+            return self.fetcher._fetch_video_details(batch)
+
+        try:
+            cases = {case.video_id: case for case in call_with_backoff(fetch, retries=self.retries)}
+        except Exception as e:
+            print(f"Error detail (batch {len(batch)} ID): {e}")
+            # Future gagal dilepas dari _futures agar submit() berikutnya mencoba ID ini lagi
+            with self._lock:
+                failed = [self._futures.pop(vid_id) for vid_id in batch]
+            for future in failed:
+                future.set_exception(e)
+            return
+        for vid_id in batch:
+            self._futures[vid_id].set_result(cases.get(vid_id))
+
+    @staticmethod
+    def _gather(id_futures: list, result: Future, strict: bool = False):
+        """Future gabungan: selesai saat semua ID selesai; video yang tidak ditemukan dilewati."""
+        remaining = [len(id_futures)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            cases = []
+            for future in id_futures:
+                if strict and future.exception() is not None:
+                    result.set_exception(future.exception())
+                    return
+                if future.exception() is None and future.result() is not None:
+                    cases.append(future.result())
+            result.set_result(cases)
+
+        for future in id_futures:
+            future.add_done_callback(on_done)
+
+    def _linger_loop(self):
+        while not self._stopped.wait(self.max_wait / 2):
+            with self._lock:
+                due = self._oldest_pending_at is not None and time.monotonic() - self._oldest_pending_at >= self.max_wait
+                batches = self._take_batches(full_only=False) if due else []
+            for batch in batches:
+                self._fetch_batch(batch)
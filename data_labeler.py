@@ -1,114 +1,290 @@
 # data_labeler.py
 
-import json
 import pandas as pd
 import numpy as np
 import sys
-import os
 
 # Mengimpor modul OCR
 # Pastikan ocr_processor.py sudah diperbarui dengan fitur threading!
 try:
-    from ocr_processor import OCRProcessor
+    from ocr_processor import OCRProcessor, OCRPipeline
 except ImportError:
     print("🚨 ERROR: ocr_processor.py tidak ditemukan. Pastikan file ada di folder yang sama.")
     sys.exit(1)
 
+from raw_data_io import resolve_raw_file, iter_raw_records, iter_raw_chunks
+from dataset_io import (TrainingDatasetWriter, read_training_data, iter_training_chunks,
+                        TRAINING_PARQUET_FILE, TRAINING_CSV_FILE)
+from quantile_sketch import TDigest, load_state, save_state
+
 # --- Konfigurasi File ---
-INPUT_FILE = 'raw_shorts_data.json'
-OUTPUT_FILE_CSV = 'shorts_training_data.csv'
+INPUT_FILE = None # None = raw_shorts_data.jsonl, atau raw_shorts_data.json (format lama) jika belum ada
+OUTPUT_FILE = TRAINING_PARQUET_FILE # Dataset training utama (Parquet, tags = list string)
+OUTPUT_FILE_CSV = TRAINING_CSV_FILE # Salinan CSV untuk dibuka manual (export_csv=True / tanpa pyarrow)
 
 # Threshold untuk pelabelan (Bisa disesuaikan)
 SUCCESS_PERCENTILE = 75 
 
-def process_and_label_data():
-    """Memuat data mentah, menjalankan OCR Batch, menghitung WPI, dan melabeli data."""
+# Mode incremental: sketch persentil WPI (t-digest) disimpan di samping dataset
+SKETCH_STATE_FILE = 'shorts_training_data.sketch.json'
+FLIP_REPORT_FILE = 'label_flips.csv' # Video yang labelnya berubah pada run incremental terakhir
+SKETCH_REBUILD_RATIO = 0.1 # Nilai WPI usang (video yang statistiknya berubah) > 10% isi sketch -> bangun ulang
+LABEL_COLUMNS = ['id', 'views', 'wpi_score', 'is_success'] # Kolom dataset lama untuk deteksi perubahan
+FLIP_REPORT_COLUMNS = ['id', 'title', 'wpi_score', 'old_label', 'new_label', 'reason']
+
+# Jumlah thread download thumbnail (tahap OCR memakai 1 proses per core CPU)
+OCR_DOWNLOAD_WORKERS = 16
+
+# Jumlah record per potongan (memori puncak ditentukan oleh ini, bukan oleh ukuran dataset)
+CHUNK_SIZE = 50000
+
+
+def latest_row_numbers(path) -> dict:
+    """Pass 0: id -> nomor record TERAKHIR (collector incremental menambah versi terbaru di akhir file)."""
+    latest = {}
+    for row_no, record in enumerate(iter_raw_records(path)):
+        latest[record['id']] = row_no
+    return latest
+
+
+def iter_clean_chunks(path, latest: dict, chunk_size: int = CHUNK_SIZE):
+    """Potongan DataFrame yang sudah bersih: tanpa duplikat, kolom numerik, views > 100."""
+    for df in iter_raw_chunks(path, chunk_size):
+        # Hanya versi terakhir tiap video
+        df = df[df['row_no'] == df['id'].map(latest)]
+
+        # Pastikan Views numeric & handle NaN
+        df = df.assign(
+            views=pd.to_numeric(df['views'], errors='coerce').fillna(0),
+            likes=pd.to_numeric(df['likes'], errors='coerce').fillna(0),
+            comments=pd.to_numeric(df['comments'], errors='coerce').fillna(0),
+        )
+
+        # Hapus baris dengan views nol atau terlalu sedikit (sampah)
+        df = df[df['views'] > 100].copy()
+        if not df.empty:
+            yield df
+
+
+def add_performance_metrics(df):
+    # Engagement Rate (ER)
+    df['engagement_rate'] = (df['likes'] + df['comments']) / df['views']
+    
+    # WPI (Weighted Performance Index)
+    df['wpi_score'] = df['engagement_rate'] * 1000 # Scaling score
+    return df
+
+
+def process_and_label_data(chunk_size: int = CHUNK_SIZE, export_csv: bool = False):
+    """
+    Memuat data mentah per potongan, menjalankan OCR Batch, menghitung WPI, dan melabeli data.
+    Pass 1: OCR + masukkan WPI ke sketch persentil. Pass 2: label + tulis dataset per potongan.
+    export_csv=True: selain Parquet, tulis juga CSV (untuk inspeksi).
+    """
     
-    # 1. Muat Data Mentah (JSON)
+    # 1. Muat Data Mentah (JSONL / JSON lama), hanya indeks ID yang disimpan di memori
+    path = resolve_raw_file(INPUT_FILE)
     try:
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-        df = pd.DataFrame(raw_data)
-        print(f"-> Berhasil memuat {len(df)} baris data mentah.")
+        latest = latest_row_numbers(path)
+        print(f"-> {path}: {len(latest)} video unik.")
     except FileNotFoundError:
-        print(f"🚨 ERROR: File {INPUT_FILE} tidak ditemukan. Jalankan data_collector.py terlebih dahulu.")
+        print(f"🚨 ERROR: File {path} tidak ditemukan. Jalankan data_collector.py terlebih dahulu.")
         return
-        
-    # Pastikan Views numeric & handle NaN
-    df['views'] = pd.to_numeric(df['views'], errors='coerce').fillna(0)
-    df['likes'] = pd.to_numeric(df['likes'], errors='coerce').fillna(0)
-    df['comments'] = pd.to_numeric(df['comments'], errors='coerce').fillna(0)
-    
-    # Hapus baris dengan views nol atau terlalu sedikit (sampah)
-    df = df[df['views'] > 100].copy()
     
     # ====================================================================
-    # 2. PROSES OCR (BATCH PARALLEL PROCESSING) - BAGIAN BARU
+    # 2. PROSES OCR (BATCH PARALLEL PROCESSING) - PER POTONGAN
     # ====================================================================
     print("\n[MULAI EKSTRAKSI FITUR VISUAL (OCR)]")
+    ocr = None
+    digest = TDigest()
     try:
         ocr = OCRProcessor()
-        
-        # Siapkan data untuk threading (butuh ID dan URL Thumbnail)
-        video_list_dict = df[['id', 'thumbnail']].to_dict('records')
-        
-        # Jalankan Download & OCR secara Paralel (8 Threads)
-        # Ini akan otomatis mengecek Cache dulu, jadi hemat kuota
-        ocr.process_batch_concurrently(video_list_dict, max_workers=8)
-        
-        print("-> Menggabungkan hasil OCR ke DataFrame...")
-        
-        # Ambil nilai density dari cache OCR dan masukkan ke kolom baru
-        # Jika gagal/kosong, isi dengan 0.0
-        df['ocr_text_density'] = df['id'].apply(lambda x: ocr.cache.get(x, 0.0))
-        
-        print(f"✅ OCR Selesai. Kolom 'ocr_text_density' berhasil ditambahkan.")
-        
+        pipeline = OCRPipeline(ocr, download_workers=OCR_DOWNLOAD_WORKERS)
     except Exception as e:
         print(f"⚠️ WARNING: Gagal menjalankan OCR. Menggunakan nilai default 0.0. Error: {e}")
-        df['ocr_text_density'] = 0.0
-    # ====================================================================
-
     
-    # 3. Hitung Metrik Kinerja (WPI & Engagement)
+    for chunk_no, df in enumerate(iter_clean_chunks(path, latest, chunk_size), 1):
+        if ocr is not None:
+            try:
+                # Download (16 Threads) -> Antrian -> OCR (Process Pool, 1 proses per core)
+                # Ini akan otomatis mengecek Cache dulu, jadi hemat kuota
+                pipeline.run(df[['id', 'thumbnail']].to_dict('records'))
+            except Exception as e:
+                print(f"⚠️ WARNING: OCR potongan #{chunk_no} gagal, density = 0.0. Error: {e}")
+        digest.update_many(add_performance_metrics(df)['wpi_score'].to_numpy(dtype=np.float64))
+        print(f"-> Potongan #{chunk_no}: {len(df)} baris diproses.")
     
-    # Engagement Rate (ER)
-    df['engagement_rate'] = (df['likes'] + df['comments']) / df['views']
-    
-    # WPI (Weighted Performance Index)
-    df['wpi_score'] = df['engagement_rate'] * 1000 # Scaling score
-    
-    
-    # 4. Pelabelan Data (Target Variabel y)
+    if ocr is not None:
+        print(f"-> Tesseract dihemat: {ocr.tesseract_saved} thumbnail kembar (pHash), "
+              f"{pipeline.tesseract_skipped} tanpa teks (prefilter).")
+        print("✅ OCR Selesai. Kolom 'ocr_text_density' akan ditambahkan dari cache.")
+    # ====================================================================
+
+    if not digest.count:
+        print("🚨 ERROR: Tidak ada data valid (views > 100).")
+        return
     
-    # Tentukan ambang batas WPI
-    threshold = df['wpi_score'].quantile(SUCCESS_PERCENTILE / 100)
+    # 3. Tentukan ambang batas WPI (persentil dari SELURUH data, bukan per potongan)
+    # t-digest: memori tetap (~ratusan centroid), error rank jauh di bawah 0.1% pada persentil 75
+    threshold = digest.quantile(SUCCESS_PERCENTILE / 100)
     print(f"\n-> Threshold WPI untuk [SUCCESS]: {threshold:.4f}")
     
-    # Lakukan pelabelan: 1 jika di atas threshold, 0 jika di bawah.
-    df['is_success'] = np.where(df['wpi_score'] >= threshold, 1, 0)
-    
-    
-    # 5. Filter dan Simpan Data Akhir
-    final_df = df.copy()
+    # 4. Pelabelan Data (Target Variabel y) + Simpan per potongan
+    # PENTING: Pastikan kolom OCR ikut tersimpan di dataset
+    total = 0
+    success_count = 0
+    writer = TrainingDatasetWriter(OUTPUT_FILE, OUTPUT_FILE_CSV if export_csv else None)
+    for df in iter_clean_chunks(path, latest, chunk_size):
+        # Ambil nilai density dari cache OCR. Jika gagal/kosong, isi dengan 0.0
+        df['ocr_text_density'] = df['id'].apply(ocr.get_cached_density) if ocr is not None else 0.0
+        add_performance_metrics(df)
+        # Lakukan pelabelan: 1 jika di atas threshold, 0 jika di bawah.
+        df['is_success'] = np.where(df['wpi_score'] >= threshold, 1, 0)
+
+        total += len(df)
+        success_count += int(df['is_success'].sum())
+        writer.write(df)
+    writer.close()
+    if ocr is not None:
+        ocr.close()
+    save_sketch(digest, threshold, stale=0)
     
     # Statistik Label
-    success_count = final_df['is_success'].sum()
-    failure_count = len(final_df) - success_count
+    failure_count = total - success_count
     
     print(f"\n[HASIL PELABELAN]")
-    print(f"SUCCESS (Label 1): {success_count} data ({success_count / len(final_df) * 100:.2f}%)")
+    print(f"SUCCESS (Label 1): {success_count} data ({success_count / total * 100:.2f}%)")
     print(f"FAILURE (Label 0): {failure_count} data")
-    print(f"Total Data Siap: {len(final_df)}")
-    
-    # PENTING: Pastikan kolom OCR ikut tersimpan di CSV
-    cols_to_save = ['id', 'title', 'tags', 'views', 'engagement_rate', 'wpi_score', 'ocr_text_density', 'is_success']
-    
-    # Hanya simpan kolom yang benar-benar ada (defensif)
-    existing_cols = [c for c in cols_to_save if c in final_df.columns]
-    
-    final_df[existing_cols].to_csv(OUTPUT_FILE_CSV, index=False, encoding='utf-8')
-    print(f"✅ Data Training Riil berhasil disimpan di: {OUTPUT_FILE_CSV}")
+    print(f"Total Data Siap: {total}")
+    print("✅ Data Training Riil berhasil disimpan di: "
+          + ', '.join(p for p in (writer.parquet_path, writer.csv_path) if p))
+
+def save_sketch(digest: TDigest, threshold: float, stale: int):
+    save_state(SKETCH_STATE_FILE, {'percentile': SUCCESS_PERCENTILE, 'threshold': threshold, 'stale': stale,
+                                   'digest': digest.to_dict()})
+
+
+def process_new_data(chunk_size: int = CHUNK_SIZE, export_csv: bool = False):
+    """
+    Mode incremental: hanya video baru / yang statistiknya berubah yang di-OCR & dihitung ulang.
+    Threshold diperbarui lewat sketch t-digest yang tersimpan; label lama dicocokkan ulang dengan
+    threshold baru (vektor, tanpa OCR) dan label yang berubah dicatat di FLIP_REPORT_FILE.
+    Dataset lama hanya dibaca kolom ringkasnya + ditulis ulang per row group (memori tetap).
+    Tanpa sketch/dataset sebelumnya (atau SUCCESS_PERCENTILE diganti) -> jalankan mode penuh.
+    """
+    state = load_state(SKETCH_STATE_FILE)
+    try:
+        existing = read_training_data(columns=LABEL_COLUMNS) if state else None
+    except FileNotFoundError:
+        existing = None
+    if state is None or existing is None or state['percentile'] != SUCCESS_PERCENTILE:
+        print("-> Belum ada dataset/sketch yang cocok: pelabelan penuh.")
+        return process_and_label_data(chunk_size, export_csv)
+
+    path = resolve_raw_file(INPUT_FILE)
+    try:
+        latest = latest_row_numbers(path)
+    except FileNotFoundError:
+        print(f"🚨 ERROR: File {path} tidak ditemukan. Jalankan data_collector.py terlebih dahulu.")
+        return
+    existing = existing.drop_duplicates('id', keep='last').set_index('id', drop=False)
+
+    # 1. Cari baris baru / berubah (views atau WPI berbeda dari dataset)
+    delta_parts = []
+    for df in iter_clean_chunks(path, latest, chunk_size):
+        add_performance_metrics(df)
+        known = df['id'].isin(existing.index)
+        old_views = df['id'].map(existing['views'])
+        old_wpi = df['id'].map(existing['wpi_score'])
+        changed = known & ((old_views != df['views']) | ~np.isclose(old_wpi.fillna(0.0), df['wpi_score']))
+        if (~known | changed).any():
+            delta_parts.append(df[~known | changed])
+    if not delta_parts:
+        print("✅ Tidak ada video baru atau berubah. Dataset tetap.")
+        return
+    delta = pd.concat(delta_parts, ignore_index=True)
+    changed_ids = set(delta['id']) & set(existing.index)
+    print(f"-> {len(delta) - len(changed_ids)} video baru, {len(changed_ids)} video berubah "
+          f"(dari {len(existing)} baris dataset).")
+
+    # 2. OCR hanya untuk baris delta
+    delta['ocr_text_density'] = 0.0
+    try:
+        ocr = OCRProcessor()
+        pipeline = OCRPipeline(ocr, download_workers=OCR_DOWNLOAD_WORKERS)
+        pipeline.run(delta[['id', 'thumbnail']].to_dict('records'))
+        delta['ocr_text_density'] = delta['id'].apply(ocr.get_cached_density)
+        ocr.close()
+    except Exception as e:
+        print(f"⚠️ WARNING: OCR gagal, density = 0.0. Error: {e}")
+
+    # 3. Perbarui sketch. Nilai lama video yang berubah tidak bisa dihapus dari t-digest ->
+    #    dihitung sebagai 'usang'; jika terlalu banyak, sketch dibangun ulang dari kolom WPI dataset.
+    digest = TDigest.from_dict(state['digest'])
+    digest.update_many(delta['wpi_score'].to_numpy(dtype=np.float64))
+    stale = state['stale'] + len(changed_ids)
+    kept = ~existing['id'].isin(changed_ids)
+    if stale > SKETCH_REBUILD_RATIO * digest.count:
+        print(f"-> {stale} nilai WPI usang di sketch: dibangun ulang dari {int(kept.sum()) + len(delta)} baris.")
+        digest = TDigest()
+        digest.update_many(existing.loc[kept, 'wpi_score'].to_numpy(dtype=np.float64))
+        digest.update_many(delta['wpi_score'].to_numpy(dtype=np.float64))
+        stale = 0
+    threshold = digest.quantile(SUCCESS_PERCENTILE / 100)
+    print(f"-> Threshold WPI: {state['threshold']:.4f} -> {threshold:.4f}")
+
+    # 4. Tulis ulang dataset per row group: baris lama dilabel ulang (baris berubah dibuang),
+    #    lalu baris delta ditambahkan di akhir. Label yang berubah dicatat untuk laporan.
+    flips = []
+    total = 0
+    success_count = 0
+    writer = TrainingDatasetWriter(OUTPUT_FILE, OUTPUT_FILE_CSV if export_csv else None)
+
+    def relabel(df: pd.DataFrame, previous: pd.Series, reason: str):
+        nonlocal total, success_count
+        df['is_success'] = np.where(df['wpi_score'] >= threshold, 1, 0)
+        flipped = previous.notna() & (previous != df['is_success'])
+        if flipped.any():
+            flips.append(pd.DataFrame({
+                'id': df.loc[flipped, 'id'],
+                'title': df.loc[flipped, 'title'],
+                'wpi_score': df.loc[flipped, 'wpi_score'],
+                'old_label': previous[flipped].astype(int),
+                'new_label': df.loc[flipped, 'is_success'],
+                'reason': reason,
+            }))
+        total += len(df)
+        success_count += int(df['is_success'].sum())
+        writer.write(df)
+
+    for df in iter_training_chunks(chunk_size=chunk_size):
+        df = df[~df['id'].isin(changed_ids)].copy()
+        relabel(df, df['is_success'].copy(), 'threshold bergeser')
+    for start in range(0, len(delta), chunk_size):
+        df = delta.iloc[start:start + chunk_size].copy()
+        relabel(df, df['id'].map(existing['is_success']), 'data berubah')
+    writer.close()
+    save_sketch(digest, threshold, stale)
+
+    report = pd.concat(flips, ignore_index=True) if flips else pd.DataFrame(columns=FLIP_REPORT_COLUMNS)
+    report.to_csv(FLIP_REPORT_FILE, index=False, encoding='utf-8')
+
+    up = int((report['new_label'] == 1).sum())
+    print("\n[HASIL PELABELAN INCREMENTAL]")
+    print(f"Label berubah: {len(report)} (0 -> 1: {up}, 1 -> 0: {len(report) - up}) -> {FLIP_REPORT_FILE}")
+    print(f"SUCCESS (Label 1): {success_count} dari {total} data")
+    print("✅ Dataset diperbarui: " + ', '.join(p for p in (writer.parquet_path, writer.csv_path) if p))
+
 
 if __name__ == "__main__":
-    process_and_label_data()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Label data mentah menjadi dataset training.")
+    parser.add_argument('--csv', action='store_true', help=f"Tulis juga {OUTPUT_FILE_CSV} untuk inspeksi")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Hanya proses video baru/berubah; threshold dari sketch t-digest tersimpan")
+    args = parser.parse_args()
+    if args.incremental:
+        process_new_data(export_csv=args.csv)
+    else:
+        process_and_label_data(export_csv=args.csv)
@@ -0,0 +1,209 @@
+# dataset_io.py
+# Dataset training (hasil data_labeler) dalam format kolom: Parquet (pyarrow).
+#   - tags disimpan sebagai list<string> asli, bukan string "['a', 'b']"
+#   - kolom numerik bertipe (int64 / float64 / int8)
+#   - proyeksi kolom: training hanya membaca kolom yang dipakai
+# CSV tetap bisa ditulis/diekspor untuk dibuka di Excel.
+
+import ast
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Dependensi opsional: tanpa pyarrow, dataset ditulis/dibaca sebagai CSV
+    pa = None
+    pq = None
+
+TRAINING_PARQUET_FILE = 'shorts_training_data.parquet'
+TRAINING_CSV_FILE = 'shorts_training_data.csv'
+
+# Kolom dataset training (urut) + nilai default jika kolom tidak ada di potongan
+TRAINING_COLUMNS = ['id', 'title', 'tags', 'views', 'engagement_rate', 'wpi_score', 'ocr_text_density', 'is_success']
+COLUMN_DEFAULTS = {'tags': None, 'views': 0, 'engagement_rate': 0.0, 'wpi_score': 0.0, 'ocr_text_density': 0.0, 'is_success': 0}
+
+if pa is not None:
+    TRAINING_SCHEMA = pa.schema([
+        ('id', pa.string()),
+        ('title', pa.string()),
+        ('tags', pa.list_(pa.string())),
+        ('views', pa.int64()),
+        ('engagement_rate', pa.float64()),
+        ('wpi_score', pa.float64()),
+        ('ocr_text_density', pa.float64()),
+        ('is_success', pa.int8()),
+    ])
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def normalize_tags(value) -> list:
+    """Tag dalam bentuk apa pun (list, array, None, string list lama dari CSV) -> list string."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('['):
+            try:
+                value = ast.literal_eval(text)
+            except (ValueError, SyntaxError):
+                return [text]
+        else:
+            return [tag.strip() for tag in text.split(',') if tag.strip()]
+    elif isinstance(value, float) and np.isnan(value):
+        return []
+    return [str(tag) for tag in value if tag is not None]
+
+
+def tags_to_text(tags) -> str:
+    return ' '.join(normalize_tags(tags))
+
+
+def resolve_training_file(path: str = None) -> str:
+    """Default: Parquet jika ada (dan pyarrow terpasang), selain itu CSV."""
+    if path:
+        return path
+    if parquet_available() and os.path.exists(TRAINING_PARQUET_FILE):
+        return TRAINING_PARQUET_FILE
+    return TRAINING_CSV_FILE
+
+
+def _typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Potongan labeler -> kolom TRAINING_COLUMNS dengan tipe yang konsisten antar potongan."""
+    df = df.assign(**{name: default for name, default in COLUMN_DEFAULTS.items() if name not in df.columns})
+    return pd.DataFrame({
+        'id': df['id'].astype(str),
+        'title': df['title'].astype(str),
+        'tags': df['tags'].map(normalize_tags),
+        'views': pd.to_numeric(df['views'], errors='coerce').fillna(0).astype('int64'),
+        'engagement_rate': pd.to_numeric(df['engagement_rate'], errors='coerce').fillna(0.0).astype('float64'),
+        'wpi_score': pd.to_numeric(df['wpi_score'], errors='coerce').fillna(0.0).astype('float64'),
+        'ocr_text_density': pd.to_numeric(df['ocr_text_density'], errors='coerce').fillna(0.0).astype('float64'),
+        'is_success': pd.to_numeric(df['is_success'], errors='coerce').fillna(0).astype('int8'),
+    })
+
+
+class TrainingDatasetWriter:
+    """
+    Tulis dataset per potongan (satu row group Parquet per potongan) ke file sementara,
+    lalu ganti file tujuan secara atomik saat close() -> pembaca tidak pernah melihat file setengah jadi.
+    """
+
+    def __init__(self, parquet_path: str = TRAINING_PARQUET_FILE, csv_path: str = None):
+        if parquet_path and not parquet_available():
+            print("⚠️ pyarrow tidak terpasang: dataset hanya ditulis sebagai CSV.")
+            parquet_path, csv_path = None, csv_path or TRAINING_CSV_FILE
+        self.parquet_path = parquet_path
+        self.csv_path = csv_path
+        self.rows = 0
+        self._parquet = None
+        self._csv_started = False
+
+    def write(self, df: pd.DataFrame):
+        df = _typed_frame(df)
+        if self.parquet_path:
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.parquet_path + '.tmp', TRAINING_SCHEMA, compression='zstd')
+            self._parquet.write_table(pa.Table.from_pandas(df, schema=TRAINING_SCHEMA, preserve_index=False))
+        if self.csv_path:
+            df.to_csv(self.csv_path + '.tmp', index=False, encoding='utf-8',
+                      mode='a' if self._csv_started else 'w', header=not self._csv_started)
+            self._csv_started = True
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            os.replace(self.parquet_path + '.tmp', self.parquet_path)
+        if self._csv_started:
+            os.replace(self.csv_path + '.tmp', self.csv_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_training_data(path: str = None, columns: list = None) -> pd.DataFrame:
+    """
+    Baca dataset training. columns=[...] : hanya kolom ini yang dibaca dari disk (Parquet)
+    atau di-parse (CSV). Kolom 'tags' selalu berupa list string.
+    """
+    path = resolve_training_file(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"FATAL: File {path} tidak ditemukan.")
+
+    if path.endswith('.parquet'):
+        if not parquet_available():
+            raise ImportError("Membaca dataset Parquet membutuhkan paket 'pyarrow' (pip install pyarrow).")
+        available = pq.read_schema(path).names
+        df = pq.read_table(path, columns=[c for c in columns if c in available] if columns else None).to_pandas()
+    else:
+        df = pd.read_csv(path, usecols=(lambda name: name in columns) if columns else None)
+    # Dataset lama bisa tidak punya kolom tertentu (mis. OCR gagal) -> isi nilai default
+    for name in columns or []:
+        if name not in df.columns:
+            df[name] = COLUMN_DEFAULTS.get(name)
+    if 'tags' in df.columns:
+        df['tags'] = df['tags'].map(normalize_tags)
+    return df
+
+
+def iter_training_chunks(path: str = None, chunk_size: int = 50000):
+    """Baca dataset per potongan (Parquet: per row group, CSV: chunk_size baris) -> memori tetap."""
+    path = resolve_training_file(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"FATAL: File {path} tidak ditemukan.")
+    if path.endswith('.parquet'):
+        parquet_file = pq.ParquetFile(path)
+        chunks = (parquet_file.read_row_group(group).to_pandas() for group in range(parquet_file.num_row_groups))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunk_size)
+    for df in chunks:
+        if 'tags' in df.columns:
+            df['tags'] = df['tags'].map(normalize_tags)
+        yield df
+
+
+def count_training_rows(path: str = None) -> int:
+    path = resolve_training_file(path)
+    if path.endswith('.parquet') and parquet_available():
+        return pq.ParquetFile(path).metadata.num_rows
+    return len(pd.read_csv(path, usecols=['id']))
+
+
+def export_csv(parquet_path: str = TRAINING_PARQUET_FILE, csv_path: str = TRAINING_CSV_FILE) -> int:
+    """Ekspor dataset Parquet ke CSV (per row group, memori tetap). Return: jumlah baris."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    rows = 0
+    tmp_file = csv_path + '.tmp'
+    for group in range(parquet_file.num_row_groups):
+        df = parquet_file.read_row_group(group).to_pandas()
+        df['tags'] = df['tags'].map(normalize_tags)
+        df.to_csv(tmp_file, index=False, encoding='utf-8', mode='w' if group == 0 else 'a', header=group == 0)
+        rows += len(df)
+    if rows == 0:
+        pd.DataFrame(columns=TRAINING_COLUMNS).to_csv(tmp_file, index=False, encoding='utf-8')
+    os.replace(tmp_file, csv_path)
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilitas dataset training (Parquet <-> CSV).")
+    parser.add_argument('--export-csv', action='store_true', help="Tulis ulang CSV dari dataset Parquet")
+    parser.add_argument('--parquet', default=TRAINING_PARQUET_FILE)
+    parser.add_argument('--csv', default=TRAINING_CSV_FILE)
+    args = parser.parse_args()
+
+    if args.export_csv:
+        print(f"✅ {export_csv(args.parquet, args.csv)} baris diekspor ke {args.csv}")
+    else:
+        print(f"-> {resolve_training_file()}: {count_training_rows()} baris")
@@ -0,0 +1,179 @@
+# demand_store.py
+
+import json
+import threading
+import time
+
+import config
+from journal_store import JournalStore
+
+KEYWORD_FILE = 'keywords.json'
+MAX_RECENT_NICHES = 50
+
+
+class DemandStore:
+    """
+    Penyimpanan lokal demand score (time series Google Trends) per keyword & region.
+
+    - Lookup dari memori (JournalStore), tanpa jaringan: cocok untuk validasi di GUI.
+    - Setiap nilai punya umur; nilai yang melewati TTL ditandai 'basi' (bukan diganti 0.0).
+    - Warmer di background me-refresh keywords.json + niche yang baru dipakai, batch 4+anchor.
+      Keyword yang gagal di-refresh ditunda dengan backoff eksponensial ('retry|<region>|<keyword>').
+    Skala antar refresh disamakan dengan rata-rata anchor yang pertama kali tersimpan.
+    """
+
+    STORE_FILE = 'demand_store.json'
+
+    def __init__(self, fetcher, store_file: str = None, ttl: float = None, region: str = config.SEARCH_REGION,
+                 anchor: str = config.TRENDS_ANCHOR_KEYWORD, retry_base: float = None):
+        self.fetcher = fetcher
+        self.ttl = ttl if ttl is not None else config.DEMAND_TTL_HOURS * 3600
+        self.retry_base = retry_base if retry_base is not None else config.DEMAND_RETRY_BASE_MIN * 60
+        self.region = region
+        self.anchor = anchor
+        self.store = JournalStore(store_file or self.STORE_FILE)
+
+        self._stop = threading.Event()
+        self._warmer = None
+
+    @staticmethod
+    def normalize(keyword: str) -> str:
+        return ' '.join(keyword.lower().split())
+
+    def _key(self, keyword: str) -> str:
+        return f"{self.region}|{self.normalize(keyword)}"
+
+    # --- Lookup ---
+    def lookup(self, keyword: str) -> dict:
+        """
+        Return {'score': float|None, 'age_hours': float|None, 'stale': bool, 'error': str|None}.
+        score None = belum pernah berhasil diambil (BUKAN nol).
+        """
+        entry = self.store.get(self._key(keyword))
+        if entry is None:
+            return {'score': None, 'age_hours': None, 'stale': True, 'error': None}
+        age = time.time() - entry['fetched_at']
+        return {
+            'score': entry['score'],
+            'age_hours': age / 3600,
+            'stale': age >= self.ttl,
+            'error': entry.get('error'),
+        }
+
+    def get_demand(self, keyword: str, wait: bool = True) -> dict:
+        """
+        Lookup lokal; keyword yang belum ada diambil langsung (wait=True) atau dijadwalkan ke warmer.
+        Keyword juga dicatat sebagai niche terbaru agar ikut di-refresh warmer.
+        """
+        self.remember_niche(keyword)
+        reading = self.lookup(keyword)
+        if reading['score'] is None and wait:
+            self.refresh([keyword])
+            reading = self.lookup(keyword)
+        return reading
+
+    # --- Refresh ---
+    def refresh(self, keywords: list) -> list:
+        """
+        Ambil ulang demand untuk keywords (batch 4 + anchor). Kegagalan tidak menghapus nilai lama.
+        Return: keyword yang gagal (dicatat untuk backoff warmer).
+        """
+        keywords = list(dict.fromkeys(self.normalize(kw) for kw in keywords if kw.strip()))
+        if not keywords:
+            return []
+        anchor_entry = self.store.get(self._key(self.anchor))
+        reference = anchor_entry['score'] if anchor_entry and anchor_entry['score'] else None
+
+        # Akses pytrends diserialkan oleh DataFetcher (_trends_lock), juga terhadap pemanggil lain
+        series = self.fetcher.get_demand_series(keywords, anchor=self.anchor, reference=reference, region=self.region)
+
+        now = time.time()
+        failed = [kw for kw in keywords if kw != self.anchor and series.get(kw) is None]
+        self.record_failures(failed)
+        for kw in keywords + [self.anchor]:
+            if kw not in series:
+                continue
+            points = series[kw]
+            old = self.store.get(self._key(kw))
+            if points is None:
+                # Trends gagal -> nilai lama dipertahankan (umurnya tetap bertambah), error dicatat
+                if old is not None:
+                    self.store.put(self._key(kw), dict(old, error=f"refresh gagal {time.strftime('%Y-%m-%d %H:%M')}"))
+                continue
+            score = sum(value for _, value in points) / len(points) if points else 5.0
+            self.store.put(self._key(kw), {
+                'keyword': kw,
+                'region': self.region,
+                'series': [[day, round(value, 2)] for day, value in points],
+                'score': score,
+                'fetched_at': now,
+                'error': None,
+            })
+            if self._retry_key(kw) in self.store:
+                self.store.delete(self._retry_key(kw))
+        return failed
+
+    # --- Backoff keyword yang gagal ---
+    def _retry_key(self, keyword: str) -> str:
+        return f"retry|{self._key(keyword)}"
+
+    def record_failures(self, keywords: list):
+        now = time.time()
+        for kw in keywords:
+            retry = self.store.get(self._retry_key(kw)) or {'failures': 0}
+            self.store.put(self._retry_key(kw), {'attempted_at': now, 'failures': retry['failures'] + 1})
+
+    def backing_off(self, keyword: str) -> bool:
+        """True jika refresh terakhir keyword gagal dan jeda backoff-nya (base * 2^(gagal-1), maks. TTL) belum habis."""
+        retry = self.store.get(self._retry_key(keyword))
+        if retry is None:
+            return False
+        delay = min(self.retry_base * 2 ** (retry['failures'] - 1), self.ttl)
+        return time.time() - retry['attempted_at'] < delay
+
+    # --- Warmer (background) ---
+    def remember_niche(self, keyword: str):
+        key = f"recent|{self.region}"
+        recent = [kw for kw in self.store.get(key, []) if kw != self.normalize(keyword)]
+        self.store.put(key, ([self.normalize(keyword)] + recent)[:MAX_RECENT_NICHES])
+
+    def warm_candidates(self) -> list:
+        """Niche terbaru dulu, lalu keywords.json; hanya yang belum ada atau sudah basi (dan tidak sedang backoff)."""
+        keywords = list(self.store.get(f"recent|{self.region}", []))
+        try:
+            with open(KEYWORD_FILE, 'r', encoding='utf-8') as f:
+                keywords += json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Warmer demand: {KEYWORD_FILE} tidak terbaca ({e})")
+        return [kw for kw in dict.fromkeys(self.normalize(kw) for kw in keywords)
+                if self.lookup(kw)['stale'] and not self.backing_off(kw)]
+
+    def start_warmer(self, interval: float = None, batch: int = 20):
+        """Jalankan thread daemon yang me-refresh `batch` keyword basi setiap `interval` detik."""
+        if self._warmer is not None:
+            return
+        interval = interval if interval is not None else config.DEMAND_WARM_INTERVAL_MIN * 60
+
+        def loop():
+            while not self._stop.is_set():
+                candidates = self.warm_candidates()
+                if candidates:
+                    try:
+                        failed = self.refresh(candidates[:batch])
+                    except Exception as e:
+                        print(f"⚠️ Warmer demand gagal: {e}")
+                        failed = candidates[:batch]
+                        self.record_failures(failed)
+                    # Masih ada antrean -> lanjut tanpa menunggu interval penuh,
+                    # kecuali batch ini gagal (mis. Trends throttling/429) -> tunggu interval penuh
+                    wait = 5 if len(candidates) > batch and not failed else interval
+                else:
+                    wait = interval
+                self._stop.wait(wait)
+
+        self._warmer = threading.Thread(target=loop, name='DemandWarmer', daemon=True)
+        self._warmer.start()
+
+    def close(self):
+        self._stop.set()
+        self.store.close()
@@ -0,0 +1,460 @@
+# fake_services.py
+# Server lokal pengganti YouTube Data API, Google Trends, thumbnail ytimg dan Gemini.
+# Dipakai untuk benchmark / load test tanpa memakan kuota asli. Semua respons deterministik dari seed.
+#
+#   /youtube/v3/search|videos|channels|playlistItems : format JSON YouTube Data API v3 (fields= dihormati)
+#   /trends/interest?kw=a,b&geo=ID                    : minat per minggu, dinormalisasi 0-100 per payload
+#   /trends/related?kw=a                               : related queries (top)
+#   /vi/<video_id>/<varian>.jpg                        : thumbnail (mendukung ETag / 304)
+#   /v1beta/models/<model>:generateContent            : respons mirip Gemini
+#   /__stats                                           : jumlah request & kuota terpakai
+#
+# Contoh (server berdiri sendiri):
+#   python fake_services.py --port 8765 --latency 0.05 --error-rate 0.02 --quota 10000
+#   set YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765
+#   set TRENDS_ENDPOINT=http://127.0.0.1:8765
+#   set GEMINI_API_ENDPOINT=http://127.0.0.1:8765
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from io import BytesIO
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+from PIL import Image, ImageDraw, ImageFont
+
+from quota_ledger import endpoint_cost
+
+SAMPLE_WORDS = ["RAHASIA", "CARA", "CEPAT", "KAYA", "JANGAN", "LAKUKAN", "INI", "OTAK", "FOKUS", "SUKSES", "TIPS", "HARI"]
+TITLE_WORDS = ["cara", "rahasia", "tips", "belajar", "fokus", "produktif", "otak", "kebiasaan", "sukses", "pagi",
+               "hemat", "uang", "cepat", "mudah", "fakta", "sains", "psikologi", "lakukan", "jangan", "ini"]
+CHANNEL_POOL = 60     # Jumlah channel palsu tempat video hasil search berasal
+TRENDS_WEEKS = 52
+
+
+def _load_font(size: int = 36):
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def make_thumbnail(seed: int) -> bytes:
+    """Membuat thumbnail 480x360 (mirip hqdefault) dengan teks acak yang deterministik."""
+    rng = random.Random(seed)
+    img = Image.new('RGB', (480, 360), tuple(rng.randint(0, 120) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    font = _load_font()
+    # Sebagian thumbnail sengaja tanpa teks
+    for line in range(rng.randint(0, 3)):
+        text = ' '.join(rng.sample(SAMPLE_WORDS, rng.randint(1, 3)))
+        draw.text((30, 40 + line * 90), text, fill=(255, 255, 255), font=font)
+    buf = BytesIO()
+    img.save(buf, format='JPEG', quality=85)
+    return buf.getvalue()
+
+
+def parse_fields(spec: str) -> dict:
+    """
+    Sintaks partial response YouTube -> pohon {nama: subpohon atau None (seluruh nilai)}.
+    'items(id,snippet/title),nextPageToken' -> {'items': {'id': None, 'snippet': {'title': None}}, 'nextPageToken': None}
+    """
+    tree, _ = _parse_field_list(spec, 0)
+    return tree
+
+
+def _parse_field_list(spec: str, pos: int):
+    tree = {}
+    while pos < len(spec) and spec[pos] != ')':
+        end = pos
+        while end < len(spec) and spec[end] not in ',()':
+            end += 1
+        path = [name.strip() for name in spec[pos:end].split('/')]
+        sub = None
+        if end < len(spec) and spec[end] == '(':
+            sub, end = _parse_field_list(spec, end + 1)
+            end += 1  # lewati ')'
+        _merge_field_path(tree, path, sub)
+        pos = end + 1 if end < len(spec) and spec[end] == ',' else end
+    return tree, pos
+
+
+def _merge_field_path(tree: dict, path: list, sub):
+    for name in path[:-1]:
+        if name in tree and tree[name] is None:
+            return  # Sudah diminta utuh
+        tree = tree.setdefault(name, {})
+    last = path[-1]
+    if sub is None or tree.get(last, {}) is None:
+        tree[last] = None
+    else:
+        for name, child in sub.items():
+            _merge_field_path(tree.setdefault(last, {}), [name], child)
+
+
+def apply_fields(value, tree):
+    """Buang semua field yang tidak diminta (list diterapkan per elemen)."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {name: apply_fields(value[name], sub) for name, sub in tree.items() if name in value}
+
+
+class FakeServices:
+    """
+    Server HTTP (multi-thread) yang meniru layanan eksternal proyek ini.
+    latency      : detik tambahan per request
+    error_rate   : peluang respons 5xx/429 (dicoba ulang oleh klien)
+    quota        : total unit YouTube sebelum semua request dibalas 403 quotaExceeded (None = tanpa batas)
+    """
+
+    def __init__(self, seed: int = 0, latency: float = 0.0, error_rate: float = 0.0, quota: int = None, port: int = 0):
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota = quota
+        self.quota_used = 0
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._thumbnails = {}
+
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # Keep-alive, seperti server Google
+
+            def do_GET(self):
+                services._handle(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                services._handle(self, self.rfile.read(length) if length else b'')
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Data deterministik ---
+    def _rand(self, *parts) -> random.Random:
+        digest = hashlib.sha1('|'.join(str(p) for p in (self.seed,) + parts).encode('utf-8')).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def _make_id(self, length: int, *parts) -> str:
+        rng = self._rand('id', *parts)
+        alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+        return ''.join(rng.choice(alphabet) for _ in range(length))
+
+    def channel_id(self, index: int) -> str:
+        return 'UC' + self._make_id(22, 'channel', index)
+
+    def channel_video_count(self, channel_id: str) -> int:
+        return 20 + self._rand('count', channel_id).randint(0, 400)
+
+    def channel_video_id(self, channel_id: str, index: int) -> str:
+        return self._make_id(11, 'upload', channel_id, index)
+
+    def video_channel(self, video_id: str) -> str:
+        return self.channel_id(self._rand('owner', video_id).randrange(CHANNEL_POOL))
+
+    def video_item(self, video_id: str, parts: set) -> dict:
+        rng = self._rand('video', video_id)
+        title = ' '.join(rng.sample(TITLE_WORDS, rng.randint(3, 7))).capitalize()
+        views = int(rng.lognormvariate(9, 2))
+        item = {'kind': 'youtube#video', 'id': video_id}
+        if 'snippet' in parts:
+            published = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randint(0, 60 * 24 * 600))
+            item['snippet'] = {
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'channelId': self.video_channel(video_id),
+                'title': title,
+                'description': f"{title}. " + ' '.join(rng.choices(TITLE_WORDS, k=rng.randint(0, 40))),
+                'tags': rng.sample(TITLE_WORDS, rng.randint(0, 6)) or None,
+                'thumbnails': {variant: {'url': f"{self.base_url}/vi/{video_id}/{variant}.jpg"}
+                               for variant in ('default', 'medium', 'high')},
+            }
+            if item['snippet']['tags'] is None:
+                del item['snippet']['tags']
+        if 'statistics' in parts:
+            item['statistics'] = {
+                'viewCount': str(views),
+                'likeCount': str(int(views * rng.uniform(0.005, 0.08))),
+                'commentCount': str(int(views * rng.uniform(0.0002, 0.004))),
+            }
+        if 'contentDetails' in parts:
+            seconds = rng.randint(10, 179) if rng.random() < 0.85 else rng.randint(180, 1800)
+            item['contentDetails'] = {'duration': f"PT{seconds // 60}M{seconds % 60}S" if seconds >= 60 else f"PT{seconds}S"}
+        return item
+
+    def search_ids(self, query: str, count: int) -> list:
+        return [self._make_id(11, 'search', query.lower().strip(), i) for i in range(count)]
+
+    def interest(self, keyword: str) -> list:
+        """Volume mingguan mentah (sebelum normalisasi per payload)."""
+        rng = self._rand('trends', keyword.lower().strip())
+        base = rng.lognormvariate(3, 1.2)
+        return [max(base * (1 + 0.3 * rng.uniform(-1, 1)), 0.0) for _ in range(TRENDS_WEEKS)]
+
+    # --- Routing ---
+    def _handle(self, handler, body):
+        started = time.perf_counter()
+        url = urlsplit(handler.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        path = url.path
+
+        if self.latency:
+            time.sleep(self.latency)
+        if path == '/__stats':
+            return self._send_json(handler, 200, self.stats())
+
+        if path.startswith('/vi/'):
+            kind = 'thumbnail'
+        elif path.startswith('/trends/'):
+            kind = 'trends'
+        elif ':generateContent' in path:
+            kind = 'gemini'
+        else:
+            kind = 'youtube.' + path.rstrip('/').rsplit('/', 1)[-1] + '.list'
+        with self._lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            fail = self.error_rate and self._rng.random() < self.error_rate
+
+        try:
+            if fail and kind != 'thumbnail':
+                status = 429 if kind == 'trends' else 503
+                return self._send_json(handler, status, self._error(status, 'backendError', "Injected failure"))
+            if kind == 'thumbnail':
+                return self._thumbnail(handler, path)
+            if kind == 'trends':
+                return self._trends(handler, path, params)
+            if kind == 'gemini':
+                return self._gemini(handler, body)
+            return self._youtube(handler, kind, params)
+        finally:
+            with self._lock:
+                self.counts[kind + '.seconds'] = self.counts.get(kind + '.seconds', 0.0) + time.perf_counter() - started
+
+    def _youtube(self, handler, method_id, params):
+        with self._lock:
+            if self.quota is not None and self.quota_used + endpoint_cost(method_id) > self.quota:
+                return self._send_json(handler, 403, self._error(
+                    403, 'quotaExceeded', "The request cannot be completed because you have exceeded your quota."))
+            self.quota_used += endpoint_cost(method_id)
+
+        response = self._youtube_response(method_id, params)
+        if response is None:
+            return self._send_json(handler, 404, self._error(404, 'notFound', f"Unknown method {method_id}"))
+        if params.get('fields'):
+            response = apply_fields(response, parse_fields(params['fields']))
+        return self._send_json(handler, 200, response)
+
+    def _youtube_response(self, method_id, params):
+        parts = set(params.get('part', 'snippet').split(','))
+        max_results = min(int(params.get('maxResults', 5)), 50)
+        if method_id == 'youtube.search.list':
+            if params.get('type') == 'channel':
+                index = self._rand('channel-search', params.get('q', '')).randrange(CHANNEL_POOL)
+                channel_id = self.channel_id(index)
+                items = [{'id': {'kind': 'youtube#channel', 'channelId': channel_id},
+                          'snippet': {'title': f"Channel {params.get('q', '').title()}", 'channelId': channel_id}}]
+            elif params.get('channelId'):
+                channel_id = params['channelId']
+                uploads = [self.channel_video_id(channel_id, i) for i in range(self.channel_video_count(channel_id))]
+                uploads.sort(key=lambda vid: -int(self.video_item(vid, {'statistics'})['statistics']['viewCount']))
+                items = [{'id': {'kind': 'youtube#video', 'videoId': vid}} for vid in uploads[:max_results]]
+            else:
+                items = [{'id': {'kind': 'youtube#video', 'videoId': vid},
+                          'snippet': self.video_item(vid, {'snippet'})['snippet']}
+                         for vid in self.search_ids(params.get('q', ''), max_results)]
+            return {'kind': 'youtube#searchListResponse', 'items': items}
+
+        if method_id == 'youtube.videos.list':
+            ids = [vid for vid in params.get('id', '').split(',') if vid][:50]
+            items = [self.video_item(vid, parts) for vid in ids]
+            return {'kind': 'youtube#videoListResponse', 'items': items}
+
+        if method_id == 'youtube.channels.list':
+            items = []
+            for channel_id in [cid for cid in params.get('id', '').split(',') if cid][:50]:
+                items.append({
+                    'id': channel_id,
+                    'snippet': {'title': f"Channel {channel_id[2:8]}"},
+                    'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}},
+                    'statistics': {'videoCount': str(self.channel_video_count(channel_id))},
+                })
+            return {'kind': 'youtube#channelListResponse', 'items': items}
+
+        if method_id == 'youtube.playlistItems.list':
+            channel_id = 'UC' + params.get('playlistId', 'UU')[2:]
+            total = self.channel_video_count(channel_id)
+            offset = int(params.get('pageToken') or 0)
+            items = [{'contentDetails': {'videoId': self.channel_video_id(channel_id, i)}}
+                     for i in range(offset, min(offset + max_results, total))]
+            response = {'kind': 'youtube#playlistItemListResponse', 'items': items,
+                        'pageInfo': {'totalResults': total}}
+            if offset + max_results < total:
+                response['nextPageToken'] = str(offset + max_results)
+            return response
+
+        return None
+
+    def _trends(self, handler, path, params):
+        keywords = [kw for kw in params.get('kw', '').split(',') if kw][:5]
+        if path.endswith('/related'):
+            related = {}
+            for kw in keywords:
+                rng = self._rand('related', kw.lower())
+                related[kw] = [{'query': f"{kw} {word}", 'value': rng.randint(10, 100)}
+                               for word in rng.sample(TITLE_WORDS, rng.randint(0, 6))]
+            return self._send_json(handler, 200, {'top': related})
+
+        # Seperti Trends: angka bulat 0-100, relatif terhadap nilai tertinggi DI PAYLOAD INI
+        raw = {kw: self.interest(kw) for kw in keywords}
+        peak = max((max(values) for values in raw.values()), default=0) or 1.0
+        start = datetime(2025, 1, 5)
+        return self._send_json(handler, 200, {
+            'dates': [(start + timedelta(weeks=i)).strftime('%Y-%m-%d') for i in range(TRENDS_WEEKS)],
+            'series': {kw: [round(value / peak * 100) for value in values] for kw, values in raw.items()},
+        })
+
+    def _thumbnail(self, handler, path):
+        video_id = path.split('/')[2] if len(path.split('/')) > 2 else ''
+        etag = '"' + hashlib.sha1(f"{self.seed}|{video_id}".encode('utf-8')).hexdigest()[:16] + '"'
+        if handler.headers.get('If-None-Match') == etag:
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+        with self._lock:
+            body = self._thumbnails.get(video_id)
+        if body is None:
+            body = make_thumbnail(int(hashlib.sha1(f"{self.seed}|{video_id}".encode('utf-8')).hexdigest()[:8], 16))
+            with self._lock:
+                self._thumbnails[video_id] = body
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'image/jpeg')
+        handler.send_header('ETag', etag)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _gemini(self, handler, body):
+        try:
+            request = json.loads(body or b'{}')
+            prompt = ' '.join(part.get('text', '') for content in request.get('contents', [])
+                              for part in content.get('parts', []))
+        except (json.JSONDecodeError, AttributeError):
+            return self._send_json(handler, 400, self._error(400, 'invalidArgument', "Invalid JSON payload"))
+        rng = self._rand('gemini', hashlib.sha1(prompt.encode('utf-8')).hexdigest())
+        points = ''.join(f"<li>{' '.join(rng.sample(TITLE_WORDS, 5)).capitalize()}</li>" for _ in range(5))
+        text = f"<h3>Analisis (server lokal)</h3><ul>{points}</ul><p>Prompt: {len(prompt)} karakter.</p>"
+        return self._send_json(handler, 200, {
+            'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}, 'finishReason': 'STOP', 'index': 0}],
+            'usageMetadata': {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4,
+                              'totalTokenCount': (len(prompt) + len(text)) // 4},
+        })
+
+    @staticmethod
+    def _error(code: int, reason: str, message: str) -> dict:
+        return {'error': {'code': code, 'message': message, 'errors': [{'reason': reason, 'message': message}]}}
+
+    @staticmethod
+    def _send_json(handler, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=UTF-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'quota_used': self.quota_used, 'requests': dict(self.counts)}
+
+
+class FakeTrendsClient:
+    """
+    Pengganti pytrends.TrendReq yang memanggil endpoint /trends di FakeServices.
+    Antarmuka yang dipakai DataFetcher: build_payload, interest_over_time, related_queries.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.kw_list = []
+        self.geo = ''
+
+    def build_payload(self, kw_list, cat=0, timeframe='today 5-y', geo='', gprop=''):
+        self.kw_list = list(kw_list)
+        self.geo = geo
+
+    def _get(self, endpoint):
+        response = self.session.get(f"{self.base_url}/trends/{endpoint}",
+                                    params={'kw': ','.join(self.kw_list), 'geo': self.geo}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def interest_over_time(self):
+        import pandas as pd
+
+        data = self._get('interest')
+        if not data['dates']:
+            return pd.DataFrame()
+        df = pd.DataFrame(data['series'], index=pd.to_datetime(data['dates']))
+        df.index.name = 'date'
+        df['isPartial'] = False
+        return df
+
+    def related_queries(self):
+        import pandas as pd
+
+        data = self._get('related')['top']
+        return {kw: {'top': pd.DataFrame(rows) if rows else None, 'rising': None} for kw, rows in data.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server lokal pengganti YouTube API / Trends / Gemini.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help="Detik tambahan per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Peluang respons 5xx/429")
+    parser.add_argument('--quota', type=int, default=None, help="Batas unit YouTube sebelum 403 quotaExceeded")
+    args = parser.parse_args()
+
+    server = FakeServices(seed=args.seed, latency=args.latency, error_rate=args.error_rate, quota=args.quota, port=args.port)
+    print(f"✅ Fake services aktif di {server.base_url} (Ctrl+C untuk berhenti)")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
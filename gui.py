@@ -2,7 +2,6 @@
 # VERSI FINAL - FIX TOMBOL STATUS MODEL
 
 import sys
-import numpy as np
 import os
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
@@ -14,10 +13,11 @@ from PyQt5.QtGui import QFont, QIcon, QColor
 
 # --- IMPORT MODUL INTI (TETAP SAMA) ---
 from feature_calculator import FeatureCalculator
-from model_trainer import ModelTrainer
+from model_trainer import ModelTrainer, stack_features, fit_feature_width, predict_proba_sparse
 from nlp_processor import NLPProcessor
 from ocr_processor import OCRProcessor
 from data_fetcher import DataFetcher
+from demand_store import DemandStore
 from ai_advisor import AIAdvisor
 
 class ContentGapApp(QWidget):
@@ -36,6 +36,9 @@ class ContentGapApp(QWidget):
             self.nlp_processor = NLPProcessor()
             self.ocr_processor = OCRProcessor()
             self.fetcher = DataFetcher()
+            # Demand score dibaca dari disk; warmer me-refresh keywords.json & niche terbaru di background
+            self.demand_store = DemandStore(self.fetcher)
+            self.demand_store.start_warmer()
             self.ai_advisor = AIAdvisor()
             
             self.is_ready = False
@@ -320,7 +323,7 @@ class ContentGapApp(QWidget):
         self.metrics_display.setText("⏳ Sedang melatih model... Mohon tunggu.")
         QApplication.processEvents()
         
-        data_file = "shorts_training_data.csv" # Pastikan file ini ada
+        data_file = None # Default: shorts_training_data.parquet (atau .csv jika belum ada)
         model_file = "ensemble_model.pkl"
         vectorizer_file = "tfidf_vectorizer.pkl"
         
@@ -384,6 +387,7 @@ class ContentGapApp(QWidget):
         QMessageBox.information(self, "Sukses", "Data ditransfer ke halaman Validasi.")
 
     def run_market_dominator(self):
+        self.fetcher.quota.set_stage('market-dominator')
         niche = self.niche_input.text().strip()
         if not niche: 
             QMessageBox.warning(self, "Input", "Masukkan Niche dulu!")
@@ -417,6 +421,7 @@ class ContentGapApp(QWidget):
             self.intel_result_area.setText(f"Error Blue Ocean: {str(e)}")
 
     def run_content_mining(self):
+        self.fetcher.quota.set_stage('content-mining')
         vid_id = self.video_id_input.text().strip()
         if not vid_id: return
         self.intel_result_area.append("\n\n🔄 Mengambil Data Video...")
@@ -433,6 +438,7 @@ class ContentGapApp(QWidget):
 
     #klasifikasi
     def run_analysis(self):
+        self.fetcher.quota.set_stage('validasi')
         if not self.is_ready: return
         title = self.title_input.text()
         tags_str = self.tags_input.text()
@@ -443,45 +449,56 @@ class ContentGapApp(QWidget):
         QApplication.processEvents()
         try:
             
-            demand = self.fetcher.get_demand_score(main_kw)
+            reading = self.demand_store.get_demand(main_kw)
+            demand = reading['score']
+            if demand is None:
+                demand_note = " (tidak tersedia)"
+            elif reading['stale']:
+                demand_note = f" (basi, umur {reading['age_hours']:.0f} jam)"
+            else:
+                demand_note = ""
             comps = self.fetcher.search_youtube_videos(main_kw, max_results=20)
+            if self.fetcher.cache:
+                print(f"-> {self.fetcher.cache.stats()}")
             supply = len(comps) * 50 if comps else 10
             q_score = 0.01
             if comps:
                 total_cqs = sum([self.nlp_processor.calculate_proxy_cqs(v.raw_views, v.raw_likes, v.raw_comments) for v in comps])
                 q_score = total_cqs / len(comps)
 
-            text_vec = self.nlp_processor.get_semantic_embedding(title + " " + tags_str)
+            text_vec = self.nlp_processor.get_sparse_embedding(title + " " + tags_str)
             emotion = self.nlp_processor.analyze_title_emotion(title)
             density = 0.0 
-            proxy = np.array([emotion, density])
-
-            inp = np.concatenate((text_vec, proxy)).astype(np.float32).reshape(1, -1)
-            exp_dim = self.trainer.model.n_features_in_
 
-            if inp.shape[1] < exp_dim:
-                inp = np.concatenate((inp, np.zeros((1, exp_dim - inp.shape[1]))), axis=1)
-            elif inp.shape[1] > exp_dim: inp = inp[:, :exp_dim]
+            # Satu baris CSR (TF-IDF + proxy), disesuaikan dengan jumlah fitur model
+            inp = fit_feature_width(stack_features(text_vec, [emotion, density]), self.trainer.model.n_features_in_)
             
-            probs = self.trainer.model.predict_proba(inp)[0]
+            probs = predict_proba_sparse(self.trainer.model, inp)[0]
+            emb = self.nlp_processor.embedding_cache_stats()
+            print(f"-> Cache embedding: hit rate {emb['hit_rate'] * 100:.0f}%, {emb['size']}/{emb['max_size']} entri")
             success_probability = probs[1]
             threshold = 0.35 
 
             #decision & gap score making
-            if success_probability > threshold:
-                label = "SUCCESS"
-                gap_score = FeatureCalculator.calculate_strategic_gap_score(demand, supply, q_score) * 1.5
+            label = "SUCCESS" if success_probability > threshold else "FAILURE"
+            if demand is None:
+                # Demand belum pernah berhasil diambil -> gap score tidak dihitung (bukan dianggap 0)
+                gap_text = "Gap Score: - / 10.0 (demand tidak tersedia)"
+                demand_text = "-"
             else:
-                label = "FAILURE"
                 gap_score = FeatureCalculator.calculate_strategic_gap_score(demand, supply, q_score)
-            gap_score = min(gap_score, 10.0)
+                if label == "SUCCESS":
+                    gap_score *= 1.5
+                gap_score = min(gap_score, 10.0)
+                gap_text = f"Gap Score: {gap_score:.1f} / 10.0"
+                demand_text = f"{demand:.0f}"
             
             color = "#2e7d32" if label == "SUCCESS" else "#c62828"
             self.output_text_area.setText(
                 f"<div style='text-align:center; margin-top:10px;'>"
                 f"<h1 style='color:{color}; font-size: 24pt;'>{label}</h1>"
-                f"<h2>Gap Score: {gap_score:.1f} / 10.0</h2><hr>"
-                f"<p>Confidence: {success_probability*100:.1f}% | Demand: {demand:.0f}</p></div>"
+                f"<h2>{gap_text}</h2><hr>"
+                f"<p>Confidence: {success_probability*100:.1f}% | Demand: {demand_text}{demand_note}</p></div>"
             )
         except Exception as e:
             self.output_text_area.setText(f"Error: {e}")
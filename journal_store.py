@@ -0,0 +1,199 @@
+# journal_store.py
+
+import json
+import os
+import queue
+import threading
+import atexit
+
+
+class JournalStore:
+    """
+    Penyimpanan key-value persisten (append-only) yang aman untuk multi-thread.
+
+    Format di disk:
+    1. Snapshot  : file JSON biasa berisi dict (format lama `ocr_cache.json` tetap terbaca).
+    2. Journal   : file `<snapshot>.journal`, satu baris JSON per perubahan.
+
+    Semua penulisan dilakukan oleh SATU thread penulis (write-behind), sehingga
+    thread pemanggil tidak pernah menunggu disk. Lookup O(1) dari dict di memori.
+
+    Compaction dipicu oleh ukuran: journal ditulis ulang ke snapshot saat byte journal
+    melebihi ukuran snapshot (minimal compact_min_bytes). Total byte yang ditulis tetap
+    sebanding dengan jumlah perubahan, berapa pun besar store-nya.
+    """
+
+    def __init__(self, snapshot_file: str, compact_min_bytes: int = 1024 * 1024, fsync: bool = False):
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + '.journal'
+        self.compact_min_bytes = compact_min_bytes
+        self.fsync = fsync
+
+        self._data = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._closed = False
+
+        self._recover()
+
+        self._writer = threading.Thread(target=self._writer_loop, name='JournalStoreWriter', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --- Pemulihan (Crash-Safe Recovery) ---
+    def _recover(self):
+        """
+        Muat snapshot lalu putar ulang journal. Baris terakhir yang terpotong (crash saat menulis)
+        dipotong dari file, supaya penulisan berikutnya tidak menempel pada potongan tersebut.
+        """
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                if isinstance(snapshot, dict):
+                    self._data.update(snapshot)
+                self._snapshot_bytes = os.path.getsize(self.snapshot_file)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️ Snapshot {self.snapshot_file} rusak, diabaikan: {e}")
+
+        if not os.path.exists(self.journal_file):
+            return
+        good_offset = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Baris terakhir tanpa newline = penulisan tidak selesai
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                if entry.get('d'):
+                    self._data.pop(entry['k'], None)
+                else:
+                    self._data[entry['k']] = entry['v']
+                good_offset += len(line)
+        if good_offset < os.path.getsize(self.journal_file):
+            print(f"⚠️ Journal {self.journal_file} terpotong, dipulihkan sampai byte {good_offset}.")
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(good_offset)
+        self._journal_bytes = good_offset
+
+    # --- API Publik ---
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def put(self, key, value):
+        """Simpan nilai di memori, penulisan ke disk diantrikan ke thread penulis."""
+        with self._lock:
+            self._check_open()
+            self._data[key] = value
+            # Antri di dalam lock agar urutan journal sama dengan urutan di memori
+            self._queue.put(('put', key, value))
+
+    def delete(self, key):
+        with self._lock:
+            self._check_open()
+            self._data.pop(key, None)
+            self._queue.put(('del', key, None))
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError(f"JournalStore {self.snapshot_file} sudah ditutup, perubahan tidak akan tersimpan.")
+
+    def flush(self):
+        """Tunggu sampai semua perubahan yang diantrikan sudah tertulis ke journal."""
+        if not self._closed:
+            self._queue.join()
+
+    def compact(self):
+        """Minta thread penulis menulis ulang snapshot dan mengosongkan journal."""
+        if not self._closed:
+            self._queue.put(('compact', None, None))
+            self._queue.join()
+
+    def close(self):
+        """Flush + compaction terakhir, lalu hentikan thread penulis."""
+        with self._lock:
+            if self._closed:
+                return
+            # Ditandai di dalam lock: put() berikutnya ditolak, put() sebelumnya sudah di antrian
+            self._closed = True
+            self._queue.put(('compact', None, None))
+            self._queue.put(('stop', None, None))
+        self._writer.join()
+
+    # --- Thread Penulis Tunggal ---
+    def _writer_loop(self):
+        journal = open(self.journal_file, 'ab')
+        running = True
+        while running:
+            ops = [self._queue.get()]
+            # Kumpulkan semua yang sudah antri agar sekali flush untuk banyak entri
+            while True:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for op, key, value in ops:
+                    if op in ('put', 'del'):
+                        entry = {'k': key, 'v': value} if op == 'put' else {'k': key, 'd': 1}
+                        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+                        journal.write(line)
+                        self._journal_bytes += len(line)
+                    elif op == 'compact':
+                        journal = self._compact(journal)
+                    elif op == 'stop':
+                        running = False
+                journal.flush()
+                if self.fsync:
+                    os.fsync(journal.fileno())
+
+                if running and self._journal_bytes > max(self._snapshot_bytes, self.compact_min_bytes):
+                    journal = self._compact(journal)
+            except Exception as e:
+                print(f"🚨 ERROR: Gagal menulis {self.journal_file}: {e}")
+            finally:
+                for _ in ops:
+                    self._queue.task_done()
+        journal.close()
+
+    def _compact(self, journal):
+        """Tulis snapshot secara atomik (tmp + rename), baru kemudian kosongkan journal."""
+        journal.flush()
+        with self._lock:
+            snapshot = dict(self._data)
+
+        tmp_file = self.snapshot_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        self._snapshot_bytes = os.path.getsize(tmp_file)
+        os.replace(tmp_file, self.snapshot_file)
+
+        # Jika crash di antara dua langkah ini, journal hanya diputar ulang (idempotent)
+        journal.close()
+        journal = open(self.journal_file, 'wb')
+        self._journal_bytes = 0
+        return journal
@@ -0,0 +1,238 @@
+# load_generator.py
+# Uji beban end-to-end terhadap fake_services.py (tanpa kuota YouTube/Gemini asli).
+#   collect  : collect_raw_data (search + detail paralel) -> throughput keyword/s & video/s
+#   label    : process_and_label_data (OCR thumbnail dari server lokal) pada hasil collect
+#   analysis : alur run_analysis (demand + kompetitor + skor gap) berulang dengan N pengguna paralel
+#   advisor  : analyze_market_clusters (Gemini lokal)
+# Setiap skenario melaporkan throughput dan latensi p50/p90/p99.
+#
+# Contoh:
+#   python load_generator.py --scenarios collect label analysis --keywords 100 --latency 0.05
+#   python load_generator.py --scenarios analysis --requests 500 --users 16 --repeat-ratio 0.8
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from fake_services import FakeServices, TITLE_WORDS
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class LatencyRecorder:
+    """Kumpulan durasi (detik) per nama operasi, aman untuk multi-thread."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def timed(self, name: str, fn):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        return wrapper
+
+    def report(self, title: str, wall: float, units: int = None, unit_name: str = 'operasi'):
+        print(f"\n[{title}] wall {wall:.2f}s" + (f" | {units} {unit_name} = {units / wall:.2f} {unit_name}/s" if units else ""))
+        print(f"   {'operasi':<28} {'n':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'maks ms':>9}")
+        for name, values in sorted(self.samples.items()):
+            print(f"   {name:<28} {len(values):>6} {percentile(values, 50) * 1000:>9.1f} {percentile(values, 90) * 1000:>9.1f} "
+                  f"{percentile(values, 99) * 1000:>9.1f} {max(values) * 1000:>9.1f}")
+
+
+def point_clients_at(server: FakeServices, budget: int):
+    """Arahkan semua klien (YouTube, Trends, Gemini) ke server lokal."""
+    config.YOUTUBE_API_ENDPOINT = server.base_url
+    config.TRENDS_ENDPOINT = server.base_url
+    config.GEMINI_API_ENDPOINT = server.base_url
+    config.YOUTUBE_API_KEY = config.YOUTUBE_API_KEY or 'fake-key'
+    config.YOUTUBE_API_KEYS = [key for key in config.YOUTUBE_API_KEYS if key] or [config.YOUTUBE_API_KEY]
+    config.GEMINI_API_KEY = config.GEMINI_API_KEY or 'fake-key'
+    config.YOUTUBE_DAILY_QUOTA_BUDGET = budget
+
+
+def instrument_fetcher(recorder: LatencyRecorder):
+    """Catat latensi setiap panggilan HTTP ke YouTube API (di bawah cache respons)."""
+    from data_fetcher import DataFetcher
+
+    original = DataFetcher._execute_http
+
+    def _execute_http(self, request):
+        started = time.perf_counter()
+        try:
+            return original(self, request)
+        finally:
+            recorder.record(f"http {request.methodId.split('.')[1]}", time.perf_counter() - started)
+
+    DataFetcher._execute_http = _execute_http
+    return lambda: setattr(DataFetcher, '_execute_http', original)
+
+
+def make_keywords(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [' '.join(rng.sample(TITLE_WORDS, rng.randint(1, 3))) + f" {i}" for i in range(count)]
+
+
+def run_collect(args, recorder: LatencyRecorder):
+    import data_collector
+
+    with open(data_collector.KEYWORD_FILE, 'w', encoding='utf-8') as f:
+        json.dump(make_keywords(args.keywords, args.seed), f)
+    started = time.perf_counter()
+    data_collector.collect_raw_data(concurrency=args.concurrency, rate=args.rate, burst=args.burst)
+    wall = time.perf_counter() - started
+    with open(data_collector.OUTPUT_FILE, 'r', encoding='utf-8') as f:
+        videos = sum(1 for _ in f)
+    recorder.report("collect", wall, videos, 'video')
+    print(f"   keyword/s: {args.keywords / wall:.2f}")
+
+
+def run_label(args, recorder: LatencyRecorder):
+    import data_labeler
+    from dataset_io import count_training_rows
+
+    started = time.perf_counter()
+    data_labeler.process_and_label_data()
+    wall = time.perf_counter() - started
+    rows = count_training_rows()
+    recorder.report("label", wall, rows, 'baris')
+
+
+def run_analysis(args, recorder: LatencyRecorder):
+    """Alur yang sama dengan ContentGapApp.run_analysis, tanpa GUI."""
+    from data_fetcher import DataFetcher
+    from demand_store import DemandStore
+    from feature_calculator import FeatureCalculator
+    from model_trainer import stack_features, fit_feature_width, predict_proba_sparse
+    from nlp_processor import NLPProcessor
+
+    fetcher = DataFetcher()
+    fetcher.quota.set_stage('load-analysis')
+    demand_store = DemandStore(fetcher)
+    nlp = NLPProcessor()
+    model = None
+    try:
+        import joblib
+        model = joblib.load(os.path.join(REPO_DIR, 'ensemble_model.pkl'))
+        nlp.load_vectorizer(os.path.join(REPO_DIR, 'tfidf_vectorizer.pkl'))
+    except Exception as e:
+        print(f"⚠️ Model tidak dimuat ({e}); tahap prediksi dilewati.")
+
+    rng = random.Random(args.seed)
+    pool = make_keywords(max(int(args.requests * (1 - args.repeat_ratio)), 1), args.seed + 1)
+    titles = [rng.choice(pool) for _ in range(args.requests)]
+
+    def analyze(title):
+        started = time.perf_counter()
+        reading = recorder.timed('demand', demand_store.get_demand)(title)
+        demand = reading['score']
+        comps = recorder.timed('kompetitor (search+detail)', fetcher.search_youtube_videos)(title, max_results=20)
+        supply = len(comps) * 50 if comps else 10
+        q_score = 0.01
+        if comps:
+            q_score = sum(nlp.calculate_proxy_cqs(v.raw_views, v.raw_likes, v.raw_comments) for v in comps) / len(comps)
+        if model is not None:
+            step = time.perf_counter()
+            vec = nlp.get_sparse_embedding(title)
+            inp = fit_feature_width(stack_features(vec, [nlp.analyze_title_emotion(title), 0.0]), model.n_features_in_)
+            predict_proba_sparse(model, inp)
+            recorder.record('prediksi model', time.perf_counter() - step)
+        if demand is not None:
+            # Demand tidak tersedia -> gap score tidak dihitung (bukan dianggap 0)
+            FeatureCalculator.calculate_strategic_gap_score(demand, supply, q_score)
+        recorder.record('run_analysis total', time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        list(executor.map(analyze, titles))
+    wall = time.perf_counter() - started
+    recorder.report("analysis", wall, args.requests, 'validasi')
+    if fetcher.cache:
+        print(f"   {fetcher.cache.stats()}")
+    emb = nlp.embedding_cache_stats()
+    print(f"   cache embedding: hit rate {emb['hit_rate'] * 100:.0f}% ({emb['hits']} hit, {emb['misses']} miss), "
+          f"{emb['size']}/{emb['max_size']} entri, {emb['bytes'] / 1024:.0f} KB")
+    demand_store.close()
+
+
+def run_advisor(args, recorder: LatencyRecorder):
+    from ai_advisor import AIAdvisor
+
+    advisor = AIAdvisor()
+    rng = random.Random(args.seed)
+    bulk = [{'title': ' '.join(rng.sample(TITLE_WORDS, 5)), 'views': rng.randint(100, 10 ** 6),
+             'keyword_source': rng.choice(TITLE_WORDS)} for _ in range(40)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        list(executor.map(lambda _: recorder.timed('analyze_market_clusters', advisor.analyze_market_clusters)(bulk),
+                          range(args.advisor_requests)))
+    recorder.report("advisor", time.perf_counter() - started, args.advisor_requests, 'prompt')
+
+
+SCENARIOS = {'collect': run_collect, 'label': run_label, 'analysis': run_analysis, 'advisor': run_advisor}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator terhadap fake_services.py")
+    parser.add_argument('--scenarios', nargs='+', default=['collect', 'label', 'analysis'], choices=list(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.05, help="Latensi server lokal per request (detik)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--quota', type=int, default=None, help="Batas kuota server (None = tanpa batas)")
+    parser.add_argument('--budget', type=int, default=10 ** 9, help="Budget kuota harian untuk QuotaLedger")
+    parser.add_argument('--keywords', type=int, default=50, help="collect: jumlah keyword")
+    parser.add_argument('--concurrency', type=int, default=config.COLLECT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=1000.0, help="collect: request/s token bucket")
+    parser.add_argument('--burst', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200, help="analysis: jumlah validasi")
+    parser.add_argument('--users', type=int, default=8, help="analysis/advisor: pengguna paralel")
+    parser.add_argument('--repeat-ratio', type=float, default=0.5, help="analysis: porsi keyword yang berulang (cache)")
+    parser.add_argument('--advisor-requests', type=int, default=20)
+    parser.add_argument('--workdir', default=None, help="Folder kerja (default: folder sementara baru)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='gapsense_load_')
+    os.makedirs(workdir, exist_ok=True)
+    original_cwd = os.getcwd()
+    with FakeServices(seed=args.seed, latency=args.latency, error_rate=args.error_rate, quota=args.quota) as server:
+        point_clients_at(server, args.budget)
+        os.chdir(workdir) # Cache, checkpoint & output hasil uji tidak mencampuri data asli
+        print(f"-> Fake services: {server.base_url} | folder kerja: {workdir}")
+        try:
+            for name in args.scenarios:
+                recorder = LatencyRecorder()
+                restore = instrument_fetcher(recorder)
+                try:
+                    SCENARIOS[name](args, recorder)
+                finally:
+                    restore()
+        finally:
+            os.chdir(original_cwd)
+        stats = server.stats()
+        print(f"\n-> Server: {stats['quota_used']} unit kuota, request: "
+              + ', '.join(f"{k}={v}" for k, v in sorted(stats['requests'].items()) if not k.endswith('.seconds')))
+
+
+if __name__ == "__main__":
+    main()
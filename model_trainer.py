@@ -1,6 +1,7 @@
 # model_trainer.py - VERSI JUJUR (SPLIT 80:20)
 
 import numpy as np
+import scipy.sparse as sp
 from sklearn.svm import SVC           
 from sklearn.ensemble import RandomForestClassifier 
 from sklearn.linear_model import LogisticRegression 
@@ -10,10 +11,35 @@ from sklearn.model_selection import train_test_split # <--- INI KUNCI KEJUJURAN
 # Import Metrics
 from feature_calculator import CustomMetrics 
 from nlp_processor import NLPProcessor 
-import pandas as pd
+from dataset_io import read_training_data, tags_to_text
 import joblib
 import os
 
+
+# --- Fitur sparse (TF-IDF CSR + proxy) dipakai bersama oleh training & inferensi ---
+def stack_features(text_matrix, proxy) -> sp.csr_matrix:
+    """TF-IDF (CSR) + fitur proxy [emotion, density] per baris -> satu matriks CSR, tanpa densify."""
+    proxy = sp.csr_matrix(np.asarray(proxy, dtype=np.float64).reshape(text_matrix.shape[0], -1))
+    return sp.hstack([text_matrix, proxy], format='csr')
+
+
+def fit_feature_width(X, n_features: int):
+    """Samakan jumlah kolom dengan yang diharapkan model: tambah kolom nol / potong."""
+    if X.shape[1] < n_features:
+        return sp.hstack([X, sp.csr_matrix((X.shape[0], n_features - X.shape[1]))], format='csr')
+    if X.shape[1] > n_features:
+        return X[:, :n_features]
+    return X
+
+
+def predict_proba_sparse(model, X):
+    """predict_proba dengan input CSR. Model lama (dilatih dengan matriks dense) mendapat baris dense."""
+    try:
+        return model.predict_proba(X)
+    except (TypeError, ValueError):
+        return model.predict_proba(X.toarray())
+
+
 class ModelTrainer:
     """
     Class ModelTrainer (Versi Split Testing).
@@ -37,32 +63,31 @@ class ModelTrainer:
         self.X_test = None
         self.y_test = None
 
+    # Kolom yang benar-benar dipakai training (Parquet: kolom lain tidak dibaca dari disk)
+    TRAINING_COLUMNS = ['title', 'tags', 'ocr_text_density', 'is_success']
+
     def load_and_preprocess_data(self, dataset_path: str, nlp_processor: NLPProcessor):
-        print(f"-> Memuat data dari: {dataset_path}")
-        try:
-            df = pd.read_csv(dataset_path)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"FATAL: File {dataset_path} tidak ditemukan.")
-
-       
-        simulated_titles = df['title'].astype(str) + " " + df['tags'].astype(str)
+        """dataset_path=None: shorts_training_data.parquet (atau .csv jika belum ada / tanpa pyarrow)."""
+        print(f"-> Memuat data dari: {dataset_path or 'dataset training default'}")
+        df = read_training_data(dataset_path, columns=self.TRAINING_COLUMNS)
+
+        # Tags = list string -> digabung dengan spasi (tanpa karakter [ ' , dari str(list))
+        simulated_titles = df['title'].astype(str) + " " + df['tags'].map(tags_to_text)
         simulated_y = df['is_success'].values 
         
       
         print("-> Melatih TF-IDF Vectorizer...")
         nlp_processor.train_vectorizer(simulated_titles.tolist()) 
-        X_text_features = nlp_processor.vectorizer.transform(simulated_titles).toarray()
+        # Tetap CSR: 100k video x puluhan ribu term tidak muat di memori jika di-.toarray()
+        X_text_features = nlp_processor.embed_batch(simulated_titles.tolist(), sparse=True, use_cache=False)
         
 
         print("-> Mengekstrak Fitur Proxy (Emotion & OCR)...")
-        proxy_features_list = []
-        for index, row in df.iterrows():
-            emotion = nlp_processor.analyze_title_emotion(str(row['title']))
-            density = row.get('ocr_text_density', 0.0)
-            proxy_features_list.append([emotion, density])
-
-        X_proxy = np.array(proxy_features_list)
-        X_final = np.concatenate((X_text_features, X_proxy), axis=1)
+        emotions = [nlp_processor.analyze_title_emotion(title) for title in df['title'].astype(str)]
+        densities = df['ocr_text_density'].fillna(0.0).to_numpy(dtype=np.float64)
+        X_proxy = np.column_stack((emotions, densities))
+        # SVC, RandomForest & StackingClassifier menerima input sparse (CSR) langsung
+        X_final = stack_features(X_text_features, X_proxy)
         
         print(f"-> Total Data Siap: {X_final.shape[0]} sampel.")
         return X_final, simulated_y
@@ -79,7 +104,7 @@ class ModelTrainer:
         self.X_test = X_test
         self.y_test = y_test
 
-        print(f"-> Melatih model dengan {len(X_train)} data...")
+        print(f"-> Melatih model dengan {X_train.shape[0]} data...")
         self.model.fit(X_train, y_train)
         
         self.is_trained = True
@@ -1,8 +1,12 @@
 # nlp_processor.py - FINAL STABLE VERSION (TF-IDF)
 
 import numpy as np
+import scipy.sparse as sp
 import joblib
 import os
+import hashlib
+import threading
+from collections import OrderedDict
 from sklearn.feature_extraction.text import TfidfVectorizer # Pengganti BERT
 import pandas as pd # Digunakan untuk simulasi data
 from core.video_case import VideoCase
@@ -12,33 +16,101 @@ class NLPProcessor:
     Class untuk mengelola Feature Engineering berbasis teks menggunakan TF-IDF.
     BERT diganti TF-IDF untuk stabilitas sistem.
     """
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096):
         # Inisialisasi Vectorizer (akan dilatih nanti saat data siap)
         self.vectorizer = TfidfVectorizer()
         # Dimensi TF-IDF akan ditentukan saat training, kita gunakan placeholder 500
         self.embedding_dim = 500 
+        # Cache LRU embedding: hash teks ternormalisasi -> baris CSR (judul/tag yang sama tidak di-transform ulang)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         print("-> NLP Processor siap. Menggunakan TF-IDF Vectorizer (100% Stabil).")
 
     def train_vectorizer(self, corpus: list):
         """ Melatih TF-IDF Vectorizer pada semua teks di dataset training. """
         self.vectorizer.fit(corpus)
         self.embedding_dim = len(self.vectorizer.vocabulary_)
+        self.clear_embedding_cache() # Vocabulary berubah -> embedding lama tidak valid
         print(f"-> TF-IDF dilatih dengan {self.embedding_dim} fitur.")
+
+    # --- Embedding batch + cache LRU ---
+    @staticmethod
+    def _text_key(text: str) -> str:
+        # TF-IDF mengabaikan huruf besar & spasi berlebih -> teks yang hanya beda itu = embedding sama
+        return hashlib.blake2b(' '.join(str(text).lower().split()).encode('utf-8'), digest_size=16).hexdigest()
+
+    def embed_batch(self, texts: list, sparse: bool = True, use_cache: bool = True):
+        """
+        Embedding TF-IDF untuk banyak teks dengan satu panggilan transform (hanya teks yang belum di-cache).
+        Output: CSR (len(texts) x dimensi) jika sparse=True, selain itu array NumPy dense.
+        use_cache=False untuk korpus besar sekali jalan (mis. training) agar cache tidak teraduk.
+        """
+        texts = [str(text) for text in texts]
+        if not getattr(self.vectorizer, 'vocabulary_', None):
+            # Jika vectorizer belum dilatih, kembalikan vektor nol sesuai ukuran placeholder
+            matrix = sp.csr_matrix((len(texts), self.embedding_dim if self.embedding_dim > 0 else 500))
+            return matrix if sparse else matrix.toarray()
+        if not use_cache:
+            matrix = self.vectorizer.transform(texts)
+            return matrix if sparse else matrix.toarray()
+
+        keys = [self._text_key(text) for text in texts]
+        rows = {}
+        with self._cache_lock:
+            for key in keys:
+                row = self._cache.get(key)
+                if row is not None:
+                    self._cache.move_to_end(key)
+                    rows[key] = row
+            self.cache_hits += sum(1 for key in keys if key in rows)
+            self.cache_misses += sum(1 for key in keys if key not in rows)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in rows}
+        if missing:
+            computed = self.vectorizer.transform(list(missing.values()))
+            with self._cache_lock:
+                for i, key in enumerate(missing):
+                    rows[key] = computed[i]
+                    self._cache[key] = rows[key]
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        matrix = sp.vstack([rows[key] for key in keys], format='csr') if keys else \
+            sp.csr_matrix((0, self.embedding_dim))
+        return matrix if sparse else matrix.toarray()
+
+    def clear_embedding_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def embedding_cache_stats(self) -> dict:
+        with self._cache_lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / total if total else 0.0,
+                'size': len(self._cache),
+                'max_size': self.cache_size,
+                'bytes': sum(row.data.nbytes + row.indices.nbytes + row.indptr.nbytes for row in self._cache.values()),
+            }
         
     def get_semantic_embedding(self, text: str) -> np.ndarray:
         """
         Menghasilkan vektor semantik (embedding) dari teks menggunakan TF-IDF.
         
-        Output: Vektor numerik yang merepresentasikan makna teks.
+        Output: Vektor numerik (dense) yang merepresentasikan makna teks.
+        Untuk prediksi model gunakan get_sparse_embedding (tanpa alokasi selebar vocabulary).
         """
-        if not self.vectorizer.vocabulary_:
-            # Jika vectorizer belum dilatih, kembalikan vektor nol sesuai ukuran placeholder
-            return np.zeros(self.embedding_dim if self.embedding_dim > 0 else 500) 
-            
-        # Transformasi teks baru menjadi vektor TF-IDF
-        # Penggunaan .toarray() penting untuk mengintegrasikan ke NumPy
-        embedding = self.vectorizer.transform([text]).toarray().flatten()
-        return embedding
+        return self.get_sparse_embedding(text).toarray().ravel()
+
+    def get_sparse_embedding(self, text: str) -> sp.csr_matrix:
+        """Vektor TF-IDF 1 x dimensi dalam bentuk CSR (hanya term yang muncul yang disimpan)."""
+        return self.embed_batch([text])
 
 
     # --- Metode Kalkulasi Proxy (TIDAK BERUBAH) ---
@@ -75,6 +147,7 @@ class NLPProcessor:
         if os.path.exists(filepath):
             self.vectorizer = joblib.load(filepath)
             self.embedding_dim = len(self.vectorizer.vocabulary_)
+            self.clear_embedding_cache()
             print(f"-> Vectorizer dimuat dari {filepath}. Dimensi: {self.embedding_dim}")
             return True
         return False
\ No newline at end of file
@@ -9,21 +9,302 @@ from io import BytesIO
 import config
 import os
 import json
+import hashlib
+import bisect
 import concurrent.futures # Library untuk Multi-threading
+import queue
+import threading
+import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from journal_store import JournalStore
+from thumbnail_store import ThumbnailStore
+from perceptual_hash import dhash, BKTree
+
+OCR_LANG = 'ind+eng'
+
+
+def _count_unique_words(text_result: str) -> int:
+    """
+    Hitung density (jumlah kata unik) dari hasil teks Tesseract.
+    Catatan: `str.isalnum or str.isspace` == `str.isalnum`, spasi ikut terbuang, sehingga
+    nilainya efektif 0 (tanpa teks) atau 1 (ada teks). Dataset & model dilatih dengan skala ini.
+    """
+    clean_text = ''.join(filter(str.isalnum or str.isspace, text_result)).lower()
+    words = clean_text.split()
+    return len(set(words)) # Jumlah kata unik
+
+
+def detect_text_regions(gray: np.ndarray) -> list:
+    """
+    Prefilter OpenCV (murah): cari area yang kemungkinan berisi teks.
+    Gradien morfologi -> Otsu -> closing horizontal -> kontur, semua pada gambar
+    yang diperkecil. Return: list (x, y, w, h) dalam koordinat gambar asli.
+    """
+    height, width = gray.shape[:2]
+    scale = min(1.0, config.OCR_PREFILTER_WIDTH / width)
+    small = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+    small_h, small_w = small.shape[:2]
+
+    # 1. Tepi huruf -> gradien morfologi
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    grad = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, kernel)
+
+    # 2. Binarisasi (Otsu) dengan batas bawah agar noise JPEG tidak dianggap teks
+    otsu_value, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    if otsu_value < config.OCR_PREFILTER_MIN_GRADIENT:
+        _, bw = cv2.threshold(grad, config.OCR_PREFILTER_MIN_GRADIENT, 255, cv2.THRESH_BINARY)
+
+    # 3. Sambungkan huruf menjadi baris/kata
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    connected = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, kernel)
+    contours = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < 8 or h < 5 or h > small_h * 0.5 or w < h:
+            continue
+        fill_ratio = cv2.countNonZero(bw[y:y + h, x:x + w]) / float(w * h)
+        if fill_ratio < 0.35:
+            continue
+        regions.append((int(x / scale), int(y / scale), int(w / scale), int(h / scale)))
+    return regions
+
+
+def estimate_density_from_regions(regions: list, image_shape: tuple) -> int:
+    """
+    Mode 'fast density': perkiraan density dari luas area teks saja (tanpa Tesseract),
+    pada skala yang sama dengan _count_unique_words (0 = tanpa teks, 1 = ada teks).
+    """
+    if not regions:
+        return 0
+    image_area = float(image_shape[0] * image_shape[1])
+    text_area = sum(w * h for _, _, w, h in regions)
+    return int(text_area / image_area >= config.OCR_FAST_DENSITY_MIN_AREA)
+
+
+def _crop_to_regions(gray: np.ndarray, regions: list, pad: int = 8):
+    """
+    Potong gambar ke gabungan semua area teks (+padding) agar Tesseract bekerja lebih sedikit.
+    Return: (crop, (x0, y0)) -> offset dipakai untuk mengembalikan koordinat kata ke gambar asli.
+    """
+    x0 = max(min(x for x, _, _, _ in regions) - pad, 0)
+    y0 = max(min(y for _, y, _, _ in regions) - pad, 0)
+    x1 = min(max(x + w for x, _, w, _ in regions) + pad, gray.shape[1])
+    y1 = min(max(y + h for _, y, _, h in regions) + pad, gray.shape[0])
+    return gray[y0:y1, x0:x1], (x0, y0)
+
+
+def _prepare_gray(image_bytes: bytes, prefilter: bool = True):
+    """
+    Decode ke grayscale, lalu (jika prefilter aktif) potong ke area teks.
+    Return: (gray, offset). gray = None jika prefilter tidak menemukan teks.
+    """
+    gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("Gambar tidak bisa di-decode")
+    if not prefilter:
+        return gray, (0, 0)
+    regions = detect_text_regions(gray)
+    if not regions:
+        return None, (0, 0)
+    return _crop_to_regions(gray, regions)
+
+
+# --- Hasil OCR Lengkap (disimpan di cache) ---
+# {'text': teks per baris, 'words': [[kata, conf, left, top, width, height], ...]}
+# Mode fast density: {'text': None, 'words': [], 'estimate': n}
+
+def _result_from_data(data: dict, offset=(0, 0), keep=None) -> dict:
+    """
+    Ubah output image_to_data (DICT) menjadi hasil OCR lengkap.
+    offset: digeser ke koordinat gambar asli. keep(i) -> False = kata dilewati (mode mosaic).
+    """
+    dx, dy = offset
+    words, lines, current_line, line_key = [], [], [], None
+    for i, word in enumerate(data['text']):
+        conf = float(data['conf'][i])
+        if not word.strip() or conf < 0 or (keep is not None and not keep(i)):
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != line_key and current_line:
+            lines.append(' '.join(current_line))
+            current_line = []
+        line_key = key
+        current_line.append(word)
+        words.append([word, round(conf, 1), data['left'][i] + dx, data['top'][i] + dy, data['width'][i], data['height'][i]])
+    if current_line:
+        lines.append(' '.join(current_line))
+    return {'text': '\n'.join(lines), 'words': words}
+
+
+def _empty_result() -> dict:
+    return {'text': '', 'words': []}
+
+
+def density_from_result(result) -> int:
+    """
+    Fitur ocr_text_density dihitung (lazy) dari hasil OCR yang tersimpan.
+    Angka polos = entri cache format lama (hanya density).
+    """
+    if isinstance(result, (int, float)):
+        return result
+    if result.get('estimate') is not None:
+        return result['estimate']
+    return _count_unique_words(result.get('text') or '')
+
+
+def analyze_image_bytes(image_bytes: bytes, lang: str = OCR_LANG, prefilter: bool = True, fast_density: bool = False):
+    """
+    OCR satu gambar.
+    Return: (hasil_ocr, tesseract_dipanggil)
+    """
+    if not prefilter and not fast_density:
+        # Jalur lama: gambar penuh langsung ke Tesseract
+        img = Image.open(BytesIO(image_bytes))
+        data = pytesseract.image_to_data(img, lang=lang, config=config.OCR_TESSERACT_CONFIG,
+                                         output_type=pytesseract.Output.DICT)
+        return _result_from_data(data), True
+
+    if fast_density:
+        gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError("Gambar tidak bisa di-decode")
+        estimate = estimate_density_from_regions(detect_text_regions(gray), gray.shape)
+        return {'text': None, 'words': [], 'estimate': estimate}, False
+
+    tile, offset = _prepare_gray(image_bytes, prefilter=True)
+    if tile is None:
+        # Tidak ada teks -> skip Tesseract sepenuhnya
+        return _empty_result(), False
+
+    data = pytesseract.image_to_data(tile, lang=lang, config=config.OCR_TESSERACT_CONFIG,
+                                     output_type=pytesseract.Output.DICT)
+    return _result_from_data(data, offset), True
+
+
+def _ocr_image_bytes(image_bytes: bytes, tesseract_cmd: str, lang: str = OCR_LANG,
+                     prefilter: bool = True, fast_density: bool = False):
+    """
+    Worker untuk Process Pool (harus fungsi top-level agar bisa di-pickle).
+    Return: (hasil_ocr, tesseract_dipanggil, detik_cpu_yang_dipakai); hasil_ocr None = gagal.
+    Error tidak dilempar ke proses utama: exception yang tidak bisa di-unpickle
+    (mis. TesseractNotFoundError) merusak seluruh pool (BrokenProcessPool).
+    """
+    started = time.perf_counter()
+    try:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        result, used_tesseract = analyze_image_bytes(image_bytes, lang, prefilter, fast_density)
+    except Exception:
+        return None, False, time.perf_counter() - started
+    return result, used_tesseract, time.perf_counter() - started
+
+
+# --- Mode Mosaic: banyak thumbnail dalam SATU panggilan Tesseract ---
+MOSAIC_SEPARATOR = 48 # Pita putih (px) antar tile agar Tesseract tidak menyambung baris antar gambar
+
+
+def ocr_mosaic_results(tiles: list, offsets: list = None, lang: str = OCR_LANG) -> list:
+    """
+    Tempel tile grayscale secara vertikal di satu kanvas putih, jalankan Tesseract sekali
+    (image_to_data, level kata), lalu kembalikan setiap kata ke tile asalnya berdasarkan koordinat.
+    Return: list hasil OCR, satu per tile (urutan sama dengan input).
+    """
+    offsets = offsets or [(0, 0)] * len(tiles)
+    width = max(tile.shape[1] for tile in tiles) + 2 * MOSAIC_SEPARATOR
+    height = sum(tile.shape[0] for tile in tiles) + (len(tiles) + 1) * MOSAIC_SEPARATOR
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+
+    tile_tops, tile_bottoms = [], []
+    y = MOSAIC_SEPARATOR
+    for tile in tiles:
+        h, w = tile.shape[:2]
+        canvas[y:y + h, MOSAIC_SEPARATOR:MOSAIC_SEPARATOR + w] = tile
+        tile_tops.append(y)
+        tile_bottoms.append(y + h)
+        y += h + MOSAIC_SEPARATOR
+
+    data = pytesseract.image_to_data(canvas, lang=lang, config=config.OCR_TESSERACT_CONFIG,
+                                     output_type=pytesseract.Output.DICT)
+    owner = []
+    for top, box_h in zip(data['top'], data['height']):
+        center_y = top + box_h / 2.0
+        index = bisect.bisect_right(tile_tops, center_y) - 1
+        owner.append(index if 0 <= index < len(tiles) and center_y <= tile_bottoms[index] else -1)
+
+    results = []
+    for index, (dx, dy) in enumerate(offsets):
+        # Koordinat kanvas -> koordinat tile -> koordinat gambar asli
+        shift = (dx - MOSAIC_SEPARATOR, dy - tile_tops[index])
+        results.append(_result_from_data(data, shift, keep=lambda i, t=index: owner[i] == t))
+    return results
+
+
+def ocr_mosaic_texts(tiles: list, lang: str = OCR_LANG) -> list:
+    """Teks hasil mosaic per tile (dipakai benchmark paritas)."""
+    return [result['text'] for result in ocr_mosaic_results(tiles, lang=lang)]
+
+
+def analyze_image_batch(image_bytes_list: list, lang: str = OCR_LANG, prefilter: bool = True):
+    """
+    Versi batch dari analyze_image_bytes (mode mosaic).
+    Return: list (hasil_ocr, tesseract_dipanggil) per gambar. Gambar rusak -> None.
+    """
+    results = [None] * len(image_bytes_list)
+    tiles, offsets, tile_indexes = [], [], []
+    for i, image_bytes in enumerate(image_bytes_list):
+        try:
+            tile, offset = _prepare_gray(image_bytes, prefilter)
+        except Exception:
+            # Thumbnail rusak (ValueError, cv2.error, UnidentifiedImageError, ...) -> hanya tile ini gagal
+            continue
+        if tile is None:
+            results[i] = (_empty_result(), False)
+        else:
+            tiles.append(tile)
+            offsets.append(offset)
+            tile_indexes.append(i)
+
+    if tiles:
+        for i, result in zip(tile_indexes, ocr_mosaic_results(tiles, offsets, lang)):
+            results[i] = (result, True)
+    return results
+
+
+def _ocr_mosaic_bytes(image_bytes_list: list, tesseract_cmd: str, lang: str = OCR_LANG, prefilter: bool = True):
+    """
+    Worker Process Pool untuk mode mosaic. Return: (list hasil, detik_cpu_yang_dipakai).
+    Tesseract gagal -> semua hasil None (error tidak dilempar lintas proses, lihat _ocr_image_bytes).
+    """
+    started = time.perf_counter()
+    try:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        results = analyze_image_batch(image_bytes_list, lang, prefilter)
+    except Exception:
+        results = [None] * len(image_bytes_list)
+    return results, time.perf_counter() - started
+
 
 class OCRProcessor:
     """
     Class OCR Cerdas dengan fitur:
-    1. Caching (Menyimpan hasil agar tidak download ulang).
+    1. Caching (Menyimpan hasil agar tidak download ulang, journal append-only thread-safe).
+       Cache berisi hasil OCR lengkap (teks, kotak kata, confidence) + fingerprint konfigurasi;
+       entri dengan fingerprint berbeda otomatis dianggap basi.
     2. Multi-threading (Download paralel).
     3. Retry Mechanism (Tahan banting koneksi buruk).
     """
     
     CACHE_FILE = 'ocr_cache.json'
 
-    def __init__(self):
+    def __init__(self, cache_file: str = None, prefilter: bool = None, fast_density: bool = None,
+                 thumbnail_store: ThumbnailStore = None):
+        self.cache_file = cache_file or self.CACHE_FILE
+        # Prefilter OpenCV & mode fast density (default dari config)
+        self.prefilter = config.OCR_PREFILTER if prefilter is None else prefilter
+        self.fast_density = config.OCR_FAST_DENSITY if fast_density is None else fast_density
+
         # 1. Setup Tesseract
         try:
             pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
@@ -33,60 +314,147 @@ class OCRProcessor:
         # 2. Setup Session dengan Retry (Anti-Gagal)
         self.session = requests.Session()
         retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        # Pool koneksi diperbesar agar cukup untuk semua thread downloader
+        adapter = HTTPAdapter(max_retries=retries, pool_connections=4, pool_maxsize=32)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
-        # 3. Load Cache (Agar hemat kuota & waktu)
+        # 3. Thumbnail disimpan di disk (content-addressed) agar tidak perlu download ulang
+        #    saat konfigurasi OCR / rumus density berubah
+        self.thumbnails = thumbnail_store or ThumbnailStore(session=self.session)
+
+        # 4. Load Cache (Agar hemat kuota & waktu)
+        self.fingerprint = self._compute_fingerprint()
         self.cache = self._load_cache()
-        print(f"-> OCR Processor siap. {len(self.cache)} data tersimpan di cache.")
+
+        # 5. Index Perceptual Hash: thumbnail kembar (template sama) memakai ulang hasil OCR
+        self.phash_store = JournalStore(os.path.splitext(self.cache_file)[0] + '_phash.json')
+        self.phash_index = BKTree()
+        for vid_id, hash_hex in self.phash_store.items():
+            if self.is_cached(vid_id):
+                self.phash_index.add(int(hash_hex, 16), vid_id)
+        self.tesseract_saved = 0
+        self._dedup_lock = threading.Lock()
+        print(f"-> OCR Processor siap. {len(self.cache)} data tersimpan di cache, {self.phash_index.size} hash thumbnail. "
+              f"Fingerprint: {self.fingerprint}")
 
     def _load_cache(self):
-        """Membaca file cache jika ada."""
-        if os.path.exists(self.CACHE_FILE):
-            try:
-                with open(self.CACHE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def _save_cache_entry(self, video_id, density_score):
-        """Menyimpan satu entri ke file JSON (Checkpointing)."""
-        self.cache[video_id] = density_score
-        # Kita append/rewrite file json (Untuk performa tinggi, idealnya di akhir batch, 
-        # tapi untuk keamanan data, kita save sering-sering).
-        with open(self.CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.cache, f)
+        """Membuka cache OCR (snapshot JSON lama + journal append-only)."""
+        return JournalStore(self.cache_file)
+
+    def _compute_fingerprint(self) -> str:
+        """
+        Sidik jari konfigurasi OCR: versi Tesseract, bahasa, config (PSM), dan preprocessing.
+        Jika salah satu berubah, semua entri lama otomatis dianggap basi.
+        """
+        try:
+            tesseract_version = str(pytesseract.get_tesseract_version())
+        except Exception:
+            tesseract_version = 'unknown'
+        if self.fast_density:
+            preprocessing = f"fast-presence:{config.OCR_PREFILTER_WIDTH}:{config.OCR_PREFILTER_MIN_GRADIENT}:{config.OCR_FAST_DENSITY_MIN_AREA}"
+        elif self.prefilter:
+            preprocessing = f"prefilter:{config.OCR_PREFILTER_WIDTH}:{config.OCR_PREFILTER_MIN_GRADIENT}"
+        else:
+            preprocessing = 'full'
+        raw = json.dumps([tesseract_version, OCR_LANG, config.OCR_TESSERACT_CONFIG, preprocessing, config.OCR_THUMBNAIL_VARIANT])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+    def _save_cache_entry(self, video_id, result: dict):
+        """Menyimpan hasil OCR lengkap + fingerprint. Penulisan ke disk dilakukan thread penulis (append-only)."""
+        self.cache.put(video_id, dict(result, fp=self.fingerprint))
+
+    def get_cached_result(self, video_id):
+        """
+        Hasil OCR yang masih valid untuk konfigurasi sekarang, atau None.
+        Entri format lama (angka density saja) tetap dipakai jika OCR_ACCEPT_LEGACY_CACHE aktif.
+        """
+        entry = self.cache.get(video_id)
+        if entry is None:
+            return None
+        if isinstance(entry, dict):
+            return entry if entry.get('fp') == self.fingerprint else None
+        return entry if config.OCR_ACCEPT_LEGACY_CACHE else None
+
+    def is_cached(self, video_id) -> bool:
+        return self.get_cached_result(video_id) is not None
+
+    def get_cached_density(self, video_id, default=0.0):
+        """Ambil nilai density dari cache (O(1), dihitung dari hasil OCR yang tersimpan)."""
+        result = self.get_cached_result(video_id)
+        return density_from_result(result) if result is not None else default
+
+    def close(self):
+        """Tulis sisa antrian cache dan lakukan compaction terakhir."""
+        self.cache.close()
+        self.phash_store.close()
+        self.thumbnails.close()
+
+    # --- Deduplikasi Thumbnail (Perceptual Hash) ---
+    def compute_phash(self, image_bytes: bytes):
+        """dHash thumbnail, None jika dedup dimatikan atau gambar rusak."""
+        if config.OCR_PHASH_MAX_DISTANCE < 0:
+            return None
+        try:
+            return dhash(image_bytes)
+        except Exception:
+            return None
+
+    def remember_phash(self, video_id: str, phash: int):
+        """Daftarkan hash thumbnail yang sudah punya hasil OCR di cache."""
+        if phash is None:
+            return
+        self.phash_index.add(phash, video_id)
+        self.phash_store.put(video_id, format(phash, '016x'))
+
+    def reuse_duplicate(self, video_id: str, phash: int):
+        """
+        Jika ada thumbnail yang mirip (jarak Hamming <= OCR_PHASH_MAX_DISTANCE) dan sudah di-OCR,
+        salin hasilnya ke video ini. Return: density, atau None jika tidak ada kembaran.
+        """
+        if phash is None:
+            return None
+        for _, other_id in self.phash_index.find(phash, config.OCR_PHASH_MAX_DISTANCE):
+            result = self.get_cached_result(other_id)
+            if isinstance(result, dict):
+                self._save_cache_entry(video_id, result)
+                self.remember_phash(video_id, phash)
+                with self._dedup_lock:
+                    self.tesseract_saved += 1
+                return density_from_result(result)
+        return None
 
     def analyze_thumbnail_text_density(self, image_url: str, video_id: str = None) -> float:
         """
         Versi Cerdas: Cek Cache dulu, baru download jika belum ada.
         """
         # 1. Cek Cache (Hemat Resource)
-        if video_id and video_id in self.cache:
-            # Jika sudah pernah diproses, kembalikan nilai lama. Skip download!
-            return self.cache[video_id]
+        if video_id and self.is_cached(video_id):
+            # Jika sudah pernah diproses (dengan konfigurasi yang sama), Skip download!
+            return self.get_cached_density(video_id)
 
         if not image_url:
             return 0.0
 
         try:
-            # 2. Download Gambar (Pakai Session yang stabil)
-            response = self.session.get(image_url, timeout=10)
-            img = Image.open(BytesIO(response.content))
+            # 2. Ambil Gambar (Thumbnail Store lokal dulu, download jika belum ada)
+            image_bytes = self.thumbnails.get(image_url, config.OCR_THUMBNAIL_VARIANT)
             
-            # 3. Proses OCR
-            text_result = pytesseract.image_to_string(img, lang='ind+eng')
+            # 3. Thumbnail kembar sudah pernah di-OCR? Pakai ulang hasilnya
+            phash = self.compute_phash(image_bytes) if video_id else None
+            density = self.reuse_duplicate(video_id, phash)
+            if density is not None:
+                return density
             
-            # 4. Hitung Density
-            clean_text = ''.join(filter(str.isalnum or str.isspace, text_result)).lower()
-            words = clean_text.split()
-            density = len(set(words)) # Jumlah kata unik
+            # 4. Prefilter OpenCV + OCR, lalu Hitung Density
+            result, _ = analyze_image_bytes(image_bytes, OCR_LANG, self.prefilter, self.fast_density)
             
-            # 5. Simpan ke Cache jika ada ID
+            # 5. Simpan hasil lengkap ke Cache jika ada ID
             if video_id:
-                self._save_cache_entry(video_id, density)
+                self._save_cache_entry(video_id, result)
+                self.remember_phash(video_id, phash)
                 
-            return density
+            return density_from_result(result)
         
         except Exception as e:
             # Jangan print error berlebihan agar log bersih, cukup return 0
@@ -120,5 +488,286 @@ class OCRProcessor:
                 count_processed += 1
                 if count_processed % 10 == 0:
                     print(f"   -> Progress: {count_processed}/{len(video_data_list)} (Cache/OCR OK)")
-                    
-        print("✅ OCR Batch Selesai.")
\ No newline at end of file
+
+        # Pastikan semua hasil batch sudah tercatat di journal
+        self.cache.flush()
+        print("✅ OCR Batch Selesai.")
+
+
+class StageStats:
+    """Statistik satu tahap pipeline (jumlah item, waktu sibuk, throughput)."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, busy_seconds: float, ok: bool = True):
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.perf_counter() - busy_seconds
+            self.finished_at = time.perf_counter()
+            self.busy_seconds += busy_seconds
+            if ok:
+                self.items += 1
+            else:
+                self.failed += 1
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Item per detik (wall-clock) pada tahap ini."""
+        return self.items / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Persentase waktu worker benar-benar sibuk."""
+        capacity = self.wall_seconds * self.workers
+        return self.busy_seconds / capacity if capacity > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name:<9}| workers={self.workers:<3} ok={self.items:<6} gagal={self.failed:<5} "
+                f"{self.throughput:8.2f} item/s | utilisasi {self.utilization * 100:5.1f}%")
+
+
+class OCRPipeline:
+    """
+    Pipeline OCR 2 tahap:
+    1. Downloader (thread, network-bound) -> antrian terbatas (backpressure)
+    2. Tesseract (process pool, CPU-bound, default = jumlah core),
+       per gambar atau mosaic (N gambar per panggilan Tesseract)
+
+    Downloader akan berhenti sendiri (blocking put) saat antrian penuh,
+    jadi memori tetap terbatas walaupun OCR lebih lambat dari download.
+    """
+
+    def __init__(self, ocr: OCRProcessor, download_workers: int = 16, ocr_workers: int = None, queue_size: int = 64,
+                 mosaic_batch: int = None):
+        self.ocr = ocr
+        self.download_workers = download_workers
+        self.ocr_workers = ocr_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        # > 1 = mode mosaic: N thumbnail per satu panggilan Tesseract
+        self.mosaic_batch = config.OCR_MOSAIC_BATCH if mosaic_batch is None else mosaic_batch
+
+        self.download_stats = StageStats('download', self.download_workers)
+        self.ocr_stats = StageStats('ocr', self.ocr_workers)
+        self.cache_hits = 0
+        self.tesseract_skipped = 0 # Gambar yang ditolak prefilter (tanpa teks) / mode fast density
+
+        self._results = {}
+        self._results_lock = threading.Lock()
+        # Thumbnail kembar yang datang saat 'leader'-nya masih di tahap OCR
+        self._inflight_index = BKTree()
+        self._followers = {}
+        # Kembaran dari leader yang gagal OCR -> di-OCR ulang (satu dipromosikan jadi leader baru)
+        self._orphans = []
+
+    def _set_result(self, vid_id, density, total):
+        with self._results_lock:
+            self._results[vid_id] = density
+            done = len(self._results)
+        if done % 50 == 0:
+            print(f"   -> Progress: {done}/{total}")
+
+    def _download(self, vid_id, url, work_queue, total):
+        started = time.perf_counter()
+        try:
+            image_bytes = self.ocr.thumbnails.get(url, config.OCR_THUMBNAIL_VARIANT)
+        except Exception:
+            self.download_stats.record(time.perf_counter() - started, ok=False)
+            return
+        phash = self.ocr.compute_phash(image_bytes)
+        self.download_stats.record(time.perf_counter() - started)
+
+        if phash is not None:
+            with self._results_lock:
+                density = self.ocr.reuse_duplicate(vid_id, phash)
+                if density is None:
+                    for _, leader in self._inflight_index.find(phash, config.OCR_PHASH_MAX_DISTANCE):
+                        if leader in self._followers:
+                            # Tunggu hasil leader, tidak perlu masuk antrian OCR
+                            self._followers[leader].append((vid_id, url, phash))
+                            return
+                    self._inflight_index.add(phash, vid_id)
+                    self._followers[vid_id] = []
+            if density is not None:
+                self._set_result(vid_id, density, total)
+                return
+
+        # Blocking jika antrian penuh -> backpressure ke tahap download
+        work_queue.put((vid_id, image_bytes, phash))
+
+    def run(self, video_data_list: list) -> dict:
+        """Memproses list {'id', 'thumbnail'}; hasil disimpan ke cache OCR. Return: {id: density}."""
+        # State per run di-reset agar pemanggilan berulang (per potongan data) tidak menumpuk di memori
+        results = self._results = {}
+        self._inflight_index = BKTree()
+        self._followers = {}
+        self._orphans = []
+        pending = []
+        cache_hits = 0 # Per run; self.cache_hits = total semua run
+        for item in video_data_list:
+            vid_id, url = item.get('id'), item.get('thumbnail')
+            if self.ocr.is_cached(vid_id):
+                results[vid_id] = self.ocr.get_cached_density(vid_id)
+                cache_hits += 1
+            elif url:
+                pending.append((vid_id, url))
+        self.cache_hits += cache_hits
+
+        print(f"\n🚀 OCR Pipeline: {len(pending)} thumbnail baru ({cache_hits} dari cache)")
+        print(f"   Mode: {self.download_workers} thread download -> antrian {self.queue_size} -> {self.ocr_workers} proses OCR"
+              + (f" (mosaic {self.mosaic_batch} gambar/Tesseract)" if self.mosaic_batch > 1 else ""))
+        if not pending:
+            return results
+
+        work_queue = queue.Queue(maxsize=self.queue_size)
+        done_marker = object()
+        # Batasi tugas OCR yang sedang berjalan agar antrian tetap menjadi rem
+        in_flight = threading.BoundedSemaphore(self.ocr_workers * 2)
+        total = len(video_data_list)
+        saved_before = self.ocr.tesseract_saved
+        skipped_before = self.tesseract_skipped
+        # Mode fast density tidak memanggil Tesseract, jadi mosaic tidak berguna di sana
+        use_mosaic = self.mosaic_batch > 1 and not self.ocr.fast_density
+        wall_started = time.perf_counter()
+
+        def finish_item(vid_id, phash, result, used_tesseract, busy):
+            self.ocr_stats.record(busy)
+            if not used_tesseract:
+                self.tesseract_skipped += 1
+            self.ocr._save_cache_entry(vid_id, result)
+            density = density_from_result(result)
+            self.ocr.remember_phash(vid_id, phash)
+            with self._results_lock:
+                followers = self._followers.pop(vid_id, [])
+
+            self._set_result(vid_id, density, total)
+            for follower_id, _, follower_phash in followers:
+                self.ocr._save_cache_entry(follower_id, result)
+                self.ocr.remember_phash(follower_id, follower_phash)
+                with self.ocr._dedup_lock:
+                    self.ocr.tesseract_saved += 1
+                self._set_result(follower_id, density, total)
+
+        def fail_item(vid_id):
+            self.ocr_stats.record(0.0, ok=False)
+            with self._results_lock:
+                followers = self._followers.pop(vid_id, [])
+                if followers:
+                    self._orphans.append(followers)
+
+        def on_ocr_done(vid_id, phash, future):
+            try:
+                result, used_tesseract, busy = future.result()
+                if result is None:
+                    fail_item(vid_id)
+                else:
+                    finish_item(vid_id, phash, result, used_tesseract, busy)
+            except Exception:
+                fail_item(vid_id)
+            finally:
+                in_flight.release()
+
+        def on_mosaic_done(batch, future):
+            try:
+                batch_results, busy = future.result()
+            except Exception:
+                batch_results, busy = [None] * len(batch), 0.0
+            try:
+                for (vid_id, phash), result in zip(batch, batch_results):
+                    if result is None:
+                        fail_item(vid_id)
+                    else:
+                        finish_item(vid_id, phash, result[0], result[1], busy / len(batch))
+            finally:
+                in_flight.release()
+
+        def submit_mosaic(batch_items):
+            in_flight.acquire()
+            batch = [(vid_id, phash) for vid_id, _, phash in batch_items]
+            future = ocr_pool.submit(_ocr_mosaic_bytes, [image_bytes for _, image_bytes, _ in batch_items],
+                                     config.TESSERACT_PATH, OCR_LANG, self.ocr.prefilter)
+            future.add_done_callback(lambda f, b=batch: on_mosaic_done(b, f))
+
+        def feed_downloads(download_pool):
+            futures = [download_pool.submit(self._download, vid_id, url, work_queue, total) for vid_id, url in pending]
+            concurrent.futures.wait(futures)
+            work_queue.put(done_marker)
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.ocr_workers) as ocr_pool, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.download_workers) as download_pool:
+            feeder = threading.Thread(target=feed_downloads, args=(download_pool,), daemon=True)
+            feeder.start()
+
+            if use_mosaic:
+                # Kumpulkan N gambar per panggilan Tesseract; batch parsial dikirim
+                # jika antrian sepi sebentar agar tahap OCR tidak menganggur
+                batch_items = []
+                while True:
+                    try:
+                        item = work_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        if batch_items:
+                            submit_mosaic(batch_items)
+                            batch_items = []
+                        continue
+                    if item is done_marker:
+                        break
+                    batch_items.append(item)
+                    if len(batch_items) >= self.mosaic_batch:
+                        submit_mosaic(batch_items)
+                        batch_items = []
+                if batch_items:
+                    submit_mosaic(batch_items)
+            else:
+                while True:
+                    item = work_queue.get()
+                    if item is done_marker:
+                        break
+                    vid_id, image_bytes, phash = item
+                    in_flight.acquire()
+                    future = ocr_pool.submit(_ocr_image_bytes, image_bytes, config.TESSERACT_PATH, OCR_LANG,
+                                             self.ocr.prefilter, self.ocr.fast_density)
+                    future.add_done_callback(lambda f, v=vid_id, h=phash: on_ocr_done(v, h, f))
+            feeder.join()
+
+        # Leader gagal -> kembarannya tidak ikut hilang: satu dipromosikan jadi leader baru
+        # (OCR sendiri), sisanya menunggu hasilnya. Diulang sampai tidak ada grup tersisa.
+        while self._orphans:
+            groups, self._orphans = self._orphans, []
+            print(f"   -> {sum(len(g) for g in groups)} thumbnail kembar di-OCR ulang (leader gagal)")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.ocr_workers) as ocr_pool:
+                for (vid_id, url, phash), *rest in groups:
+                    with self._results_lock:
+                        self._followers[vid_id] = rest
+                    try:
+                        image_bytes = self.ocr.thumbnails.get(url, config.OCR_THUMBNAIL_VARIANT)
+                    except Exception:
+                        fail_item(vid_id)
+                        continue
+                    in_flight.acquire()
+                    future = ocr_pool.submit(_ocr_image_bytes, image_bytes, config.TESSERACT_PATH, OCR_LANG,
+                                             self.ocr.prefilter, self.ocr.fast_density)
+                    future.add_done_callback(lambda f, v=vid_id, h=phash: on_ocr_done(v, h, f))
+
+        self.ocr.cache.flush()
+        wall = time.perf_counter() - wall_started
+        print(f"✅ OCR Pipeline selesai dalam {wall:.1f} detik ({len(pending) / wall:.2f} thumbnail/s)")
+        print("   " + self.download_stats.summary())
+        print("   " + self.ocr_stats.summary())
+        print("   Thumbnail store: " + self.ocr.thumbnails.stats())
+        print(f"   Tesseract dilewati (prefilter/fast density): {self.tesseract_skipped - skipped_before}")
+        print(f"   Tesseract dihemat (thumbnail kembar/pHash): {self.ocr.tesseract_saved - saved_before}")
+        return results
@@ -0,0 +1,72 @@
+# perceptual_hash.py
+
+import threading
+
+import cv2
+import numpy as np
+
+
+def dhash(image_bytes: bytes, hash_size: int = 8) -> int:
+    """
+    Difference hash (dHash) 64-bit dari bytes gambar.
+    Thumbnail dengan template sama (hanya beda sedikit) menghasilkan hash yang berdekatan.
+    """
+    gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("Gambar tidak bisa di-decode")
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """
+    BK-Tree untuk pencarian hash berdasarkan jarak Hamming.
+    find() hanya menelusuri cabang yang mungkin berisi hasil (tidak scan semua hash).
+    """
+
+    def __init__(self):
+        self._root = None # Node: [hash, [values], {jarak: child}]
+        self._lock = threading.Lock()
+        self.size = 0
+
+    def add(self, hash_value: int, value):
+        with self._lock:
+            self.size += 1
+            if self._root is None:
+                self._root = [hash_value, [value], {}]
+                return
+            node = self._root
+            while True:
+                distance = hamming(hash_value, node[0])
+                if distance == 0:
+                    node[1].append(value)
+                    return
+                child = node[2].get(distance)
+                if child is None:
+                    node[2][distance] = [hash_value, [value], {}]
+                    return
+                node = child
+
+    def find(self, hash_value: int, max_distance: int) -> list:
+        """Return: list (jarak, value) dengan jarak <= max_distance, terurut dari yang terdekat."""
+        results = []
+        with self._lock:
+            stack = [self._root] if self._root is not None else []
+            while stack:
+                node = stack.pop()
+                distance = hamming(hash_value, node[0])
+                if distance <= max_distance:
+                    results.extend((distance, value) for value in node[1])
+                for child_distance, child in node[2].items():
+                    if distance - max_distance <= child_distance <= distance + max_distance:
+                        stack.append(child)
+        results.sort(key=lambda item: item[0])
+        return results
@@ -0,0 +1,153 @@
+# quantile_sketch.py
+# Estimator persentil streaming (merging t-digest) untuk threshold label tanpa menyimpan semua nilai WPI.
+
+import bisect
+import json
+import math
+import os
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl) dengan fungsi skala k1: centroid kecil di ekor distribusi,
+    besar di tengah -> persentil ekstrem tetap akurat dengan ~compression centroid.
+    Bisa digabung (merge) dari beberapa potongan/proses, dan disimpan sebagai JSON.
+    """
+
+    def __init__(self, compression: float = 200, buffer_size: int = None):
+        self.compression = compression
+        self.buffer_size = buffer_size or int(compression * 5)
+        self._means = []
+        self._weights = []
+        self._buffer = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # --- Input ---
+    def update(self, value: float, weight: float = 1.0):
+        value = float(value)
+        if math.isnan(value):
+            return
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= self.buffer_size:
+            self._compress()
+
+    def update_many(self, values):
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: 'TDigest'):
+        other._compress()
+        self._buffer.extend(zip(other._means, other._weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    # --- Kompresi ---
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        k = min(k, self.compression / 4)
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        items = sorted(list(zip(self._means, self._weights)) + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in items)
+
+        means, weights = [], []
+        weight_before = 0.0
+        mean, weight = items[0]
+        q_limit = self._k_inverse(self._k(0.0) + 1)
+        for next_mean, next_weight in items[1:]:
+            if (weight_before + weight + next_weight) / total <= q_limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                weight_before += weight
+                q_limit = self._k_inverse(self._k(weight_before / total) + 1)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means, self._weights = means, weights
+
+    # --- Query ---
+    def quantile(self, q: float) -> float:
+        """Estimasi nilai pada persentil q (0..1)."""
+        self._compress()
+        if not self._means:
+            raise ValueError("TDigest kosong.")
+        if len(self._means) == 1:
+            return self._means[0]
+
+        # Titik tengah kumulatif tiap centroid, diinterpolasi linear (min/max sebagai ujung)
+        centers = []
+        cumulative = 0.0
+        for weight in self._weights:
+            centers.append(cumulative + weight / 2)
+            cumulative += weight
+        target = min(max(q, 0.0), 1.0) * cumulative
+
+        if target <= centers[0]:
+            return self._interpolate(0.0, self.min, centers[0], self._means[0], target)
+        if target >= centers[-1]:
+            return self._interpolate(centers[-1], self._means[-1], cumulative, self.max, target)
+        i = bisect.bisect_right(centers, target) - 1
+        return self._interpolate(centers[i], self._means[i], centers[i + 1], self._means[i + 1], target)
+
+    @staticmethod
+    def _interpolate(x0, y0, x1, y1, x):
+        if x1 <= x0:
+            return y0
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def centroid_count(self) -> int:
+        self._compress()
+        return len(self._means)
+
+    # --- Persistensi ---
+    def to_dict(self) -> dict:
+        self._compress()
+        return {'compression': self.compression, 'count': self.count,
+                'min': self.min if self._means else None, 'max': self.max if self._means else None,
+                'centroids': [[mean, weight] for mean, weight in zip(self._means, self._weights)]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TDigest':
+        digest = cls(compression=data['compression'])
+        if data['centroids']:
+            digest._means = [mean for mean, _ in data['centroids']]
+            digest._weights = [weight for _, weight in data['centroids']]
+            digest.count = data['count']
+            digest.min, digest.max = data['min'], data['max']
+        return digest
+
+
+def save_state(path: str, state: dict):
+    """Simpan state (termasuk digest) secara atomik."""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, path)
+
+
+def load_state(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️ State sketch {path} rusak, diabaikan: {e}")
+        return None
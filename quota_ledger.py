@@ -0,0 +1,256 @@
+# quota_ledger.py
+
+import hashlib
+import math
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import config
+from journal_store import JournalStore
+
+try:
+    from zoneinfo import ZoneInfo
+    _PACIFIC = ZoneInfo('America/Los_Angeles')
+except Exception:  # zoneinfo/tzdata tidak tersedia (mis. Windows tanpa paket tzdata)
+    _PACIFIC = timezone(timedelta(hours=-8))
+
+# Biaya kuota per endpoint YouTube Data API v3 (unit)
+ENDPOINT_COST = {
+    'youtube.search.list': 100,
+    'youtube.videos.list': 1,
+    'youtube.channels.list': 1,
+    'youtube.playlistItems.list': 1,
+}
+DEFAULT_COST = 1
+PAGE_SIZE = 50  # maxResults maksimal untuk playlistItems/videos
+
+
+class QuotaExceededError(RuntimeError):
+    """Permintaan ditolak karena akan melewati budget kuota harian."""
+
+
+def quota_day(now: datetime = None) -> str:
+    """Kuota YouTube di-reset tengah malam waktu Pasifik, bukan WIB."""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(_PACIFIC).strftime('%Y-%m-%d')
+
+
+def endpoint_cost(method_id: str) -> int:
+    return ENDPOINT_COST.get(method_id, DEFAULT_COST)
+
+
+def key_label(api_key: str) -> str:
+    """Label pendek untuk ledger/log: API key asli tidak pernah ditulis ke disk."""
+    if not api_key:
+        return 'default'
+    return 'key-' + hashlib.sha1(api_key.encode('utf-8')).hexdigest()[:8]
+
+
+class QuotaLedger:
+    """
+    Buku besar pemakaian kuota, dipersist di disk (JournalStore) agar tetap dihitung lintas run.
+
+    Per hari: {'total': unit, 'endpoints': {method: unit}, 'stages': {stage: unit},
+               'keys': {label key: unit}, 'exhausted_keys': [label], 'exhausted': bool (semua key habis)}
+    Stage (mis. 'collect', 'validasi'): set_stage() berlaku untuk semua thread,
+    stage() (context manager) hanya untuk thread pemanggil.
+
+    Pool API key: budget harian berlaku PER KEY (satu key = satu project Google Cloud).
+    charge() memilih key yang dipakai; key yang habis (quotaExceeded) dilewati sampai reset.
+    """
+
+    LEDGER_FILE = 'quota_ledger.json'
+    DEFAULT_STAGE = 'lainnya'
+
+    def __init__(self, ledger_file: str = None, daily_budget: int = None, api_keys: list = None):
+        self.daily_budget = daily_budget if daily_budget is not None else config.YOUTUBE_DAILY_QUOTA_BUDGET
+        self.api_keys = list(api_keys or config.YOUTUBE_API_KEYS)
+        self.store = JournalStore(ledger_file or self.LEDGER_FILE)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stage = self.DEFAULT_STAGE
+        self._current = 0  # Key yang sedang dipakai (dipakai terus sampai budget-nya habis)
+
+    # --- Stage (tahap pipeline) ---
+    def set_stage(self, stage: str):
+        self._stage = stage
+
+    def current_stage(self) -> str:
+        return getattr(self._local, 'stage', None) or self._stage
+
+    @contextmanager
+    def stage(self, stage: str):
+        previous = getattr(self._local, 'stage', None)
+        self._local.stage = stage
+        try:
+            yield self
+        finally:
+            self._local.stage = previous
+
+    # --- Pencatatan ---
+    def _today(self) -> dict:
+        day = self.store.get(quota_day(), {'total': 0, 'endpoints': {}, 'stages': {}, 'exhausted': False})
+        if 'keys' not in day:
+            # Catatan format lama (satu key): semua pemakaian milik key pertama
+            labels = [key_label(api_key) for api_key in self.api_keys]
+            day = dict(day, keys={labels[0]: day['total']} if day['total'] else {},
+                       exhausted_keys=labels if day['exhausted'] else [])
+        return day
+
+    def _key_remaining(self, day: dict, api_key: str) -> int:
+        label = key_label(api_key)
+        if label in day['exhausted_keys']:
+            return 0
+        return max(self.daily_budget - day['keys'].get(label, 0), 0)
+
+    def spent_today(self) -> int:
+        return self._today()['total']
+
+    def remaining(self) -> int:
+        day = self._today()
+        return sum(self._key_remaining(day, api_key) for api_key in self.api_keys)
+
+    def can_afford(self, units: int) -> bool:
+        return units <= self.remaining()
+
+    def charge(self, method_id: str, units: int = None) -> str:
+        """
+        Catat biaya satu panggilan API SEBELUM dikirim (request gagal pun tetap dihitung YouTube).
+        Return: API key yang harus dipakai request ini.
+        Melempar QuotaExceededError jika tidak ada key dengan budget harian yang cukup.
+        """
+        units = endpoint_cost(method_id) if units is None else units
+        stage = self.current_stage()
+        with self._lock:
+            key = quota_day()
+            day = self._today()
+            for offset in range(len(self.api_keys)):
+                index = (self._current + offset) % len(self.api_keys)
+                if self._key_remaining(day, self.api_keys[index]) >= units:
+                    self._current = index
+                    break
+            else:
+                raise QuotaExceededError(
+                    f"Budget kuota harian habis ({day['total']}/{self.daily_budget * len(self.api_keys)} unit, "
+                    f"{len(self.api_keys)} key), {method_id} ({units} unit) ditunda sampai reset "
+                    f"(tengah malam waktu Pasifik)."
+                )
+            api_key = self.api_keys[index]
+            label = key_label(api_key)
+            day = dict(day, **{
+                'total': day['total'] + units,
+                'endpoints': dict(day['endpoints'], **{method_id: day['endpoints'].get(method_id, 0) + units}),
+                'stages': dict(day['stages'], **{stage: day['stages'].get(stage, 0) + units}),
+                'keys': dict(day['keys'], **{label: day['keys'].get(label, 0) + units}),
+            })
+            self.store.put(key, day)
+        return api_key
+
+    def mark_exhausted(self, api_key: str):
+        """API sudah membalas quotaExceeded untuk key ini -> key dilewati sampai reset."""
+        with self._lock:
+            day = self._today()
+            exhausted_keys = sorted(set(day['exhausted_keys']) | {key_label(api_key)})
+            self.store.put(quota_day(), dict(day, exhausted_keys=exhausted_keys, exhausted=self._all_exhausted(exhausted_keys)))
+
+    def _all_exhausted(self, exhausted_keys: list) -> bool:
+        return all(key_label(api_key) in exhausted_keys for api_key in self.api_keys)
+
+    # --- Gabung pemakaian lintas proses (collector shard) ---
+    def usage_today(self, api_keys: list = None) -> dict:
+        """Catatan hari ini. api_keys=[...]: hanya pemakaian key tersebut (seed untuk ledger proses shard)."""
+        day = self._today()
+        if api_keys is None:
+            return day
+        labels = {key_label(api_key) for api_key in api_keys}
+        keys = {label: units for label, units in day['keys'].items() if label in labels}
+        return {'total': sum(keys.values()), 'endpoints': {}, 'stages': {}, 'keys': keys,
+                'exhausted_keys': [label for label in day['exhausted_keys'] if label in labels], 'exhausted': False}
+
+    def add_usage(self, usage: dict, already_counted: dict = None):
+        """Tambahkan pemakaian dari ledger lain; already_counted = seed yang dulu disalin dari ledger ini."""
+        already_counted = already_counted or {'total': 0, 'keys': {}}
+
+        def added(current: dict, extra: dict, minus: dict = None) -> dict:
+            merged = dict(current)
+            for name, units in extra.items():
+                merged[name] = merged.get(name, 0) + units - (minus or {}).get(name, 0)
+            return merged
+
+        with self._lock:
+            day = self._today()
+            exhausted_keys = sorted(set(day['exhausted_keys']) | set(usage['exhausted_keys']))
+            self.store.put(quota_day(), {
+                'total': day['total'] + usage['total'] - already_counted['total'],
+                'endpoints': added(day['endpoints'], usage['endpoints']),
+                'stages': added(day['stages'], usage['stages']),
+                'keys': added(day['keys'], usage['keys'], already_counted['keys']),
+                'exhausted_keys': exhausted_keys,
+                'exhausted': self._all_exhausted(exhausted_keys),
+            })
+
+    def report(self, day: str = None) -> str:
+        if not self.store.get(day or quota_day()):
+            return f"Kuota {day or quota_day()}: belum ada pemakaian (budget {self.daily_budget} unit x {len(self.api_keys)} key)."
+        data = self._today() if day is None else self.store.get(day)
+        lines = [f"Kuota {day or quota_day()}: {data['total']}/{self.daily_budget * len(self.api_keys)} unit"
+                 + (" (HABIS menurut API)" if data['exhausted'] else "")]
+        for name, units in sorted(data['endpoints'].items(), key=lambda kv: -kv[1]):
+            lines.append(f"   endpoint {name:<28} {units:>6}")
+        for name, units in sorted(data['stages'].items(), key=lambda kv: -kv[1]):
+            lines.append(f"   stage    {name:<28} {units:>6}")
+        for name, units in sorted(data.get('keys', {}).items()):
+            habis = " (habis)" if name in data.get('exhausted_keys', []) else ""
+            lines.append(f"   key      {name + habis:<28} {units:>6}")
+        return "\n".join(lines)
+
+    def close(self):
+        self.store.close()
+
+
+class QuotaPlanner:
+    """Memilih urutan endpoint termurah dan menunda pekerjaan yang melewati budget."""
+
+    def __init__(self, ledger: QuotaLedger, search_cached=None):
+        self.ledger = ledger
+        # search_cached(keyword, max_results) -> True jika hasil search masih segar di cache respons
+        self.search_cached = search_cached
+
+    @staticmethod
+    def keyword_cost(videos_per_query: int) -> int:
+        # 1x search + detail (videos().list per 50 ID)
+        return endpoint_cost('youtube.search.list') + math.ceil(videos_per_query / PAGE_SIZE) * endpoint_cost('youtube.videos.list')
+
+    def plan_keywords(self, keywords: list, videos_per_query: int):
+        """
+        Return (keyword yang muat di budget hari ini, keyword yang ditunda).
+        Search yang masih segar di cache tidak dihitung; detail tetap dihitung karena
+        batch 50 ID digabung lintas keyword (key cache-nya belum diketahui di sini).
+        """
+        budget = self.ledger.remaining()
+        search_cost = endpoint_cost('youtube.search.list')
+        detail_cost = self.keyword_cost(videos_per_query) - search_cost
+        for index, keyword in enumerate(keywords):
+            cost = detail_cost
+            if not (self.search_cached and self.search_cached(keyword, videos_per_query)):
+                cost += search_cost
+            if cost > budget:
+                return keywords[:index], keywords[index:]
+            budget -= cost
+        return list(keywords), []
+
+    @staticmethod
+    def channel_top_videos_plan(video_count: int, max_results: int):
+        """
+        Bandingkan dua rute (setelah channels().list):
+        - 'playlist': semua upload via playlistItems (1 unit/50 video) + statistik videos() (1 unit/50), urut lokal.
+        - 'search'  : search(order=viewCount) 100 unit + detail.
+        Return (rute, biaya unit).
+        """
+        pages = max(math.ceil(video_count / PAGE_SIZE), 1)
+        playlist_cost = pages * (endpoint_cost('youtube.playlistItems.list') + endpoint_cost('youtube.videos.list'))
+        search_cost = endpoint_cost('youtube.search.list') + math.ceil(max_results / PAGE_SIZE) * endpoint_cost('youtube.videos.list')
+        if playlist_cost <= search_cost:
+            return 'playlist', playlist_cost
+        return 'search', search_cost
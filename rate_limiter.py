@@ -0,0 +1,111 @@
+# rate_limiter.py
+
+import asyncio
+import random
+import threading
+import time
+
+# Status HTTP yang layak dicoba ulang (rate limit / server sibuk)
+RETRYABLE_STATUS = {403, 429, 500, 502, 503, 504}
+# Alasan 403 yang TIDAK akan sembuh dengan retry (kuota harian habis)
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class TokenBucket:
+    """
+    Rate limiter token bucket yang aman untuk multi-thread.
+    rate  = token per detik (request/detik rata-rata)
+    burst = kapasitas maksimal (berapa request boleh langsung jalan bersamaan)
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float) -> float:
+        """Ambil token jika cukup (return 0), atau return lama tunggu (detik)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        """Blok sampai token tersedia."""
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Seperti acquire(), tapi menunggu dengan asyncio.sleep (event loop tidak terblok)."""
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def http_status(error):
+    """Ambil kode status HTTP dari exception googleapiclient (HttpError) / requests."""
+    resp = getattr(error, 'resp', None)
+    if resp is not None and getattr(resp, 'status', None) is not None:
+        return int(resp.status)
+    response = getattr(error, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) is not None:
+        return int(response.status_code)
+    return None
+
+
+def is_quota_error(error) -> bool:
+    return http_status(error) == 403 and any(reason in str(error) for reason in QUOTA_REASONS)
+
+
+def is_retryable(error) -> bool:
+    status = http_status(error)
+    if status is None:
+        # Error jaringan (timeout, koneksi putus) juga dicoba ulang
+        return isinstance(error, (ConnectionError, TimeoutError, OSError))
+    return status in RETRYABLE_STATUS and not is_quota_error(error)
+
+
+def call_with_backoff(fn, retries: int = 5, base_delay: float = 1.0, max_delay: float = 32.0, on_retry=None):
+    """
+    Panggil fn(); jika gagal karena 403/429/5xx, ulangi dengan exponential backoff + full jitter.
+    Error lain (atau retry habis) dilempar ke pemanggil.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if on_retry:
+                on_retry(e, attempt + 1, delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+async def call_with_backoff_async(fn, retries: int = 5, base_delay: float = 1.0, max_delay: float = 32.0, on_retry=None):
+    """Versi asyncio dari call_with_backoff; fn = fungsi async tanpa argumen."""
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if on_retry:
+                on_retry(e, attempt + 1, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
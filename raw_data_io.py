@@ -0,0 +1,133 @@
+# raw_data_io.py
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+RAW_JSONL_FILE = 'raw_shorts_data.jsonl'
+LEGACY_JSON_FILE = 'raw_shorts_data.json'
+READ_BLOCK_SIZE = 1 << 20 # 1 MB per baca dari disk
+
+
+def resolve_raw_file(path: str = None) -> str:
+    """File data mentah yang dipakai: argumen, lalu JSONL baru, lalu file JSON array lama."""
+    if path:
+        return path
+    if os.path.exists(RAW_JSONL_FILE):
+        return RAW_JSONL_FILE
+    return LEGACY_JSON_FILE
+
+
+def _iter_json_array(f):
+    """Baca elemen JSON array satu per satu tanpa memuat seluruh file (format lama, indent=4)."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_BLOCK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Bukan JSON array")
+    idx = 1 # Kursor di buffer; buffer hanya dipotong sekali per blok yang dibaca
+    eof = False
+    while True:
+        while idx < len(buffer) and buffer[idx] in ' \t\r\n,':
+            idx += 1
+        if buffer.startswith(']', idx):
+            return
+        try:
+            record, idx = decoder.raw_decode(buffer, idx)
+        except json.JSONDecodeError:
+            if eof:
+                if buffer[idx:].strip():
+                    print(f"⚠️ Akhir file JSON terpotong, sisa {len(buffer) - idx} karakter diabaikan.")
+                return
+            block = f.read(READ_BLOCK_SIZE)
+            eof = not block
+            buffer = buffer[idx:] + block
+            idx = 0
+            continue
+        yield record
+
+
+def iter_raw_records(path: str = None):
+    """
+    Iterasi record data mentah dengan memori tetap.
+    Mendukung JSON Lines (satu record per baris) dan file JSON array lama.
+    """
+    path = resolve_raw_file(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(64).lstrip()
+        f.seek(0)
+        if head.startswith('['):
+            yield from _iter_json_array(f)
+            return
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Baris terakhir terpotong (collector mati saat menulis)
+                print(f"⚠️ {path} baris {line_no} rusak, dilewati.")
+
+
+def iter_jsonl_offsets(path: str):
+    """(posisi byte, record) per baris JSONL; baris rusak dilewati. Untuk indeks id -> posisi tanpa menyimpan record."""
+    with open(path, 'rb') as f:
+        offset = 0
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield offset, json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ {path} baris {line_no} rusak, dilewati.")
+            offset += len(line)
+
+
+def read_jsonl_record(f, offset: int) -> dict:
+    """Baca satu record dari file JSONL (mode biner) pada posisi hasil iter_jsonl_offsets."""
+    f.seek(offset)
+    return json.loads(f.readline())
+
+
+def iter_raw_chunks(path: str = None, chunk_size: int = 50000):
+    """Record data mentah dalam potongan DataFrame (kolom 'row_no' = urutan record di file)."""
+    rows = []
+    for row_no, record in enumerate(iter_raw_records(path)):
+        record['row_no'] = row_no
+        rows.append(record)
+        if len(rows) >= chunk_size:
+            yield pd.DataFrame(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+
+
+class JsonlWriter:
+    """Penulis JSON Lines yang aman untuk multi-thread; setiap record langsung di-flush ke disk."""
+
+    def __init__(self, path: str = RAW_JSONL_FILE, append: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        needs_newline = False
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                # Baris terakhir terpotong -> mulai di baris baru agar record berikutnya tetap utuh
+                needs_newline = f.read(1) != b'\n'
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        if needs_newline:
+            self._file.write('\n')
+        self.written = 0
+
+    def write(self, records: list):
+        if not records:
+            return
+        payload = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        with self._lock:
+            self._file.write(payload)
+            self._file.flush()
+            self.written += len(records)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
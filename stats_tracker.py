@@ -0,0 +1,261 @@
+# stats_tracker.py
+# Snapshot statistik video berkala -> fitur kecepatan (views/jam) & percepatan (views/jam^2).
+#   videos().list part=statistics,snippet : 1 unit per 50 video
+#   100.000 video = 2.000 panggilan = ~2.000 unit kuota per putaran refresh
+#
+# Contoh:
+#   python stats_tracker.py --from-raw --from-crawl            # satu putaran refresh
+#   python stats_tracker.py --from-raw --every-min 360         # refresh terus setiap 6 jam
+#   python stats_tracker.py --show VIDEO_ID
+
+import argparse
+import calendar
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import config
+from data_fetcher import DataFetcher, VIDEO_DETAIL_BATCH_SIZE
+from journal_store import JournalStore
+from quota_ledger import endpoint_cost
+from rate_limiter import TokenBucket, call_with_backoff
+
+FIELDS_STATS = 'items(id,snippet/publishedAt,statistics(viewCount,likeCount,commentCount))'
+
+
+def parse_published_at(value: str):
+    """'2025-01-31T10:00:00Z' -> epoch detik (None jika kosong/tidak dikenal)."""
+    try:
+        return calendar.timegm(datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').timetuple())
+    except (TypeError, ValueError):
+        return None
+
+
+class StatsTracker:
+    """
+    Time-series statistik per video di disk:
+        JournalStore 'v|<video_id>' : {'pub': epoch upload, 'n': jumlah snapshot, 'last_t', 'last_v',
+                                       'vel': views/jam terakhir, 'acc': perubahan vel per jam,
+                                       'vi': True jika vel dihitung dari selisih dua snapshot}
+        sqlite points(id, t)        : views, likes, comments (max_points titik terakhir per video)
+    Hanya header yang ada di memori; seri titik tetap di sqlite (satu transaksi per batch refresh).
+    vel & acc diperbarui dari titik terakhir saja.
+    Snapshot pertama: vel = views / umur video (rata-rata seumur hidup), acc belum ada.
+    acc hanya dihitung antara dua vel hasil interval, bukan terhadap rata-rata seumur hidup.
+    """
+
+    STORE_FILE = 'stats_series.json'
+    SERIES_FILE = 'stats_series.sqlite'
+
+    def __init__(self, fetcher: DataFetcher = None, store_file: str = None, workers: int = config.STATS_TRACKER_WORKERS,
+                 rate: float = config.STATS_TRACKER_RATE_PER_SEC, burst: int = config.COLLECT_BURST,
+                 max_points: int = config.STATS_SERIES_MAX_POINTS, series_file: str = None):
+        self.fetcher = fetcher or DataFetcher()
+        self.store = JournalStore(store_file or self.STORE_FILE)
+        self.series = sqlite3.connect(series_file or self.SERIES_FILE, check_same_thread=False)
+        self.series.execute('PRAGMA journal_mode=WAL')
+        self.series.execute('PRAGMA synchronous=NORMAL')
+        self.series.execute('CREATE TABLE IF NOT EXISTS points (id TEXT NOT NULL, t INTEGER NOT NULL, views INTEGER, '
+                            'likes INTEGER, comments INTEGER, PRIMARY KEY (id, t)) WITHOUT ROWID')
+        self.series.commit()
+        self._series_lock = threading.Lock()
+        self.workers = workers
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.max_points = max_points
+        self._lock = threading.Lock()
+        self.api_calls = 0
+        self.snapshots = 0
+
+    # --- Daftar video yang dilacak ---
+    def track(self, video_ids) -> int:
+        """Daftarkan video baru (belum punya snapshot). Return: jumlah yang baru ditambahkan."""
+        added = 0
+        for vid_id in dict.fromkeys(video_ids):
+            if vid_id and f"v|{vid_id}" not in self.store:
+                self.store.put(f"v|{vid_id}", self._empty_head())
+                added += 1
+        return added
+
+    @staticmethod
+    def _empty_head() -> dict:
+        return {'pub': None, 'n': 0, 'last_t': None, 'last_v': None, 'vel': None, 'acc': None, 'vi': False}
+
+    def tracked_ids(self) -> list:
+        return [key[2:] for key in self.store.keys() if key.startswith('v|')]
+
+    def due_ids(self, interval_hours: float = config.STATS_TRACKER_INTERVAL_HOURS) -> list:
+        """Video yang snapshot terakhirnya lebih tua dari interval (yang paling lama dulu)."""
+        cutoff = time.time() - interval_hours * 3600
+        due = []
+        for key, head in self.store.items():
+            if not key.startswith('v|'):
+                continue
+            last = head['last_t'] if head['n'] else 0
+            if last <= cutoff:
+                due.append((last, key[2:]))
+        return [vid_id for _, vid_id in sorted(due)]
+
+    # --- Refresh (50 ID per panggilan, paralel di bawah token bucket) ---
+    def refresh(self, video_ids: list = None, interval_hours: float = config.STATS_TRACKER_INTERVAL_HOURS) -> int:
+        """Ambil snapshot baru untuk video_ids (default: semua yang jatuh tempo). Return: jumlah snapshot."""
+        video_ids = self.due_ids(interval_hours) if video_ids is None else list(dict.fromkeys(video_ids))
+        batches = [video_ids[start:start + VIDEO_DETAIL_BATCH_SIZE]
+                   for start in range(0, len(video_ids), VIDEO_DETAIL_BATCH_SIZE)]
+        affordable = self.fetcher.quota.remaining() // endpoint_cost('youtube.videos.list')
+        if len(batches) > affordable:
+            print(f"⚠️ Kuota hanya cukup untuk {affordable}/{len(batches)} batch; sisanya menunggu putaran berikutnya.")
+            batches = batches[:affordable]
+        if not batches:
+            return 0
+
+        print(f"-> Refresh statistik {sum(len(b) for b in batches)} video ({len(batches)} panggilan, "
+              f"~{len(batches) * endpoint_cost('youtube.videos.list')} unit kuota)...")
+        before = self.snapshots
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(self._refresh_batch, batches))
+        taken = self.snapshots - before
+        print(f"✅ {taken} snapshot dalam {time.monotonic() - started:.1f}s "
+              f"({len(video_ids) - taken} video tidak ditemukan/gagal)")
+        return taken
+
+    def _refresh_batch(self, batch: list):
+        def fetch():
+            if self.limiter:
+                self.limiter.acquire()
+            request = self.fetcher.youtube.videos().list(
+                part='snippet,statistics', id=','.join(batch), fields=FIELDS_STATS
+            )
+            # Langsung ke API (tanpa cache respons): snapshot harus angka terbaru
+            return self.fetcher._execute_http(request)
+
+        with self._lock:
+            self.api_calls += 1
+        try:
+            with self.fetcher.quota.stage('stats-tracker'):
+                res = call_with_backoff(fetch, retries=config.COLLECT_MAX_RETRIES)
+        except Exception as e:
+            print(f"❌ Gagal refresh statistik ({len(batch)} video): {e}")
+            return
+        taken_at = int(time.time())
+        snapshots = []
+        for item in res.get('items', []):
+            stats = item.get('statistics', {})
+            snapshots.append((item['id'], taken_at, int(stats.get('viewCount', 0)), int(stats.get('likeCount', 0)),
+                              int(stats.get('commentCount', 0)),
+                              parse_published_at(item.get('snippet', {}).get('publishedAt'))))
+        self.add_snapshots(snapshots)
+
+    def add_snapshot(self, video_id: str, taken_at: int, views: int, likes: int, comments: int, published_at: float = None):
+        """Tambah satu titik ke seri & perbarui vel/acc secara incremental."""
+        self.add_snapshots([(video_id, taken_at, views, likes, comments, published_at)])
+
+    def add_snapshots(self, snapshots: list):
+        """[(video_id, taken_at, views, likes, comments, published_at), ...] dalam satu transaksi sqlite."""
+        with self._series_lock, self.series:
+            for snapshot in snapshots:
+                self._append(*snapshot)
+
+    def _append(self, video_id: str, taken_at: int, views: int, likes: int, comments: int, published_at: float):
+        key = f"v|{video_id}"
+        head = dict(self.store.get(key) or self._empty_head())
+        head['pub'] = head['pub'] or published_at
+
+        velocity, acceleration, from_interval = head['vel'], head['acc'], head['vi']
+        if head['n']:
+            hours = (taken_at - head['last_t']) / 3600
+            if hours > 0:
+                velocity = (views - head['last_v']) / hours
+                # vel sebelumnya masih rata-rata seumur hidup -> belum ada acc yang bermakna
+                acceleration = (velocity - head['vel']) / hours if head['vi'] else None
+                from_interval = True
+        elif head['pub']:
+            age_hours = max((taken_at - head['pub']) / 3600, 1.0)
+            velocity = views / age_hours
+
+        self.series.execute('INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?)',
+                            (video_id, taken_at, views, likes, comments))
+        if head['n'] >= self.max_points:
+            # Buang titik di luar max_points terbaru
+            self.series.execute('DELETE FROM points WHERE id = ? AND t < (SELECT t FROM points WHERE id = ? '
+                                'ORDER BY t DESC LIMIT 1 OFFSET ?)', (video_id, video_id, self.max_points - 1))
+        head.update(n=head['n'] + 1, last_t=taken_at, last_v=views, vel=velocity, acc=acceleration, vi=from_interval)
+        self.store.put(key, head)
+        with self._lock:
+            self.snapshots += 1
+
+    # --- Fitur ---
+    def points(self, video_id: str) -> list:
+        """Seri snapshot yang tersimpan (lama -> baru): [[epoch, views, likes, comments], ...]."""
+        with self._series_lock:
+            rows = self.series.execute('SELECT t, views, likes, comments FROM points WHERE id = ? ORDER BY t',
+                                       (video_id,)).fetchall()
+        return [list(row) for row in rows]
+
+    def features(self, video_id: str) -> dict:
+        """{'views', 'age_hours', 'velocity' (views/jam), 'acceleration' (views/jam^2), 'snapshots'} atau None."""
+        head = self.store.get(f"v|{video_id}")
+        if not head or not head['n']:
+            return None
+        return {
+            'views': head['last_v'],
+            'age_hours': (head['last_t'] - head['pub']) / 3600 if head['pub'] else None,
+            'velocity': head['vel'],
+            'acceleration': head['acc'],
+            'snapshots': min(head['n'], self.max_points),
+        }
+
+    def run_forever(self, every_minutes: float):
+        while True:
+            self.refresh(interval_hours=every_minutes / 60)
+            print(f"   {self.fetcher.quota.report()}")
+            time.sleep(every_minutes * 60)
+
+    def close(self):
+        self.store.close()
+        with self._series_lock:
+            self.series.close()
+
+
+def known_video_ids(from_raw: bool = False, from_crawl: bool = False) -> list:
+    """Kumpulkan video ID dari data mentah collector dan/atau store channel_crawler."""
+    video_ids = []
+    if from_raw:
+        from raw_data_io import iter_raw_records
+        video_ids.extend(record.get('id') for record in iter_raw_records())
+    if from_crawl:
+        from channel_crawler import ChannelCrawler
+        crawl_store = JournalStore(ChannelCrawler.STORE_FILE)
+        video_ids.extend(key[len('video|'):] for key in crawl_store.keys() if key.startswith('video|'))
+        crawl_store.close()
+    return [vid_id for vid_id in dict.fromkeys(video_ids) if vid_id]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot statistik video berkala (fitur kecepatan views).")
+    parser.add_argument('videos', nargs='*', help="Video ID tambahan untuk dilacak")
+    parser.add_argument('--from-raw', action='store_true', help="Lacak semua video di data mentah collector")
+    parser.add_argument('--from-crawl', action='store_true', help="Lacak semua video hasil channel_crawler")
+    parser.add_argument('--interval-hours', type=float, default=config.STATS_TRACKER_INTERVAL_HOURS,
+                        help="Video dengan snapshot lebih baru dari ini dilewati")
+    parser.add_argument('--every-min', type=float, default=None, help="Ulangi refresh setiap N menit (daemon)")
+    parser.add_argument('--workers', type=int, default=config.STATS_TRACKER_WORKERS)
+    parser.add_argument('--rate', type=float, default=config.STATS_TRACKER_RATE_PER_SEC)
+    parser.add_argument('--show', nargs='*', default=None, help="Tampilkan fitur video ID ini lalu keluar")
+    args = parser.parse_args()
+
+    tracker = StatsTracker(workers=args.workers, rate=args.rate)
+    if args.show is not None:
+        for vid_id in args.show:
+            print(f"   {vid_id}: {tracker.features(vid_id)}")
+    else:
+        added = tracker.track(list(args.videos) + known_video_ids(args.from_raw, args.from_crawl))
+        print(f"-> {len(tracker.tracked_ids())} video dilacak ({added} baru)")
+        if args.every_min:
+            tracker.run_forever(args.every_min)
+        else:
+            tracker.refresh(interval_hours=args.interval_hours)
+            print(f"   {tracker.fetcher.quota.report()}")
+    tracker.close()
@@ -0,0 +1,165 @@
+# thumbnail_store.py
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+import config
+from journal_store import JournalStore
+
+# Varian thumbnail ytimg dari yang terbesar ke terkecil
+YTIMG_VARIANTS = ('maxresdefault', 'sddefault', 'hqdefault', 'mqdefault', 'default')
+_YTIMG_PATTERN = re.compile(r'^(https?://i\d?\.ytimg\.com/vi(?:_webp)?/[^/]+/)(' + '|'.join(YTIMG_VARIANTS) + r')(\.\w+)$')
+
+
+def ytimg_variant(url: str, variant: str = None) -> str:
+    """Ganti ukuran thumbnail ytimg (mis. hqdefault -> mqdefault). URL lain dikembalikan apa adanya."""
+    if not variant:
+        return url
+    match = _YTIMG_PATTERN.match(url)
+    if not match:
+        return url
+    return f"{match.group(1)}{variant}{match.group(3)}"
+
+
+class ThumbnailStore:
+    """
+    Penyimpanan thumbnail di disk (content-addressed by URL hash).
+
+    - Layout shard: <root>/ab/cd/<sha1(url)> agar satu folder tidak berisi ribuan file.
+    - Batas ukuran total dengan eviction LRU (yang paling lama tidak diakses dibuang dulu).
+    - Re-fetch kondisional (If-None-Match / If-Modified-Since): 304 = pakai file lokal.
+    Dipakai oleh OCRProcessor dan fitur visual lain agar thumbnail cukup diunduh sekali.
+    """
+
+    STORE_DIR = 'thumbnail_store'
+
+    def __init__(self, root: str = None, max_bytes: int = None, revalidate_after: float = None, session=None):
+        self.root = root or self.STORE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.THUMBNAIL_STORE_MAX_MB * 1024 * 1024
+        self.revalidate_after = revalidate_after if revalidate_after is not None else config.THUMBNAIL_REVALIDATE_HOURS * 3600
+        self.session = session or requests.Session()
+        os.makedirs(self.root, exist_ok=True)
+
+        # Metadata per blob: url, etag, last_modified, size, fetched_at, accessed_at
+        self.index = JournalStore(os.path.join(self.root, 'index.json'))
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self.total_bytes = 0
+        for key, meta in sorted(self.index.items(), key=lambda kv: kv[1].get('accessed_at', 0)):
+            self._lru[key] = meta['size']
+            self.total_bytes += meta['size']
+
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def get(self, url: str, variant: str = None) -> bytes:
+        """
+        Ambil bytes thumbnail. Urutan: file lokal segar -> GET kondisional -> download penuh.
+        Jika jaringan gagal tapi file lokal ada, file lokal (walau basi) tetap dipakai.
+        """
+        url = ytimg_variant(url, variant)
+        key = self.key_for(url)
+        meta = self.index.get(key)
+        path = self.path_for(key)
+        local = meta is not None and os.path.exists(path)
+
+        if local and time.time() - meta['fetched_at'] < self.revalidate_after:
+            content = self._read(key, meta, path)
+            if content is not None:
+                self.hits += 1
+                return content
+            local = False # File hilang (evicted oleh thread lain) -> download ulang
+
+        headers = {}
+        if local:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=10)
+            if response.status_code == 304 and local:
+                content = self._read(key, dict(meta, fetched_at=time.time()), path)
+                if content is not None:
+                    self.revalidated += 1
+                    return content
+                # File hilang di tengah jalan -> ulangi tanpa header kondisional
+                response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException:
+            content = self._read(key, meta, path) if local else None
+            if content is not None:
+                return content
+            raise
+
+        self.downloads += 1
+        self._write(key, url, path, response)
+        return response.content
+
+    def _read(self, key, meta, path):
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            # Entri yang baru saja di-evict tidak boleh dihidupkan lagi di index
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.index.put(key, dict(meta, accessed_at=time.time()))
+        return content
+
+    def _write(self, key, url, path, response):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        size = len(response.content)
+        self.index.put(key, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': size,
+            'fetched_at': now,
+            'accessed_at': now,
+        })
+        with self._lock:
+            self.total_bytes += size - self._lru.pop(key, 0)
+            self._lru[key] = size
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """Buang blob yang paling lama tidak diakses sampai total ukuran di bawah batas."""
+        while self.total_bytes > self.max_bytes and len(self._lru) > 1:
+            key, size = self._lru.popitem(last=False)
+            self.total_bytes -= size
+            self.index.delete(key)
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def stats(self) -> str:
+        return (f"{len(self._lru)} file, {self.total_bytes / 1024 / 1024:.1f} MB | "
+                f"hit lokal {self.hits}, revalidasi 304 {self.revalidated}, download {self.downloads}")
+
+    def close(self):
+        self.index.close()